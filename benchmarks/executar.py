@@ -0,0 +1,199 @@
+"""Mede o tempo e o pico de memória de cada etapa da projeção sobre folhas sintéticas.
+
+Uso::
+
+    python -m benchmarks.executar                       # 1k, 10k e 100k linhas
+    python -m benchmarks.executar --linhas 1000 1000000 --repeticoes 3
+    python -m benchmarks.executar --comparar benchmarks/resultados/anterior.json
+
+Cada etapa é cronometrada `--repeticoes` vezes (guardando o mínimo e a
+mediana) e executada mais uma vez sob `tracemalloc` para o pico de memória
+alocada pela própria etapa. O resultado vai para um JSON em
+`benchmarks/resultados/` com a versão do código e do ambiente, para comparar
+execuções ao longo do tempo.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.gerador import gerar_folha
+from projecao.agregacao import agregar, fatorar_chaves
+from projecao.comparacao import comparar_cenarios, projetar_base
+from projecao.dados import carregar_folha, carregar_planilha, juntar, ler_aba
+from projecao.exportacao import exportar_projecao
+from projecao.metas import SALARIO_BASE_REFERENCIA, avaliar_valores, resolver_meta
+from projecao.progressao import anos_admissao, simular_progressao
+from projecao.resumo import PARAMETROS_PADRAO, calcular_impacto, calcular_projecao, calcular_resumo, contar_pessoas, projetar_folha
+from projecao.rubricas import PLANO_RUBRICAS, avaliar_plano
+from projecao.tabelas import calcular_novo_salario, codificar_tabelas, gerar_grade_salarios, gerar_grades
+from projecao.tributos import calcular_tributos
+from projecao.varredura import preparar_folha
+
+PASTA_RESULTADOS = Path(__file__).parent / 'resultados'
+
+# Propostas comparadas com o cenário padrão na etapa de comparação
+PROPOSTAS = [{'TC': 3}, {'TR': 2.5}, {'indice_tabela': 1}, {'num_classes': 4, 'TC': 5},
+             {'TC': 2.5, 'TR': 2.5}, {'num_referencias': 7}, {'TC': 4, 'indice_tabela': 2}, {'TR': 1.5}]
+
+# Acima deste tamanho a folha sintética não é gravada em .xlsx (a escrita com openpyxl domina o tempo)
+MAX_LINHAS_EXCEL = 20_000
+
+
+def medir(funcao, repeticoes):
+    """Tempos de `repeticoes` execuções e o pico de memória (bytes) de uma execução extra."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'tempo_min_s': min(tempos),
+        'tempo_mediana_s': statistics.median(tempos),
+        'repeticoes': repeticoes,
+        'pico_memoria_bytes': pico,
+    }
+
+
+def etapas(df, pasta, max_linhas_excel):
+    """Etapas a medir para uma folha, na ordem do pipeline. Cada uma é uma função sem argumentos.
+
+    As entradas de cada etapa são calculadas antes, para que só a própria
+    etapa entre na medição.
+    """
+    p = PARAMETROS_PADRAO
+    grades = gerar_grades(p['TC'], p['TR'], p['num_classes'], p['num_referencias'])
+    codigos = codificar_tabelas(df)
+    novo_salario = calcular_novo_salario(df, grades, pular_indice=p['indice_tabela'], codigos=codigos)
+    rubricas = avaliar_plano(PLANO_RUBRICAS, df, colunas={'Novo Salário': novo_salario})
+    folha = projetar_folha(df, codigos, grades, p['indice_tabela'])
+    df_cenario = juntar(df, folha)
+    chaves = fatorar_chaves(df)
+    cubo, _ = agregar(chaves, df_cenario, somas=['VENCIMENTO BASE', 'Novo Salário'])
+
+    parquet = pasta / 'folha.parquet'
+    df.to_parquet(parquet, index=False)
+
+    medidas = {}
+    if len(df) <= max_linhas_excel:
+        excel = pasta / 'folha.xlsx'
+        df.to_excel(excel, sheet_name='amc', index=False)
+        # Leitura do .xlsx sem o cache Parquet (primeira carga de uma folha nova)
+        medidas['carregar_dados (excel)'] = lambda: pd.read_excel(excel, sheet_name='amc', decimal=',')
+        medidas['ler_aba (excel em blocos)'] = lambda: ler_aba(excel, 'amc', decimal=',')
+        carregar_planilha(excel, 'amc', decimal=',')
+        medidas['carregar_dados (cache parquet)'] = lambda: carregar_planilha(excel, 'amc', decimal=',')
+    medidas['carregar_folha (parquet)'] = lambda: carregar_folha(parquet)
+    medidas['exibir_tabela_salarios'] = lambda: gerar_grade_salarios(p['TC'], p['TR'], p['num_classes'], p['num_referencias'], 1160.66)
+    medidas['gerar_grades'] = lambda: gerar_grades(p['TC'], p['TR'], p['num_classes'], p['num_referencias'])
+    medidas['codificar_tabelas'] = lambda: codificar_tabelas(df)
+    medidas['calcular_novo_salario'] = lambda: calcular_novo_salario(df, grades, pular_indice=p['indice_tabela'], codigos=codigos)
+    medidas['rubricas (avaliar_plano)'] = lambda: avaliar_plano(PLANO_RUBRICAS, df, colunas={'Novo Salário': novo_salario})
+    medidas['calcular_tributos'] = lambda: calcular_tributos(rubricas['nova_0801-IPM PREVFOR'], rubricas['novo_0996-TOT.PROVENTO'])
+    medidas['fatorar_chaves'] = lambda: fatorar_chaves(df)
+    medidas['agregar (cubo)'] = lambda: agregar(chaves, df_cenario, somas=['VENCIMENTO BASE', 'Novo Salário'])
+    medidas['contar_pessoas'] = lambda: contar_pessoas(cubo)
+    medidas['calcular_impacto'] = lambda: calcular_impacto(cubo)
+    medidas['calcular_resumo'] = lambda: calcular_resumo(df, folha)
+    medidas['calcular_projecao (total)'] = lambda: calcular_projecao(df, p)
+    base = projetar_base(df, p)
+    medidas['comparar_cenarios (8 propostas)'] = lambda: comparar_cenarios(df, base, PROPOSTAS)
+    preparada, admissao = preparar_folha(df), anos_admissao(df)
+    medidas['simular_progressao (10 anos)'] = lambda: simular_progressao(preparada, admissao, p, np.arange(2025, 2035),
+                                                                         reajustes=[0] + [4.5] * 9, correcoes_irpf=[0] + [3] * 9)
+    # Meta alcançável na folha sintética: o impacto anual com TC = 7%
+    meta = avaliar_valores(preparada, 'IMPACTO ANUAL', 'TC', [7.0], {**p, 'salario_base': SALARIO_BASE_REFERENCIA})[0]
+    medidas['resolver_meta (impacto anual)'] = lambda: resolver_meta(preparada, df, 'IMPACTO ANUAL', meta, 'TC', 0, 20, p)
+    medidas['exportar_projecao (parquet)'] = lambda: exportar_projecao(df, grades, p['indice_tabela'], pasta / 'projecao.parquet',
+                                                                       codigos=codigos)
+    if len(df) <= max_linhas_excel:
+        medidas['exportar_projecao (xlsx)'] = lambda: exportar_projecao(df, grades, p['indice_tabela'], pasta / 'projecao.xlsx',
+                                                                        codigos=codigos)
+    return medidas
+
+
+def _versao_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(tamanhos, repeticoes, max_linhas_excel=MAX_LINHAS_EXCEL, semente=0):
+    resultados = []
+    for num_linhas in tamanhos:
+        df = gerar_folha(num_linhas, semente)
+        with tempfile.TemporaryDirectory(prefix='benchmark-') as pasta:
+            for etapa, funcao in etapas(df, Path(pasta), max_linhas_excel).items():
+                medida = medir(funcao, repeticoes)
+                resultados.append({'linhas': num_linhas, 'etapa': etapa, **medida})
+                print(f"{num_linhas:>9} {etapa:<32} {medida['tempo_min_s'] * 1000:>10.2f} ms "
+                      f"{medida['pico_memoria_bytes'] / 2**20:>9.1f} MiB", file=sys.stderr)
+        del df
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'versao': _versao_codigo(),
+        'ambiente': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'resultados': resultados,
+    }
+
+
+def comparar(atual, anterior):
+    """Razão entre os tempos mínimos (atual / anterior) de cada etapa e tamanho presentes nos dois."""
+    chave = lambda r: (r['linhas'], r['etapa'])
+    tempos_anteriores = {chave(r): r['tempo_min_s'] for r in anterior['resultados']}
+    print(f"Comparação com {anterior.get('versao')} ({anterior.get('data')}):", file=sys.stderr)
+    for r in atual['resultados']:
+        if chave(r) in tempos_anteriores:
+            print(f"{r['linhas']:>9} {r['etapa']:<32} {r['tempo_min_s'] / tempos_anteriores[chave(r)]:>6.2f}x",
+                  file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.executar', description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--max-linhas-excel', type=int, default=MAX_LINHAS_EXCEL)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', default=None, help='padrão: benchmarks/resultados/<data>.json')
+    parser.add_argument('--comparar', default=None, help='JSON de uma execução anterior')
+    args = parser.parse_args(argv)
+
+    relatorio = executar(args.linhas, args.repeticoes, args.max_linhas_excel, args.semente)
+
+    saida = Path(args.saida) if args.saida else PASTA_RESULTADOS / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(relatorio, indent=1, ensure_ascii=False), encoding='utf-8')
+    print(f'Resultados em {saida}', file=sys.stderr)
+
+    if args.comparar:
+        comparar(relatorio, json.loads(Path(args.comparar).read_text(encoding='utf-8')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Gerador de folhas sintéticas no esquema da aba `amc`, de qualquer tamanho.
+
+Os valores seguem as distribuições da folha real (cargos, níveis, cargas
+horárias, referências 1 a 30, frequência de cada rubrica), mas não copiam
+nenhum dado dela. As colunas calculadas da folha atual (0817, 0996, 0801,
+contribuições e IRPF) saem do próprio motor de rubricas com o vencimento base
+no lugar do novo salário, de modo que a folha gerada é coerente.
+"""
+import numpy as np
+import pandas as pd
+
+from projecao.rubricas import GRATIFICACOES_CARGO, PLANO_RUBRICAS, VANTAGENS_INCORPORADAS, avaliar_plano
+from projecao.tabelas import SALARIOS_BASE, codificar_tabelas
+from projecao.tributos import calcular_tributos
+
+CARGOS = {
+    'AGENTE MUNIC FISCALIZ DE TRANS': 0.95,
+    'AGENTE ADMINISTRATIVO         ': 0.04,
+    'ADMINISTRADOR                 ': 0.01,
+}
+NIVEIS = ['B1 ', 'B2 ', 'B3 ', 'C1 ', 'C2 ', 'C3 ', 'D1 ', 'D2 ', 'D3 ']
+
+# Rubricas percentuais: coluna da referência -> (fração de servidores com a rubrica, percentuais possíveis)
+PERCENTUAIS = {
+    'REF-ITA': (0.67, [5, 10, 15, 20, 25, 30, 35]),
+    'REF-ANUENIO': (1.0, list(range(4, 36))),
+    'REF-INSALUBRIDAD': (0.005, [10, 20]),
+    'REF-GR.PRODUT': (0.005, [50, 100]),
+    'REF-GAT': (0.97, [100]),
+    'REF-GEEF-AMC': (0.97, [70]),
+    'REF-GR.R.VIDA': (0.95, [40]),
+    'REF-GE AMC': (0.99, [100]),
+}
+
+# Referências das rubricas por hora: coluna -> (fração de servidores, quantidade máxima de horas)
+HORAS = {
+    'REF-HR.EXTR.INCO': (0.01, 60),
+    'REF-HR NOTURNAS': (0.70, 180),
+    'REF-GR SER EXTRA': (0.32, 52),
+    'REF-HE NOTURNA': (0.26, 52),
+}
+
+# Vantagens e gratificações em valor fixo: fração de servidores que recebe cada uma
+FRACAO_VALORES_FIXOS = 0.01
+
+
+def gerar_folha(num_linhas, semente=0):
+    """Folha sintética com `num_linhas` servidores e as colunas que o cálculo usa."""
+    gerador = np.random.default_rng(semente)
+
+    def presentes(fracao):
+        return gerador.random(num_linhas) < fracao
+
+    niv = gerador.choice(NIVEIS, num_linhas)
+    ch = gerador.choice([180.0, 240.0], num_linhas, p=[0.3, 0.7])
+    ref = gerador.integers(1, 31, num_linhas).astype(float)
+    base = np.array(list(SALARIOS_BASE.values()))[codificar_tabelas(pd.DataFrame({'Niv': niv, 'CH': ch}))]
+
+    df = pd.DataFrame({
+        'Emp': gerador.choice(['AMC', 'IPA'], num_linhas, p=[0.9, 0.1]),
+        'Prontuario': gerador.integers(200_000, 9_700_000, num_linhas).astype(float),
+        'Nome': pd.RangeIndex(num_linhas).map(lambda i: f'SERVIDOR {i:07d}'.ljust(60)),
+        'Orgao': 'A M C'.ljust(30),
+        'Cargo': gerador.choice(list(CARGOS), num_linhas, p=list(CARGOS.values())),
+        'Niv': niv,
+        'Ref': ref,
+        'CH': ch,
+        'VENCIMENTO BASE': np.round(base * 1.05 ** ((ref - 1) // 6) * 1.02 ** ((ref - 1) % 6), 4),
+    })
+
+    for coluna, (fracao, valores) in PERCENTUAIS.items():
+        df[coluna] = np.where(presentes(fracao), gerador.choice(valores, num_linhas), 0).astype(float)
+    for coluna, (fracao, maximo) in HORAS.items():
+        df[coluna] = np.where(presentes(fracao), gerador.integers(1, maximo + 1, num_linhas), 0).astype(float)
+    for coluna in VANTAGENS_INCORPORADAS + GRATIFICACOES_CARGO:
+        df[coluna] = np.where(presentes(FRACAO_VALORES_FIXOS), np.round(gerador.uniform(300, 4000, num_linhas), 2), 0.0)
+
+    # Colunas calculadas da folha atual: o plano de rubricas avaliado sobre o vencimento base
+    rubricas = avaliar_plano(PLANO_RUBRICAS, df, colunas={'Novo Salário': df['VENCIMENTO BASE'].to_numpy()})
+    tributos = calcular_tributos(rubricas['nova_0801-IPM PREVFOR'], rubricas['novo_0996-TOT.PROVENTO'])
+    for nome in rubricas.columns:
+        # Ex.: 'nova_0133-HR.EXTR.INCO' -> '0133-HR.EXTR.INCO'
+        df[nome.split('_', 1)[1].rstrip('_')] = rubricas[nome].to_numpy()
+    df['IPM PREVFOR-SERVIDOR'] = tributos['nova_IPM PREVFOR-SERVIDOR'].to_numpy()
+    df['IPM PREVFOR-PATRONAL'] = tributos['nova_IPM PREVFOR-PATRONAL'].to_numpy()
+    df['BASE IRPF'] = tributos['nova_base_IRPF'].to_numpy()
+    df['IRPF'] = tributos['nova_IRPF'].to_numpy()
+    return df
@@ -0,0 +1,62 @@
+"""Folha, cache de resultados e tabelas com cache do Streamlit, compartilhados pelo dashboard e por todas as páginas.
+
+Tudo o que lê a folha passa por aqui: o armazém é carregado uma única vez por
+processo (`st.cache_resource`), qualquer que seja a página aberta primeiro, e
+trocar de página não relê a planilha. Rodar `python -m projecao.aquecer` no
+deploy deixa a folha convertida e o cenário padrão prontos em disco para a
+primeira sessão (ver projecao/servico.py e projecao/aquecer.py).
+"""
+import streamlit as st
+import pandas as pd
+
+from projecao.armazem import selecionar_orgaos
+from projecao.diagnostico import execucao_registrada
+from projecao.progressao import anos_admissao
+from projecao.servico import abrir_armazem, abrir_cache_resultados
+from projecao.tabelas import gerar_grade_salarios, gerar_grades
+from projecao.varredura import preparar_folha
+
+# Função para carregar as folhas de todos os órgãos (abas de folha das planilhas em PROJECAO_PLANILHAS, padrão *.xlsx;
+# ver projecao/armazem.py). O armazém é um recurso compartilhado por todas as sessões (sem a cópia que o st.cache_data
+# faz a cada acesso) e fica somente leitura: as colunas de cada cenário vão para uma sobreposição à parte (ver projetar_folha)
+@st.cache_resource
+@execucao_registrada
+def carregar_folhas():
+    return abrir_armazem()
+
+# Cache de resultados dos cenários compartilhado por todas as sessões (ver projecao/cache_resultados.py). O orçamento
+# em memória vem de PROJECAO_CACHE_MB, a pasta da cópia em disco de PROJECAO_CACHE_PASTA (vazia: só memória) e a chave
+# que assina os arquivos de PROJECAO_CACHE_CHAVE
+@st.cache_resource
+def cache_resultados():
+    return abrir_cache_resultados()
+
+# Função para recortar do armazém a folha dos órgãos selecionados, sem reler as planilhas (sem órgãos: todos)
+def carregar_dados(orgaos=None):
+    armazem = carregar_folhas()
+    return selecionar_orgaos(armazem, orgaos or list(armazem.particoes))
+
+# Função para preparar a folha de todos os órgãos para as contas em lote (ver projecao/varredura.py)
+@st.cache_resource
+def carregar_folha_preparada():
+    return preparar_folha(carregar_dados())
+
+# Função para obter o ano de admissão de cada servidor de todos os órgãos (ver projecao/progressao.py)
+@st.cache_resource
+def carregar_admissao():
+    return anos_admissao(carregar_dados())
+
+# Função para criar a tabela de salários por classe e referência, TC e TR em % (valores numéricos; a formatação fica para a exibição)
+@st.cache_data
+@execucao_registrada
+def exibir_tabela_salarios(TC, TR, num_classes, num_referencias, salario_base, nome_tabela):
+    tabela = pd.DataFrame(gerar_grade_salarios(TC, TR, num_classes, num_referencias, salario_base),
+                          index=pd.RangeIndex(1, num_referencias + 1, name='Referência'),
+                          columns=pd.RangeIndex(1, num_classes + 1, name='Classe'))
+    return tabela
+
+# Função para montar a matriz densa das seis tabelas (nível x carga horária) usada na consulta do novo salário
+@st.cache_data
+@execucao_registrada
+def montar_grades_salariais(TC, TR, num_classes, num_referencias):
+    return gerar_grades(TC, TR, num_classes, num_referencias)
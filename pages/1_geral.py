@@ -1,60 +1,43 @@
 import streamlit as st
 import pandas as pd
 
+import compartilhado
+from projecao.agregacao import agregar, fatorar_chaves, por_cargo
+from projecao.diagnostico import NOTA_MEMORIA, Diagnostico, execucao_registrada, medido
+from projecao.formatacao import estilizar_colunas
+
 st.set_page_config(layout="wide")
 
-# Função para carregar os dados do Excel
+# Função para carregar a folha de todos os órgãos, do armazém compartilhado com as demais páginas (ver compartilhado.py)
+@medido('carregar_dados', cache=True)
 def carregar_dados():
-    return pd.read_excel("planilha_impacto_salarial.xlsx", sheet_name="amc")
+    return compartilhado.carregar_dados()
 
-# Função para substituir o ponto pela vírgula nos valores do DataFrame
-def substituir_ponto_por_virgula(df):
-    return df.applymap(lambda x: str(x).replace('.', ','))
+# Função para montar o cubo (Cargo, CH, Ref) com contagens e somas, em uma única passada pela folha (ver projecao/agregacao.py).
+# O cubo só depende da folha, então é montado uma vez e compartilhado entre as sessões
+@medido('montar_cubo', cache=True)
+@st.cache_resource
+@execucao_registrada
+def montar_cubo():
+    df = compartilhado.carregar_dados()
+    return agregar(fatorar_chaves(df), df, somas=['VENCIMENTO BASE'], contagem='VENCIMENTO BASE').celulas
 
 # Função para calcular a média salarial de cada cargo
-def calcular_media_salarial(df):
-    return df.groupby('Cargo')['VENCIMENTO BASE'].mean()
+@medido('calcular_media_salarial')
+def calcular_media_salarial(cubo):
+    cargos = por_cargo(cubo)
+    return (cargos['VENCIMENTO BASE'] / cargos['Quantidade VENCIMENTO BASE']).rename('VENCIMENTO BASE')
 
-# Função para criar e exibir a tabela de salários por classe e referência
+# Função para criar a tabela de salários por classe e referência (TC e TR aqui são fatores, ex.: 1.05)
+@medido('exibir_tabela_salarios', cache=True)
 def exibir_tabela_salarios(TC, TR, num_classes, num_referencias, salario_base, nome_tabela):
-    # Criando um DataFrame para armazenar os resultados
-    tabela = pd.DataFrame(index=range(1, num_referencias + 1), columns=range(1, num_classes + 1))
-    valores = {}  # Dicionário para armazenar os valores
-    
-    # Preenchendo a tabela com os valores de salário
-    for j in range(1, num_classes + 1):
-        for i in range(1, num_referencias + 1):
-            if i == 1 and j == 1:
-                valor = salario_base
-            elif i == 1:
-                valor = float(tabela.loc[num_referencias, j - 1]) * TC
-            else:
-                valor = float(tabela.loc[i - 1, j]) * TR
-            
-            # Armazenando o valor no dicionário
-            valores[(i, j)] = valor, i + (j - 1) * num_referencias
-            tabela.loc[i, j] = f"{valor:.2f}"  # Atribuindo o índice da célula com duas casas decimais
-                        
-    # Renomeando índices e colunas
-    tabela.index.name = 'Referência'
-    tabela.columns.name = 'Classe'
-    
-    return tabela, valores
+    return compartilhado.exibir_tabela_salarios((TC - 1) * 100, (TR - 1) * 100, num_classes, num_referencias, salario_base, nome_tabela)
 
-def contar_pessoas(df, cargo_selecionado):
-    # Filtrar o DataFrame pelo cargo selecionado
-    df_filtrado = df[df['Cargo'] == cargo_selecionado]
-    
-    # Contar pessoas por cargo, carga horária e referência
-    quantidade_pessoas = df_filtrado.groupby(['Cargo', 'CH', 'Ref'])['VENCIMENTO BASE'].size().reset_index(name='Quantidade')
-    
-    # Calcular o consolidado do VENCIMENTO BASE
-    consolidado_vencimento_base = df_filtrado.groupby(['Cargo', 'CH', 'Ref'])['VENCIMENTO BASE'].sum().reset_index(name='Consolidado VENCIMENTO BASE')
-    
-    # Concatenar o consolidado com a tabela de quantidade de pessoas
-    quantidade_pessoas = pd.merge(quantidade_pessoas, consolidado_vencimento_base, on=['Cargo', 'CH', 'Ref'])
-    
-    return quantidade_pessoas
+@medido('contar_pessoas')
+def contar_pessoas(cubo, cargo_selecionado):
+    # Recortar do cubo as células do cargo selecionado: quantidade e consolidado do VENCIMENTO BASE por carga horária e referência
+    quantidade_pessoas = cubo.loc[[cargo_selecionado], ['Quantidade', 'VENCIMENTO BASE']].reset_index()
+    return quantidade_pessoas.rename(columns={'VENCIMENTO BASE': 'Consolidado VENCIMENTO BASE'})
 
 def main():
     st.header(' :orange[Prefeitura de Fortaleza] ', divider='rainbow'   )
@@ -63,18 +46,20 @@ def main():
     
     # Carregar dados
     df = carregar_dados()
+    cubo = montar_cubo()
 
     # Adicionando imagem centralizada acima do título da sidebar
     st.sidebar.image('logo.png', width=150, use_column_width=True)
 
-    # Exibir filtro de cargo no painel lateral
-    cargo_selecionado = st.sidebar.selectbox('Selecione um cargo:', df['Cargo'].unique())
+    # Exibir filtro de cargo no painel lateral: só os cargos com células no cubo (sem vazios), na ordem da folha
+    cargos_cubo = cubo.index.get_level_values('Cargo').unique()
+    cargo_selecionado = st.sidebar.selectbox('Selecione um cargo:', [cargo for cargo in df['Cargo'].unique() if cargo in cargos_cubo])
     
     # Opção para escolher qual tabela será exibida
     tabela_selecionada = st.sidebar.selectbox('Selecione a tabela:', ['Tabela B - 180h', 'Tabela C - 180h', 'Tabela D - 180h'])
 
     # Calcular média salarial de cada cargo
-    media_salarial_cargos = calcular_media_salarial(df)
+    media_salarial_cargos = calcular_media_salarial(cubo)
 
     # Parâmetros Tabela 1
     st.sidebar.subheader('Tabela Personalizável')
@@ -100,9 +85,9 @@ def main():
     salario_base_d = 1582.67
 
     # Exibir e atualizar a tabela de salários por classe e referência (Tabela 1)
-    tabela_salarios1, valores1 = exibir_tabela_salarios(TC1, TR1, num_classes1, num_referencias1, salario_base1, 'Tabela personalizável')
+    tabela_salarios1 = exibir_tabela_salarios(TC1, TR1, num_classes1, num_referencias1, salario_base1, 'Tabela personalizável')
     col2.write("Tabela Personalizável")
-    tabela_salarios1 = col2.dataframe(tabela_salarios1, use_container_width=True)
+    col2.dataframe(estilizar_colunas(tabela_salarios1, moeda=tabela_salarios1.columns), use_container_width=True)
     
     indice_desejado = 6 # Índice desejado
 
@@ -113,24 +98,24 @@ def main():
     
     # Exibir e atualizar a tabela de salários por classe e referência (Tabela B)
     if tabela_selecionada == 'Tabela B - 180h':
-        tabela_salarios_b, valores_b = exibir_tabela_salarios(1.05, 1.02, num_classes_b, num_referencias_b, salario_base_b, 'Tabela B - 180h')
+        tabela_salarios_b = exibir_tabela_salarios(1.05, 1.02, num_classes_b, num_referencias_b, salario_base_b, 'Tabela B - 180h')
         col3.write("Tabela B - 180h")
-        col3.dataframe(tabela_salarios_b, use_container_width=True)
+        col3.dataframe(estilizar_colunas(tabela_salarios_b, moeda=tabela_salarios_b.columns), use_container_width=True)
 
     # Exibir e atualizar a tabela de salários por classe e referência (Tabela C)
     if tabela_selecionada == 'Tabela C - 180h':
-        tabela_salarios_c, valores_c = exibir_tabela_salarios(1.05, 1.02, num_classes_c, num_referencias_c, salario_base_c, 'Tabela C - 180h')
+        tabela_salarios_c = exibir_tabela_salarios(1.05, 1.02, num_classes_c, num_referencias_c, salario_base_c, 'Tabela C - 180h')
         col3.write("Tabela C - 180h")
-        col3.dataframe(tabela_salarios_c, use_container_width=True)
+        col3.dataframe(estilizar_colunas(tabela_salarios_c, moeda=tabela_salarios_c.columns), use_container_width=True)
 
     # Exibir e atualizar a tabela de salários por classe e referência (Tabela D)
     if tabela_selecionada == 'Tabela D - 180h':
-        tabela_salarios_d, valores_d = exibir_tabela_salarios(1.05, 1.02, num_classes_d, num_referencias_d, salario_base_d, 'Tabela D - 180h')
+        tabela_salarios_d = exibir_tabela_salarios(1.05, 1.02, num_classes_d, num_referencias_d, salario_base_d, 'Tabela D - 180h')
         col3.write("Tabela D - 180h")
-        col3.dataframe(tabela_salarios_d, use_container_width=True)
+        col3.dataframe(estilizar_colunas(tabela_salarios_d, moeda=tabela_salarios_d.columns), use_container_width=True)
 
     # Quantidade de pessoas por cargo, carga horária e referência
-    quantidade_pessoas = contar_pessoas(df, cargo_selecionado)
+    quantidade_pessoas = contar_pessoas(cubo, cargo_selecionado)
     
     # Adicionando o totalizador geral
     total_quantidade = quantidade_pessoas['Quantidade'].sum()
@@ -143,5 +128,16 @@ def main():
     st.write("Quantidade de pessoas por cargo, carga horária e referência:")
     st.dataframe(quantidade_pessoas)
 
+# Painel opcional com o diagnóstico da execução (o checkbox fica no fim da barra lateral)
+def exibir_diagnostico(diagnostico):
+    st.sidebar.checkbox('Diagnóstico de desempenho', key='diagnostico_geral')
+    if st.session_state['diagnostico_geral']:
+        with st.expander('Diagnóstico de desempenho', expanded=True):
+            st.write(f'Tempo total: {diagnostico.tempo_total * 1000:.0f} ms')
+            st.dataframe(diagnostico.tabela())
+            st.caption(NOTA_MEMORIA)
+
 if __name__ == '__main__':
-    main()
+    with Diagnostico('geral', memoria=st.session_state.get('diagnostico_geral', False)) as diagnostico:
+        main()
+    exibir_diagnostico(diagnostico)
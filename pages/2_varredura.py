@@ -0,0 +1,75 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from compartilhado import carregar_folha_preparada
+from projecao.formatacao import estilizar_colunas
+from projecao.varredura import INDICADORES, avaliar_cenarios, montar_cenarios
+
+st.set_page_config(layout="wide")
+
+# Copy-on-Write: recortes e junções da folha compartilhada não copiam dados
+pd.set_option('mode.copy_on_write', True)
+
+# Função para avaliar todos os cenários da grade de uma vez (ver projecao/varredura.py)
+@st.cache_data
+def varrer_cenarios(_folha, faixa_TC, faixa_TR, num_classes, num_referencias, indices_tabela):
+    cenarios = montar_cenarios(
+        TC=np.arange(faixa_TC[0], faixa_TC[1] + faixa_TC[2] / 2, faixa_TC[2]).round(4),
+        TR=np.arange(faixa_TR[0], faixa_TR[1] + faixa_TR[2] / 2, faixa_TR[2]).round(4),
+        num_classes=[num_classes], num_referencias=[num_referencias], indice_tabela=indices_tabela,
+    )
+    return avaliar_cenarios(_folha, cenarios)
+
+def main():
+    st.header(' :orange[Prefeitura de Fortaleza] ', divider='rainbow')
+
+    folha = carregar_folha_preparada()
+
+    # Adicionando imagem centralizada acima do título da sidebar
+    st.sidebar.image('logo.png', width=150, use_column_width=True)
+
+    # Faixas dos parâmetros da varredura
+    st.sidebar.subheader('Taxa de Classe (%)')
+    faixa_TC = (st.sidebar.number_input('TC inicial:', value=0.0, min_value=0.0),
+                st.sidebar.number_input('TC final:', value=10.0, min_value=0.0),
+                st.sidebar.number_input('TC passo:', value=0.5, min_value=0.01))
+    st.sidebar.subheader('Taxa de Referência (%)')
+    faixa_TR = (st.sidebar.number_input('TR inicial:', value=0.0, min_value=0.0),
+                st.sidebar.number_input('TR final:', value=5.0, min_value=0.0),
+                st.sidebar.number_input('TR passo:', value=0.5, min_value=0.01))
+    num_classes = st.sidebar.number_input('Número de Classes:', value=5, min_value=1)
+    num_referencias = st.sidebar.number_input('Número de Referências:', value=6, min_value=1)
+    indices_tabela = st.sidebar.multiselect('Enquadramentos:', list(range(0, 11)), default=[0, 1, 2, 3])
+    if not indices_tabela:
+        st.warning('Selecione ao menos um enquadramento.')
+        return
+
+    resultado = varrer_cenarios(folha, faixa_TC, faixa_TR, num_classes, num_referencias, tuple(indices_tabela))
+    st.write(f"{len(resultado)} cenários avaliados.")
+
+    indicador = st.selectbox('Indicador:', list(INDICADORES))
+    indice_tabela = st.selectbox('Enquadramento do mapa:', indices_tabela)
+
+    # Mapa de calor TC x TR para o enquadramento escolhido (o Plotly só é importado quando os gráficos são desenhados)
+    import plotly.express as px
+    mapa = resultado[resultado['indice_tabela'] == indice_tabela].pivot(index='TR', columns='TC', values=indicador)
+    fig_mapa = px.imshow(mapa, origin='lower', aspect='auto', color_continuous_scale='RdYlGn_r',
+                         labels={'x': 'Taxa de Classe (%)', 'y': 'Taxa de Referência (%)', 'color': indicador},
+                         title=f'{indicador} por Taxa de Classe e Taxa de Referência')
+    st.plotly_chart(fig_mapa, use_container_width=True)
+
+    # Curvas do indicador pela Taxa de Classe, uma por enquadramento, na TR escolhida
+    TR = st.select_slider('Taxa de Referência (%) das curvas:', options=sorted(resultado['TR'].unique()))
+    curvas = resultado[resultado['TR'] == TR]
+    fig_curvas = px.line(curvas, x='TC', y=indicador, color='indice_tabela', markers=True,
+                         labels={'TC': 'Taxa de Classe (%)', 'indice_tabela': 'Enquadramento'},
+                         title=f'{indicador} por Taxa de Classe (TR = {TR}%)')
+    st.plotly_chart(fig_curvas, use_container_width=True)
+
+    st.write("Todos os cenários:")
+    st.dataframe(estilizar_colunas(resultado, moeda=[coluna for coluna in INDICADORES if coluna != 'PERCENTUAL AUMENTO EFETIVO'],
+                                   percentuais=['PERCENTUAL AUMENTO EFETIVO']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import streamlit as st
+import pandas as pd
+
+from compartilhado import carregar_dados
+from projecao.comparacao import comparar_cenarios, comparar_indicadores, lado_a_lado, projetar_base
+from projecao.formatacao import estilizar_colunas
+from projecao.resumo import PARAMETROS_PADRAO
+from projecao.varredura import INDICADORES
+
+st.set_page_config(layout="wide")
+
+# Copy-on-Write: recortes e junções da folha compartilhada não copiam dados
+pd.set_option('mode.copy_on_write', True)
+
+# Propostas iniciais: a primeira linha é a base, as demais são comparadas com ela
+PROPOSTAS_INICIAIS = pd.DataFrame([
+    {'Cenário': 'Base', **PARAMETROS_PADRAO},
+    {'Cenário': 'Proposta 1', **PARAMETROS_PADRAO, 'TC': 3},
+    {'Cenário': 'Proposta 2', **PARAMETROS_PADRAO, 'TR': 2.5},
+]).astype({'TC': float, 'TR': float})
+
+COLUNAS_PROPOSTAS = {
+    'Cenário': st.column_config.TextColumn(required=True),
+    'TC': st.column_config.NumberColumn('Taxa de Classe (%)', min_value=0.0, step=0.1, required=True),
+    'TR': st.column_config.NumberColumn('Taxa de Referência (%)', min_value=0.0, step=0.1, required=True),
+    'num_classes': st.column_config.NumberColumn('Número de Classes', min_value=1, step=1, required=True),
+    'num_referencias': st.column_config.NumberColumn('Número de Referências', min_value=1, step=1, required=True),
+    'indice_tabela': st.column_config.NumberColumn('Enquadramento', min_value=0, step=1, required=True),
+}
+
+# Tabelas do resumo comparadas lado a lado
+TABELAS = {
+    'resumo_cargos': 'Impacto por cargo e encargos',
+    'suavizacoes': 'Suavizações (IRPF e IPM-PREVIFOR)',
+    'totais': 'Totais',
+}
+
+# Função para projetar o cenário base por inteiro (as alternativas são calculadas como diferença sobre ele)
+@st.cache_resource(max_entries=8)
+def preparar_base(_dados, TC, TR, num_classes, num_referencias, indice_tabela):
+    return projetar_base(_dados, dict(TC=TC, TR=TR, num_classes=num_classes, num_referencias=num_referencias, indice_tabela=indice_tabela))
+
+# Função para calcular todas as alternativas de uma vez sobre a base (ver projecao/comparacao.py)
+@st.cache_data
+def comparar_propostas(_dados, base, alternativas):
+    return comparar_cenarios(_dados, preparar_base(_dados, **base), [dict(alternativa) for alternativa in alternativas])
+
+def main():
+    st.header(' :orange[Prefeitura de Fortaleza] ', divider='rainbow')
+
+    # Adicionando imagem centralizada acima do título da sidebar
+    st.sidebar.image('logo.png', width=150, use_column_width=True)
+
+    dados = carregar_dados()
+
+    st.subheader('Comparativo de propostas')
+    st.write('A primeira linha é a base; cada proposta é comparada com ela.')
+    propostas = st.data_editor(PROPOSTAS_INICIAIS, column_config=COLUNAS_PROPOSTAS, num_rows='dynamic',
+                               hide_index=True, key='propostas').dropna()
+    if len(propostas) < 2:
+        st.warning('Informe a base e ao menos uma proposta.')
+        return
+    if propostas['Cenário'].duplicated().any():
+        st.warning('Os nomes dos cenários devem ser distintos.')
+        return
+
+    parametros = [{chave: float(linha[chave]) if chave in ('TC', 'TR') else int(linha[chave]) for chave in PARAMETROS_PADRAO}
+                  for _, linha in propostas.iterrows()]
+    nomes = propostas['Cenário'].tolist()
+    base = preparar_base(dados, **parametros[0])
+    resumos = [base.resumo] + comparar_propostas(dados, parametros[0], tuple(tuple(p.items()) for p in parametros[1:]))
+
+    st.caption(' | '.join(f'{nome}: {resumo["servidores_recalculados"]} de {len(dados)} servidores recalculados'
+                          for nome, resumo in zip(nomes[1:], resumos[1:])))
+
+    # Indicadores de cada cenário
+    indicadores = comparar_indicadores(resumos, nomes)
+    moeda = [coluna for coluna in INDICADORES if coluna != 'PERCENTUAL AUMENTO EFETIVO']
+    st.dataframe(estilizar_colunas(indicadores, moeda=moeda, percentuais=['PERCENTUAL AUMENTO EFETIVO']))
+
+    # Tabelas do resumo de todos os cenários lado a lado
+    for tabela, titulo in TABELAS.items():
+        st.header(f'{titulo}:')
+        comparada = lado_a_lado(resumos, nomes, tabela)
+        valores = [coluna for coluna in comparada.columns if coluna not in ('Cargo', 'Item', 'Quantidade')]
+        st.dataframe(estilizar_colunas(comparada, moeda=valores, inteiros=['Quantidade'] if 'Quantidade' in comparada else ()))
+
+if __name__ == '__main__':
+    main()
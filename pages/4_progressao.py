@@ -0,0 +1,76 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from datetime import date
+
+from compartilhado import carregar_admissao, carregar_folha_preparada
+from projecao.formatacao import estilizar_colunas
+from projecao.progressao import RegrasProgressao, simular_progressao
+
+st.set_page_config(layout="wide")
+
+# Copy-on-Write: recortes e junções da folha compartilhada não copiam dados
+pd.set_option('mode.copy_on_write', True)
+
+# Colunas de quantidades e percentuais da simulação (as demais são valores em reais)
+COLUNAS_NAO_MOEDA = ['Reajuste acumulado (%)', 'Progressões no ano', 'PERCENTUAL AUMENTO EFETIVO']
+
+# Função para simular todos os anos do horizonte de uma vez (ver projecao/progressao.py)
+@st.cache_data
+def simular(_folha, _admissao, parametros, anos, intersticio, referencias, reajustes, correcoes_irpf):
+    return simular_progressao(_folha, _admissao, dict(parametros), anos, RegrasProgressao(intersticio, referencias),
+                              reajustes, correcoes_irpf)
+
+def main():
+    st.header(' :orange[Prefeitura de Fortaleza] ', divider='rainbow')
+
+    folha, admissao = carregar_folha_preparada(), carregar_admissao()
+
+    # Adicionando imagem centralizada acima do título da sidebar
+    st.sidebar.image('logo.png', width=150, use_column_width=True)
+
+    # Parâmetros do plano
+    st.sidebar.header('Configurações')
+    parametros = (
+        ('indice_tabela', int(st.sidebar.number_input('Enquadramento:', min_value=0, value=0))),
+        ('TC', float(st.sidebar.number_input('Taxa de Classe (%):', value=2.0))),
+        ('TR', float(st.sidebar.number_input('Taxa de Referência (%):', value=2.0))),
+        ('num_classes', int(st.sidebar.number_input('Número de Classes:', value=5, min_value=1))),
+        ('num_referencias', int(st.sidebar.number_input('Número de Referências:', value=6, min_value=1))),
+    )
+
+    # Horizonte e regras de progressão
+    st.sidebar.subheader('Progressão')
+    ano_inicial = st.sidebar.number_input('Ano inicial:', value=date.today().year, step=1)
+    num_anos = st.sidebar.number_input('Número de anos:', value=4, min_value=1, max_value=30)
+    intersticio = st.sidebar.number_input('Interstício (anos entre progressões):', value=2, min_value=1)
+    referencias = st.sidebar.number_input('Referências por progressão:', value=1, min_value=0)
+    reajuste = st.sidebar.number_input('Reajuste anual das tabelas (%):', value=0.0)
+    correcao = st.sidebar.number_input('Correção anual das faixas do IRPF (%):', value=0.0)
+
+    # Percentuais de cada ano, editáveis; o primeiro ano é a folha atual com o plano
+    anos = np.arange(ano_inicial, ano_inicial + num_anos)
+    st.subheader('Reajustes por ano')
+    percentuais = st.data_editor(
+        pd.DataFrame({'Reajuste das tabelas (%)': [0.0] + [reajuste] * (num_anos - 1),
+                      'Correção das faixas do IRPF (%)': [0.0] + [correcao] * (num_anos - 1)},
+                     index=pd.Index(anos, name='Ano')),
+        key=f'percentuais_{ano_inicial}_{num_anos}_{reajuste}_{correcao}').fillna(0.0)
+
+    resultado = simular(folha, admissao, parametros, tuple(anos), intersticio, referencias,
+                        tuple(percentuais['Reajuste das tabelas (%)']), tuple(percentuais['Correção das faixas do IRPF (%)']))
+
+    # Impacto de cada ano e acumulado no horizonte (o Plotly só é importado quando o gráfico é desenhado)
+    import plotly.express as px
+    fig = px.bar(resultado.reset_index(), x='Ano', y='Impacto Líquido Anual', title='Impacto Líquido Anual por Ano',
+                 labels={'Impacto Líquido Anual': 'Valor'})
+    fig.add_scatter(x=resultado.index, y=resultado['Impacto Líquido Acumulado'], name='Acumulado', mode='lines+markers')
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.subheader('Folha, encargos e impacto por ano')
+    st.dataframe(estilizar_colunas(resultado, moeda=[coluna for coluna in resultado.columns if coluna not in COLUNAS_NAO_MOEDA],
+                                   inteiros=['Progressões no ano'],
+                                   percentuais=['Reajuste acumulado (%)', 'PERCENTUAL AUMENTO EFETIVO']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import streamlit as st
+import pandas as pd
+
+from compartilhado import carregar_dados, carregar_folha_preparada, exibir_tabela_salarios
+from projecao.formatacao import estilizar_colunas, formatar_moeda, formatar_numero
+from projecao.metas import PARAMETROS_LIVRES, SALARIO_BASE_REFERENCIA, TOLERANCIAS, resolver_meta
+
+st.set_page_config(layout="wide")
+
+# Copy-on-Write: recortes e junções da folha compartilhada não copiam dados
+pd.set_option('mode.copy_on_write', True)
+
+# Rótulo e mínimo e máximo iniciais da busca de cada parâmetro que pode ser resolvido
+FAIXAS_BUSCA = {
+    'TC': ('Taxa de Classe (%)', 0.0, 20.0),
+    'TR': ('Taxa de Referência (%)', 0.0, 20.0),
+    'salario_base': ('Salário Base', 500.0, 3000.0),
+}
+# Parâmetros que podem ser resolvidos (os de projecao.metas): rótulo -> (parâmetro, mínimo, máximo)
+ROTULOS_PARAMETROS = {FAIXAS_BUSCA[parametro][0]: (parametro, *FAIXAS_BUSCA[parametro][1:]) for parametro in PARAMETROS_LIVRES}
+
+# Colunas em reais das tabelas de resultado
+COLUNAS_MOEDA = ['Remuneração Anterior', 'Remuneração Nova', 'Impacto']
+
+# Função para buscar o parâmetro que atinge a meta (ver projecao/metas.py)
+@st.cache_data
+def buscar(_dados, _folha, indicador, meta, livre, minimo, maximo, fixos):
+    return resolver_meta(_folha, _dados, indicador, meta, livre, minimo, maximo, dict(fixos))
+
+def main():
+    st.header(' :orange[Prefeitura de Fortaleza] ', divider='rainbow')
+
+    dados, folha = carregar_dados(), carregar_folha_preparada()
+
+    # Adicionando imagem centralizada acima do título da sidebar
+    st.sidebar.image('logo.png', width=150, use_column_width=True)
+
+    # Meta e parâmetro a resolver
+    st.sidebar.header('Meta')
+    indicador = st.sidebar.selectbox('Indicador:', list(TOLERANCIAS))
+    if indicador == 'IMPACTO ANUAL':
+        meta = st.sidebar.number_input('Impacto anual (R$):', value=1_000_000.0, step=10_000.0)
+    else:
+        meta = st.sidebar.number_input('Percentual de aumento efetivo (%):', value=5.0, step=0.1)
+    rotulo = st.sidebar.selectbox('Parâmetro a resolver:', list(ROTULOS_PARAMETROS))
+    livre, minimo, maximo = ROTULOS_PARAMETROS[rotulo]
+    minimo = st.sidebar.number_input(f'{rotulo} mínimo:', value=minimo)
+    maximo = st.sidebar.number_input(f'{rotulo} máximo:', value=maximo)
+
+    # Demais parâmetros, fixos na busca
+    st.sidebar.header('Parâmetros fixos')
+    fixos = {
+        'indice_tabela': int(st.sidebar.number_input('Enquadramento:', min_value=0, value=0)),
+        'num_classes': int(st.sidebar.number_input('Número de Classes:', value=5, min_value=1)),
+        'num_referencias': int(st.sidebar.number_input('Número de Referências:', value=6, min_value=1)),
+    }
+    for rotulo_fixo, (parametro, _, _) in ROTULOS_PARAMETROS.items():
+        if parametro != livre:
+            padrao = SALARIO_BASE_REFERENCIA if parametro == 'salario_base' else 2.0
+            fixos[parametro] = float(st.sidebar.number_input(f'{rotulo_fixo}:', value=padrao, min_value=0.0))
+
+    if not minimo < maximo:
+        st.warning('O máximo deve ser maior que o mínimo.')
+        return
+
+    solucao = buscar(dados, folha, indicador, meta, livre, minimo, maximo, tuple(sorted(fixos.items())))
+    valor = formatar_moeda(solucao.valor) if indicador == 'IMPACTO ANUAL' else f'{formatar_numero(solucao.valor)} %'
+
+    st.subheader('Parâmetro encontrado')
+    col1, col2 = st.columns(2)
+    col1.text(f'{rotulo}:')
+    col1.info(formatar_numero(solucao.parametros[livre], 4))
+    col2.text(f'{indicador}:')
+    col2.info(valor)
+    if solucao.atingida:
+        st.caption(f'Meta atingida em {solucao.rodadas} rodadas ({solucao.avaliacoes} cenários avaliados).')
+    else:
+        st.warning(f'A meta não é alcançável com {rotulo} entre {formatar_numero(minimo)} e {formatar_numero(maximo)}; '
+                   'o valor mostrado é o extremo mais próximo.')
+    if livre == 'salario_base' or fixos.get('salario_base', SALARIO_BASE_REFERENCIA) != SALARIO_BASE_REFERENCIA:
+        st.caption('O Salário Base é o da tabela C/180; as seis tabelas são escaladas na mesma proporção.')
+
+    # Tabela salarial do plano encontrado e tabelas de resultado completas
+    p = solucao.parametros
+    st.write("Tabela Salarial (C/180)")
+    tabela = exibir_tabela_salarios(p['TC'], p['TR'], p['num_classes'], p['num_referencias'], p['salario_base'],
+                                    'Tabela Salarial (C/180)')
+    st.dataframe(estilizar_colunas(tabela, moeda=tabela.columns), use_container_width=True)
+
+    resultado = solucao.resultado
+    st.header("Impacto da Reestruturação do PCCS da Gestão do Trânsito:")
+    st.dataframe(estilizar_colunas(resultado['resumo_cargos'], moeda=COLUNAS_MOEDA, inteiros=['Quantidade']))
+
+    st.header("Suavizações:")
+    st.dataframe(estilizar_colunas(resultado['suavizacoes'], moeda=COLUNAS_MOEDA))
+
+    st.header("Totais:")
+    st.dataframe(estilizar_colunas(resultado['totais'], moeda=COLUNAS_MOEDA))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Cálculos da projeção de impacto salarial usados pelo dashboard."""
@@ -0,0 +1,95 @@
+"""Calcula um cenário do plano sem o Streamlit e grava as tabelas de resultado.
+
+Uso::
+
+    python -m projecao planilha_impacto_salarial.xlsx --TC 3 --TR 2.5 --indice-tabela 1 --saida resultado.json
+    python -m projecao folha.parquet --saida resultados/ --formato csv
+    python -m projecao planilha_impacto_salarial.xlsx --TC 3 --servidores projecao.parquet
+
+Em JSON, as três tabelas e os indicadores vão para um único arquivo (ou para a
+saída padrão, sem `--saida`); em CSV, cada tabela vira um arquivo na pasta
+indicada. Com `--servidores`, a projeção por servidor (novo salário, rubricas
+e tributos) é gravada também, em .xlsx ou .parquet (ver projecao/exportacao.py).
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from projecao.dados import carregar_folha
+from projecao.exportacao import FORMATOS, exportar_projecao
+from projecao.resumo import PARAMETROS_PADRAO, calcular_projecao
+from projecao.tabelas import gerar_grades
+
+# Tabelas do resultado gravadas pela linha de comando
+TABELAS = ['resumo_cargos', 'suavizacoes', 'totais']
+
+
+def _tabela(resultado, nome):
+    tabela = resultado[nome]
+    # O resumo por cargo usa rótulos de linha ('Total', '') que não estão em nenhuma coluna
+    if nome == 'resumo_cargos':
+        tabela = tabela.reset_index(names='Linha')
+    return tabela
+
+
+def _registros(tabela):
+    return json.loads(tabela.to_json(orient='records', force_ascii=False))
+
+
+def gravar_json(resultado, parametros, destino):
+    conteudo = {
+        'parametros': parametros,
+        **{nome: _registros(_tabela(resultado, nome)) for nome in TABELAS},
+        'indicadores': {chave: float(valor) for chave, valor in resultado['indicadores'].items()},
+    }
+    json.dump(conteudo, destino, ensure_ascii=False, indent=1)
+
+
+def gravar_csv(resultado, pasta):
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    for nome in TABELAS:
+        _tabela(resultado, nome).to_csv(pasta / f'{nome}.csv', index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m projecao',
+                                     description='Projeção do impacto salarial de um cenário do plano de cargos.')
+    parser.add_argument('planilha', help='folha em .xlsx (aba --aba) ou .parquet')
+    parser.add_argument('--aba', default='amc')
+    parser.add_argument('--TC', type=float, default=PARAMETROS_PADRAO['TC'], help='taxa de classe (%%)')
+    parser.add_argument('--TR', type=float, default=PARAMETROS_PADRAO['TR'], help='taxa de referência (%%)')
+    parser.add_argument('--num-classes', type=int, default=PARAMETROS_PADRAO['num_classes'])
+    parser.add_argument('--num-referencias', type=int, default=PARAMETROS_PADRAO['num_referencias'])
+    parser.add_argument('--indice-tabela', type=int, default=PARAMETROS_PADRAO['indice_tabela'], help='enquadramento')
+    parser.add_argument('--formato', choices=['json', 'csv'], default=None,
+                        help='padrão: pela extensão de --saida (json se não houver)')
+    parser.add_argument('--saida', default=None, help='arquivo .json ou pasta dos .csv')
+    parser.add_argument('--servidores', default=None, help='arquivo .xlsx ou .parquet para a projeção por servidor')
+    args = parser.parse_args(argv)
+
+    formato = args.formato or ('csv' if args.saida and not args.saida.lower().endswith('.json') else 'json')
+    if formato == 'csv' and args.saida is None:
+        parser.error('--saida (pasta) é obrigatória no formato csv')
+    if args.servidores and Path(args.servidores).suffix.lstrip('.').lower() not in FORMATOS:
+        parser.error(f'--servidores deve terminar em {" ou ".join("." + f for f in FORMATOS)}')
+
+    parametros = {chave: getattr(args, chave) for chave in PARAMETROS_PADRAO}
+    dados = carregar_folha(args.planilha, args.aba)
+    resultado = calcular_projecao(dados, parametros)
+    if args.servidores:
+        grades = gerar_grades(parametros['TC'], parametros['TR'], parametros['num_classes'], parametros['num_referencias'])
+        exportar_projecao(dados, grades, parametros['indice_tabela'], args.servidores)
+
+    if formato == 'csv':
+        gravar_csv(resultado, args.saida)
+    elif args.saida is None:
+        gravar_json(resultado, parametros, sys.stdout)
+    else:
+        with open(args.saida, 'w', encoding='utf-8') as destino:
+            gravar_json(resultado, parametros, destino)
+
+
+if __name__ == '__main__':
+    main()
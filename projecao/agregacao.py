@@ -0,0 +1,76 @@
+"""Agregação da folha em um cubo (Cargo, CH, Ref) com uma única passada sobre as linhas.
+
+As chaves são fatoradas uma vez por folha (`fatorar_chaves`): cada servidor
+recebe o número da sua célula no cubo. Por cenário, `agregar` faz só um
+`np.bincount` por coluna somada sobre esses números. As visões por cargo e os
+totais gerais saem do cubo (poucas dezenas de células), nunca de outra
+varredura das linhas.
+
+Linhas sem alguma das chaves (ex.: linhas vazias no fim da planilha) ficam
+fora do cubo, como no `groupby`, mas seus valores entram nos totais gerais,
+como em `Series.sum()`.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+CHAVES_CUBO = ['Cargo', 'CH', 'Ref']
+
+# `celulas`: célula de cada linha (a última, `len(indice)`, reúne as linhas sem chave);
+# `indice`: MultiIndex de todas as células do cubo, na ordem do groupby
+ChavesCubo = namedtuple('ChavesCubo', ['celulas', 'indice'])
+
+Cubo = namedtuple('Cubo', ['celulas', 'totais'])
+
+
+def _nivel_simples(nivel):
+    # Chaves categóricas e inteiras com vazios (ver projecao/esquema.py) viram índices comuns,
+    # com os mesmos rótulos do groupby sobre as colunas originais
+    nivel = pd.Index(nivel)
+    if isinstance(nivel.dtype, pd.CategoricalDtype):
+        nivel = pd.Index(np.asarray(nivel))
+    if isinstance(nivel.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_numeric_dtype(nivel.dtype):
+        nivel = pd.Index(nivel.to_numpy(dtype=float, na_value=np.nan))
+    return nivel
+
+
+def fatorar_chaves(df, chaves=CHAVES_CUBO):
+    """Numera as células (Cargo, CH, Ref) de cada linha; independe do cenário."""
+    codigos, niveis = zip(*(pd.factorize(df[chave], sort=True) for chave in chaves))
+    niveis = [_nivel_simples(nivel) for nivel in niveis]
+    formas = tuple(len(nivel) for nivel in niveis)
+    validos = np.logical_and.reduce([codigo >= 0 for codigo in codigos])
+    num_celulas = int(np.prod(formas))
+    celulas = np.full(len(df), num_celulas, dtype=np.intp)
+    celulas[validos] = np.ravel_multi_index([codigo[validos] for codigo in codigos], formas)
+    indice = pd.MultiIndex.from_product(niveis, names=list(chaves))
+    return ChavesCubo(celulas, indice)
+
+
+def agregar(chaves, df, somas, contagem='Nome'):
+    """Contagens e somas de cada célula do cubo em uma passada.
+
+    `somas` são as colunas somadas (vazios contam como zero). O cubo tem as
+    colunas `Quantidade` (linhas), `Quantidade <contagem>` (valores não vazios
+    da coluna de contagem, como o `count` do groupby) e uma por coluna somada,
+    só com as células ocupadas. `totais` tem as somas sobre todas as linhas.
+    """
+    num_bins = len(chaves.indice) + 1
+    valores = {'Quantidade': np.bincount(chaves.celulas, minlength=num_bins)}
+    valores[f'Quantidade {contagem}'] = np.bincount(chaves.celulas, weights=df[contagem].notna().to_numpy(),
+                                                    minlength=num_bins).astype(np.int64)
+    for coluna in somas:
+        pesos = np.asarray(df[coluna], dtype=float)
+        valores[coluna] = np.bincount(chaves.celulas, weights=np.where(np.isnan(pesos), 0.0, pesos), minlength=num_bins)
+
+    totais = pd.Series({coluna: valor.sum() for coluna, valor in valores.items()})
+    ocupadas = valores['Quantidade'][:-1] > 0
+    cubo = pd.DataFrame({coluna: valor[:-1][ocupadas] for coluna, valor in valores.items()},
+                        index=chaves.indice[ocupadas])
+    return Cubo(cubo, totais)
+
+
+def por_cargo(cubo):
+    """Soma o cubo até o nível de cargo."""
+    return cubo.groupby(level='Cargo', sort=True).sum()
@@ -0,0 +1,71 @@
+"""Aquece os caches do dashboard antes da primeira sessão: a folha convertida e os resultados do cenário padrão.
+
+Uso (ex.: no deploy, antes de `streamlit run dashboard.py`)::
+
+    python -m projecao.aquecer
+    python -m projecao.aquecer --vizinhos
+
+Lê as planilhas como o dashboard (o que grava o cache Parquet de cada aba,
+ver `projecao.dados.carregar_planilha`) e calcula o cenário inicial da barra
+lateral com todos os órgãos, gravando o resultado na pasta do cache de
+resultados (`PROJECAO_CACHE_PASTA`), assinado com a mesma chave do dashboard
+(`PROJECAO_CACHE_CHAVE`, ver projecao/cache_resultados.py). Com `--vizinhos`,
+também os cenários a um passo dele. A primeira sessão depois de um deploy
+encontra a folha e o resumo prontos em disco, em vez de converter a planilha
+e calcular o cenário.
+"""
+import argparse
+import os
+import sys
+import time
+
+from projecao.agregacao import fatorar_chaves
+from projecao.especulacao import vizinhos
+from projecao.resumo import PARAMETROS_PADRAO
+from projecao.servico import MINIMOS_VIZINHOS, PASSOS_VIZINHOS, abrir_armazem, abrir_cache_resultados, chave_cenario, resumir
+from projecao.tabelas import codificar_tabelas, gerar_grades
+
+
+def aquecer(armazem, cache, cenarios):
+    """Calcula pelo cache cada cenário de `cenarios` (parâmetros do plano) com todos os órgãos do armazém."""
+    orgaos = tuple(armazem.particoes)
+    dados = armazem.folha
+    codigos, chaves = codificar_tabelas(dados), fatorar_chaves(dados)
+    for parametros in cenarios:
+        chave = chave_cenario(armazem.impressao, orgaos, **parametros)
+        grades = gerar_grades(parametros['TC'], parametros['TR'], parametros['num_classes'], parametros['num_referencias'])
+        resumir(cache, chave, dados, codigos, grades, chaves, parametros['indice_tabela'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m projecao.aquecer',
+                                     description='Aquece a folha convertida e o cache de resultados do dashboard.')
+    parser.add_argument('--vizinhos', action='store_true', help='aquece também os cenários a um passo do padrão')
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    armazem = abrir_armazem()
+    print(f'Folha: {len(armazem.folha)} servidores de {len(armazem.particoes)} órgão(s) '
+          f'em {time.perf_counter() - inicio:.2f} s', file=sys.stderr)
+
+    cache = abrir_cache_resultados()
+    if cache.pasta is None:
+        print('PROJECAO_CACHE_PASTA vazia: os resultados ficariam só na memória deste processo; cenários não aquecidos.',
+              file=sys.stderr)
+        return
+    if not os.environ.get('PROJECAO_CACHE_CHAVE'):
+        print('PROJECAO_CACHE_CHAVE vazia: o dashboard não leria os arquivos assinados por este processo; '
+              'cenários não aquecidos.', file=sys.stderr)
+        return
+
+    cenarios = [dict(PARAMETROS_PADRAO)]
+    if args.vizinhos:
+        cenarios += vizinhos(PARAMETROS_PADRAO, PASSOS_VIZINHOS, MINIMOS_VIZINHOS)
+    inicio = time.perf_counter()
+    aquecer(armazem, cache, cenarios)
+    print(f'{len(cenarios)} cenário(s) em {cache.pasta} em {time.perf_counter() - inicio:.2f} s '
+          f'({cache.acertos_disco} já estavam em disco)', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
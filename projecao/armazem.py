@@ -0,0 +1,115 @@
+"""Folhas de vários órgãos, de várias planilhas, em um único armazém particionado por órgão.
+
+Cada aba de folha de pagamento (como a aba `amc`) é a folha de um órgão; o
+órgão é o nome da aba em maiúsculas, e abas de mesmo nome em planilhas
+diferentes são do mesmo órgão. As abas são lidas em streaming pelo cache de
+`carregar_planilha` e, havendo mais de uma, em paralelo (uma por processo).
+Abas cujo cabeçalho não tem as colunas de uma folha (ex.: `salary_data`)
+ficam de fora.
+
+O armazém guarda todas as folhas concatenadas, agrupadas por órgão, e a faixa
+de linhas de cada órgão: selecionar órgãos é um recorte, sem reler nada.
+"""
+import glob
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from projecao.dados import carregar_planilha, impressao_digital
+from projecao.esquema import aplicar_esquema
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Planilhas lidas quando nenhuma é indicada (no diretório de trabalho)
+PADRAO_PLANILHAS = '*.xlsx'
+
+# Colunas que identificam uma aba como folha de pagamento
+COLUNAS_FOLHA = ['Cargo', 'Niv', 'Ref', 'CH', 'VENCIMENTO BASE']
+
+# `folha`: todas as folhas, agrupadas por órgão; `particoes`: órgão -> slice das linhas do órgão em `folha`;
+# `impressao`: impressão digital do conteúdo da folha (chave dos caches de resultados)
+ArmazemFolhas = namedtuple('ArmazemFolhas', ['folha', 'particoes', 'impressao'])
+
+
+def encontrar_planilhas(padrao=PADRAO_PLANILHAS):
+    """Planilhas que casam com `padrao` (padrões separados por os.pathsep), sem os arquivos de trava do Excel."""
+    caminhos = set()
+    for parte in padrao.split(os.pathsep):
+        caminhos.update(caminho for caminho in glob.glob(parte) if not os.path.basename(caminho).startswith('~$'))
+    return sorted(caminhos)
+
+
+def listar_abas(caminho, colunas=COLUNAS_FOLHA):
+    """Abas da planilha cujo cabeçalho tem todas as `colunas` (só a primeira linha de cada aba é lida)."""
+    if openpyxl is None:
+        abas = pd.read_excel(caminho, sheet_name=None, nrows=0)
+        return [aba for aba, df in abas.items() if set(colunas) <= set(df.columns.map(str).str.strip())]
+
+    livro = openpyxl.load_workbook(caminho, read_only=True, data_only=True, keep_links=False)
+    try:
+        abas = []
+        for planilha in livro.worksheets:
+            cabecalho = next(planilha.iter_rows(max_row=1, values_only=True), ())
+            if set(colunas) <= {str(valor).strip() for valor in cabecalho if valor is not None}:
+                abas.append(planilha.title)
+        return abas
+    finally:
+        livro.close()
+
+
+def _carregar_aba(caminho, aba):
+    return carregar_planilha(caminho, aba, decimal=',')
+
+
+def carregar_armazem(caminhos, processos=None):
+    """Lê as abas de folha de todas as planilhas e monta o armazém particionado por órgão.
+
+    Com `processos` diferente de 1 e mais de uma aba, cada aba é lida em um
+    processo (padrão: um por núcleo). Os processos são criados por `spawn`: o
+    `fork` padrão do Linux copiaria as travas das threads do servidor do
+    Streamlit no estado em que estão, e um processo filho pode travar nelas.
+    """
+    tarefas = [(caminho, aba) for caminho in caminhos for aba in listar_abas(caminho)]
+    if not tarefas:
+        raise ValueError(f'Nenhuma aba de folha de pagamento (colunas {COLUNAS_FOLHA}) em {list(caminhos)}')
+
+    processos = processos or os.cpu_count() or 1
+    if processos == 1 or len(tarefas) == 1:
+        folhas = [_carregar_aba(caminho, aba) for caminho, aba in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processos, len(tarefas)),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            folhas = list(executor.map(_carregar_aba, *zip(*tarefas)))
+
+    # Agrupa as folhas por órgão, na ordem alfabética dos órgãos
+    por_orgao = {}
+    for (_, aba), folha in zip(tarefas, folhas):
+        por_orgao.setdefault(aba.strip().upper(), []).append(folha)
+
+    particoes, inicio = {}, 0
+    for orgao in sorted(por_orgao):
+        num_linhas = sum(len(folha) for folha in por_orgao[orgao])
+        particoes[orgao] = slice(inicio, inicio + num_linhas)
+        inicio += num_linhas
+
+    folha = aplicar_esquema(pd.concat([folha for orgao in sorted(por_orgao) for folha in por_orgao[orgao]], ignore_index=True))
+    return ArmazemFolhas(folha, particoes, impressao_digital(folha))
+
+
+def selecionar_orgaos(armazem, orgaos):
+    """Linhas dos órgãos escolhidos; um único órgão (ou todos) é um recorte do armazém, sem cópia."""
+    orgaos = list(orgaos)
+    desconhecidos = [orgao for orgao in orgaos if orgao not in armazem.particoes]
+    if desconhecidos:
+        raise KeyError(f'Órgãos fora do armazém: {desconhecidos}')
+    if set(orgaos) == set(armazem.particoes):
+        return armazem.folha
+    if len(orgaos) == 1:
+        return armazem.folha.iloc[armazem.particoes[orgaos[0]]]
+    return pd.concat([armazem.folha.iloc[armazem.particoes[orgao]] for orgao in armazem.particoes if orgao in orgaos])
@@ -0,0 +1,213 @@
+"""Cache de resultados de cenários compartilhado pelo processo, com despejo LRU e cópia em disco.
+
+A chave é a impressão digital da folha (ver `projecao.dados.impressao_digital`)
+mais todos os parâmetros do cenário; o valor é o resumo do cenário sem a
+tabela por servidor, que é refeita a partir da folha e da coluna do novo
+salário guardada junto (ver `compactar_resumo`).
+
+Os itens ficam em memória até o orçamento de bytes (o tamanho do pickle de
+cada item) e os menos usados recentemente são despejados primeiro. Com uma
+pasta configurada, cada item também é gravado em disco, de modo que os
+resultados sobrevivem a reinícios do servidor; a pasta tem o seu próprio
+orçamento, e os arquivos acessados há mais tempo saem primeiro.
+
+Os arquivos em disco são pickles, e ler um pickle executa código: cada
+arquivo leva um HMAC-SHA256 do conteúdo, com uma chave secreta do deploy
+(`chave_disco`), e só é lido se a assinatura confere. Quem consegue gravar na
+pasta sem conhecer a chave não consegue fazer o dashboard carregar um arquivo.
+Sem chave, cada processo sorteia a sua: a cópia em disco continua valendo para
+o próprio processo (ex.: além do orçamento de memória), mas não é lida por
+outros nem depois de um reinício.
+
+Pedidos simultâneos do mesmo cenário (várias sessões) calculam uma vez só: os
+demais esperam o primeiro terminar.
+"""
+import hashlib
+import hmac
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from projecao.dados import _gravar_atomico, juntar
+from projecao.resumo import tabela_novo_salario
+
+logger = logging.getLogger(__name__)
+
+# Incrementar quando o cálculo mudar, para que resultados gravados em disco por versões anteriores não sejam servidos
+VERSAO_RESULTADOS = 2
+
+ORCAMENTO_MEMORIA = 256 * 2**20
+ORCAMENTO_DISCO = 1024 * 2**20
+
+# Bytes do HMAC-SHA256 no início de cada arquivo em disco
+TAMANHO_ASSINATURA = hashlib.sha256().digest_size
+
+
+class CacheResultados:
+
+    def __init__(self, orcamento_memoria=ORCAMENTO_MEMORIA, pasta=None, orcamento_disco=ORCAMENTO_DISCO, chave_disco=None):
+        self.orcamento_memoria = orcamento_memoria
+        self.orcamento_disco = orcamento_disco
+        self.pasta = Path(pasta) if pasta is not None else None
+        if self.pasta is not None:
+            self.pasta.mkdir(parents=True, exist_ok=True)
+            if not chave_disco:
+                logger.info('Cache de resultados em %s sem chave: os arquivos só valem para este processo', self.pasta)
+        if isinstance(chave_disco, str):
+            chave_disco = chave_disco.encode()
+        self._chave_disco = chave_disco or os.urandom(32)
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._trava = threading.Lock()
+        self._em_calculo = {}
+        self.acertos = self.acertos_disco = self.faltas = 0
+
+    @staticmethod
+    def _nome(chave):
+        return hashlib.sha256(repr((VERSAO_RESULTADOS, chave)).encode()).hexdigest()
+
+    def obter(self, chave):
+        """Valor guardado para `chave` (da memória ou do disco), ou None."""
+        nome = self._nome(chave)
+        with self._trava:
+            if nome in self._itens:
+                self._itens.move_to_end(nome)
+                self.acertos += 1
+                return pickle.loads(self._itens[nome])
+        dados = self._ler_disco(nome)
+        if dados is None:
+            return None
+        with self._trava:
+            self.acertos_disco += 1
+            self._guardar_memoria(nome, dados)
+        return pickle.loads(dados)
+
+    def guardar(self, chave, valor):
+        nome = self._nome(chave)
+        dados = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._trava:
+            self._guardar_memoria(nome, dados)
+        self._gravar_disco(nome, dados)
+
+    def obter_ou_calcular(self, chave, calcular):
+        """Valor de `chave`; na falta, chama `calcular()` uma única vez, mesmo com pedidos simultâneos."""
+        valor = self.obter(chave)
+        if valor is not None:
+            return valor
+        nome = self._nome(chave)
+        with self._trava:
+            evento = self._em_calculo.get(nome)
+            responsavel = evento is None
+            if responsavel:
+                evento = self._em_calculo[nome] = threading.Event()
+        if not responsavel:
+            evento.wait()
+            valor = self.obter(chave)
+            if valor is not None:
+                return valor
+            return self.obter_ou_calcular(chave, calcular)
+        try:
+            with self._trava:
+                self.faltas += 1
+            valor = calcular()
+            self.guardar(chave, valor)
+            return valor
+        finally:
+            with self._trava:
+                del self._em_calculo[nome]
+            evento.set()
+
+    def limpar(self):
+        """Esvazia a memória (os arquivos em disco ficam)."""
+        with self._trava:
+            self._itens.clear()
+            self._bytes = 0
+
+    @property
+    def bytes_em_memoria(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._itens)
+
+    # Os itens guardam o pickle: cada acesso devolve uma cópia, e o tamanho é conhecido
+    def _guardar_memoria(self, nome, dados):
+        if nome in self._itens:
+            self._bytes -= len(self._itens.pop(nome))
+        if len(dados) > self.orcamento_memoria:
+            return
+        self._itens[nome] = dados
+        self._bytes += len(dados)
+        while self._bytes > self.orcamento_memoria:
+            _, despejado = self._itens.popitem(last=False)
+            self._bytes -= len(despejado)
+
+    # Cada arquivo é o HMAC do pickle seguido do próprio pickle
+    def _assinar(self, dados):
+        return hmac.new(self._chave_disco, dados, hashlib.sha256).digest()
+
+    def _ler_disco(self, nome):
+        if self.pasta is None:
+            return None
+        arquivo = self.pasta / f'{nome}.pkl'
+        try:
+            conteudo = arquivo.read_bytes()
+        except OSError:
+            return None
+        assinatura, dados = conteudo[:TAMANHO_ASSINATURA], conteudo[TAMANHO_ASSINATURA:]
+        if not hmac.compare_digest(assinatura, self._assinar(dados)):
+            logger.warning('Cache de resultados: assinatura inválida em %s; arquivo ignorado', arquivo)
+            return None
+        try:
+            os.utime(arquivo)
+        except OSError:
+            pass
+        return dados
+
+    def _gravar_disco(self, nome, dados):
+        if self.pasta is None or TAMANHO_ASSINATURA + len(dados) > self.orcamento_disco:
+            return
+        conteudo = self._assinar(dados) + dados
+        try:
+            _gravar_atomico(self.pasta / f'{nome}.pkl', lambda destino: destino.write_bytes(conteudo))
+            self._podar_disco()
+        except OSError as erro:
+            logger.warning('Não foi possível gravar o cache de resultados em %s: %s', self.pasta, erro)
+
+    def _podar_disco(self):
+        arquivos = []
+        for arquivo in self.pasta.glob('*.pkl'):
+            try:
+                estado = arquivo.stat()
+            except OSError:
+                continue
+            arquivos.append((estado.st_mtime, estado.st_size, arquivo))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, arquivo in sorted(arquivos):
+            if total <= self.orcamento_disco:
+                break
+            try:
+                arquivo.unlink()
+                total -= tamanho
+            except OSError:
+                pass
+
+
+def compactar_resumo(resumo):
+    """Resumo sem a tabela por servidor, só com a coluna do novo salário (o resto da tabela está na folha)."""
+    compacto = {chave: valor for chave, valor in resumo.items() if chave != 'tabela_com_novo_salario'}
+    compacto['novo_salario'] = resumo['tabela_com_novo_salario']['Novo Salário'].to_numpy()
+    return compacto
+
+
+def expandir_resumo(compacto, dados):
+    """Resumo completo a partir de `compactar_resumo` e da mesma folha."""
+    resumo = {chave: valor for chave, valor in compacto.items() if chave != 'novo_salario'}
+    novo_salario = pd.DataFrame({'Novo Salário': compacto['novo_salario']}, index=dados.index)
+    resumo['tabela_com_novo_salario'] = tabela_novo_salario(juntar(dados, novo_salario))
+    return resumo
@@ -0,0 +1,121 @@
+"""Comparação de cenários: uma proposta base e alternativas calculadas como diferença sobre a base.
+
+A base é projetada por inteiro uma única vez (`projetar_base`). Nas
+alternativas, só o novo salário é consultado para a folha toda (uma
+indexação nas grades): as rubricas, a base previdenciária e a base e a faixa
+do IRPF dependem do cenário apenas pelo novo salário, então só os servidores
+cujo novo salário muda em relação à base são recalculados. As linhas
+recalculadas de todas as alternativas passam juntas, uma única vez, pelo plano
+de rubricas e pelos tributos; o cubo (Cargo, CH, Ref) e os totais da base são
+ajustados pela diferença dessas linhas, sem agregar a folha de novo.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from projecao.agregacao import fatorar_chaves
+from projecao.impacto import COLUNAS_NOVAS
+from projecao.resumo import calcular_resumo, completar_parametros, projetar_folha, resumir_cubo
+from projecao.rubricas import PLANO_RUBRICAS, avaliar_entradas, montar_entradas
+from projecao.tabelas import calcular_novo_salario, codificar_tabelas, gerar_grades
+from projecao.tributos import calcular_tributos
+from projecao.varredura import INDICADORES
+
+# `folha`: colunas do cenário base (ver projetar_folha); `entradas`: matriz de entradas do plano de rubricas;
+# `resumo`: resumo completo da base; `celulas_cubo`: célula de `chaves.indice` de cada linha do cubo da base
+Base = namedtuple('Base', ['parametros', 'codigos', 'chaves', 'entradas', 'folha', 'resumo', 'celulas_cubo'])
+
+# Coluna de rótulos de cada tabela do resumo comparada lado a lado
+ROTULOS_TABELAS = {'resumo_cargos': 'Cargo', 'suavizacoes': 'Item', 'totais': 'Item'}
+
+
+def projetar_base(dados, parametros=None):
+    """Projeção completa do cenário base e tudo o que as alternativas reaproveitam dela."""
+    parametros = completar_parametros(parametros)
+    codigos = codificar_tabelas(dados)
+    chaves = fatorar_chaves(dados)
+    grades = gerar_grades(parametros['TC'], parametros['TR'], parametros['num_classes'], parametros['num_referencias'])
+    folha = projetar_folha(dados, codigos, grades, parametros['indice_tabela'])
+    resumo = calcular_resumo(dados, folha, chaves)
+    entradas = montar_entradas(PLANO_RUBRICAS, dados, colunas={'Novo Salário': folha['Novo Salário'].to_numpy()})
+    return Base(parametros, codigos, chaves, entradas, folha, resumo, chaves.indice.get_indexer(resumo['cubo'].index))
+
+
+def _recalcular(entradas, novo_salario):
+    # Colunas do cenário somadas no cubo, só para as linhas de `entradas`
+    rubricas = avaliar_entradas(PLANO_RUBRICAS, entradas, substituicoes={'Novo Salário': novo_salario})
+    tributos = calcular_tributos(rubricas[:, PLANO_RUBRICAS.saidas.index('nova_0801-IPM PREVFOR')],
+                                 rubricas[:, PLANO_RUBRICAS.saidas.index('novo_0996-TOT.PROVENTO')])
+    return {'Novo Salário': novo_salario,
+            **{coluna: tributos[coluna].to_numpy() for coluna in COLUNAS_NOVAS.values() if coluna != 'Novo Salário'}}
+
+
+def comparar_cenarios(dados, base, alternativas):
+    """Resumo de cada alternativa (dicionário de parâmetros do plano) pela diferença sobre a base.
+
+    Cada resumo tem as chaves de `resumir_cubo` e `servidores_recalculados`
+    (quantos servidores mudam de valor em relação à base); a tabela por
+    servidor fica de fora.
+    """
+    alternativas = [completar_parametros(parametros) for parametros in alternativas]
+    if not alternativas:
+        return []
+    salario_base = base.folha['Novo Salário'].to_numpy()
+
+    # Servidores cujo novo salário muda em cada alternativa (vazio nos dois lados não é mudança)
+    mudancas, novos_salarios = [], []
+    for parametros in alternativas:
+        grades = gerar_grades(parametros['TC'], parametros['TR'], parametros['num_classes'], parametros['num_referencias'])
+        novo_salario = calcular_novo_salario(dados, grades, pular_indice=parametros['indice_tabela'], codigos=base.codigos)
+        mudou = np.flatnonzero((novo_salario != salario_base) & ~(np.isnan(novo_salario) & np.isnan(salario_base)))
+        mudancas.append(mudou)
+        novos_salarios.append(novo_salario[mudou])
+
+    # Todas as linhas recalculadas, de todas as alternativas, em uma única avaliação (sem linhas, nada a ajustar)
+    linhas = np.concatenate(mudancas)
+    diferencas = {}
+    if len(linhas):
+        recalculado = _recalcular(base.entradas[linhas], np.concatenate(novos_salarios))
+        diferencas = {coluna: np.nan_to_num(valores) - np.nan_to_num(base.folha[coluna].to_numpy()[linhas])
+                      for coluna, valores in recalculado.items()}
+
+    num_bins = len(base.chaves.indice) + 1
+    limites = np.cumsum([0] + [len(mudou) for mudou in mudancas])
+    resumos = []
+    for mudou, inicio, fim in zip(mudancas, limites[:-1], limites[1:]):
+        celulas = base.chaves.celulas[mudou]
+        cubo, totais = base.resumo['cubo'].copy(), base.resumo['totais_gerais'].copy()
+        for coluna, diferenca in diferencas.items():
+            ajuste = np.bincount(celulas, weights=diferenca[inicio:fim], minlength=num_bins)
+            cubo[coluna] += ajuste[base.celulas_cubo]
+            totais[coluna] += ajuste.sum()
+        resumos.append({**resumir_cubo(cubo, totais), 'servidores_recalculados': len(mudou)})
+    return resumos
+
+
+def comparar_indicadores(resumos, nomes):
+    """Indicadores de impacto (ver `INDICADORES`) de cada cenário, um por linha."""
+    return pd.DataFrame({coluna: [resumo['indicadores'][chave] for resumo in resumos] for coluna, chave in INDICADORES.items()},
+                        index=pd.Index(nomes, name='Cenário'))
+
+
+def lado_a_lado(resumos, nomes, tabela):
+    """Uma tabela do resumo (`resumo_cargos`, `suavizacoes` ou `totais`) de todos os cenários lado a lado.
+
+    A Remuneração Anterior é a mesma em todos; vem uma coluna com a Remuneração
+    Nova de cada cenário e, para cada alternativa, a diferença para o primeiro
+    cenário (a base). Células sem valor (subtítulos) ficam vazias.
+    """
+    rotulo = ROTULOS_TABELAS[tabela]
+    primeira = resumos[0][tabela]
+    colunas = [rotulo, 'Quantidade', 'Remuneração Anterior'] if 'Quantidade' in primeira else [rotulo, 'Remuneração Anterior']
+    resultado = primeira[colunas].copy()
+    valores_base = pd.to_numeric(primeira['Remuneração Nova'], errors='coerce').to_numpy()
+    for i, (nome, resumo) in enumerate(zip(nomes, resumos)):
+        nova = resumo[tabela]['Remuneração Nova'].to_numpy()
+        resultado[nome] = nova
+        if i:
+            diferenca = pd.Series(pd.to_numeric(nova, errors='coerce') - valores_base, index=resultado.index, dtype=object)
+            resultado[f'Δ {nome}'] = diferenca.where(diferenca.notna(), '')
+    return resultado
@@ -0,0 +1,217 @@
+"""Carga da planilha da folha com cache colunar (Parquet) e compartilhamento da folha sem cópias."""
+import hashlib
+import json
+import os
+import warnings
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pandas.io.parsers import TextParser
+
+from projecao.esquema import aplicar_esquema
+
+try:
+    import pyarrow  # noqa: F401  (necessário para ler e gravar Parquet)
+except ImportError:
+    pyarrow = None
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Linhas da planilha convertidas de cada vez na leitura em streaming
+LINHAS_POR_BLOCO = 2_000
+
+
+def calcular_hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """SHA-256 do conteúdo do arquivo."""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def caminhos_cache(caminho, aba):
+    """Arquivo Parquet e arquivo de metadados do cache de uma aba."""
+    caminho = Path(caminho)
+    cache = caminho.with_name(f'{caminho.stem}.{aba}.parquet')
+    return cache, cache.with_name(cache.name + '.json')
+
+
+def _gravar_atomico(destino, gravar):
+    # Grava em um arquivo temporário e renomeia, para que réplicas concorrentes nunca leiam um cache pela metade
+    temporario = destino.with_name(f'{destino.name}.{os.getpid()}.tmp')
+    gravar(temporario)
+    os.replace(temporario, destino)
+
+
+def _ler_metadados(arquivo_meta):
+    try:
+        return json.loads(arquivo_meta.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_metadados(arquivo_meta, meta):
+    try:
+        _gravar_atomico(arquivo_meta, lambda destino: destino.write_text(json.dumps(meta)))
+    except OSError:
+        pass
+
+
+def _nomes_colunas(cabecalho):
+    # Mesmos nomes que o read_excel daria: vazios viram "Unnamed: i", repetidos ganham sufixo ".n" e números
+    # continuam números (`carregar_planilha` passa todos para texto)
+    nomes, vistos = [], {}
+    for posicao, valor in enumerate(cabecalho):
+        nome = f'Unnamed: {posicao}' if valor is None or valor == '' else valor
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f'{nome}.{vistos[nome]}'
+        vistos.setdefault(nome, 0)
+        nomes.append(nome)
+    return nomes
+
+
+def ler_aba(caminho, aba, linhas_por_bloco=LINHAS_POR_BLOCO, **kwargs_texto):
+    """Lê uma aba do Excel em streaming, convertendo `linhas_por_bloco` linhas de cada vez.
+
+    A pasta é aberta em modo somente leitura (as células são lidas do XML à
+    medida que as linhas são percorridas) e cada bloco de linhas vira um
+    DataFrame com o mesmo conversor de texto do `read_excel` (`kwargs_texto`,
+    ex.: `decimal=','`). Só um bloco de células Python existe por vez. O
+    resultado é o mesmo de `pd.read_excel(caminho, sheet_name=aba, ...)`.
+    """
+    if openpyxl is None:
+        return pd.read_excel(caminho, sheet_name=aba, **kwargs_texto)
+
+    livro = openpyxl.load_workbook(caminho, read_only=True, data_only=True, keep_links=False)
+    try:
+        linhas = livro[aba].iter_rows(values_only=True)
+        cabecalho = list(next(linhas, ()))
+        while cabecalho and cabecalho[-1] is None:
+            cabecalho.pop()
+        nomes = _nomes_colunas(cabecalho)
+
+        # Como no read_excel: células vazias entram como '' e as linhas vazias no fim da aba ficam de fora
+        blocos, total, com_dados = [], 0, 0
+        for bloco in iter(lambda: list(islice(linhas, linhas_por_bloco)), []):
+            bloco = [['' if valor is None else valor for valor in linha[:len(nomes)]] for linha in bloco]
+            for linha in bloco:
+                total += 1
+                if any(valor != '' for valor in linha):
+                    com_dados = total
+            blocos.append(TextParser(bloco, header=None, names=nomes, **kwargs_texto).read())
+    finally:
+        livro.close()
+
+    if not blocos:
+        return pd.DataFrame(columns=nomes)
+    with warnings.catch_warnings():
+        # Blocos com colunas só de vazios não decidem o tipo da coluna, como na leitura da aba inteira
+        warnings.simplefilter('ignore', FutureWarning)
+        df = pd.concat(blocos, ignore_index=True)
+    return df.iloc[:com_dados] if com_dados < total else df
+
+
+def carregar_planilha(caminho, aba, **kwargs_excel):
+    """Lê uma aba do Excel, servindo do cache Parquet enquanto o .xlsx não mudar.
+
+    O cache guarda o SHA-256, o mtime e o tamanho do arquivo de origem. Se
+    mtime e tamanho coincidem, o Parquet é lido direto; se mudaram mas o
+    conteúdo é o mesmo (ex.: arquivo copiado no deploy), só os metadados são
+    atualizados. A conversão a partir do Excel só acontece quando o conteúdo
+    realmente mudou. Os nomes das colunas são sempre texto.
+    """
+    caminho = Path(caminho)
+
+    def ler_excel():
+        df = ler_aba(caminho, aba, **kwargs_excel)
+        df.columns = df.columns.map(str)
+        return df
+
+    if pyarrow is None:
+        return ler_excel()
+
+    cache, arquivo_meta = caminhos_cache(caminho, aba)
+    estado = caminho.stat()
+    origem = {'mtime_ns': estado.st_mtime_ns, 'tamanho': estado.st_size}
+    meta = _ler_metadados(arquivo_meta) if cache.exists() else None
+
+    if meta is not None and meta.get('kwargs_excel') == repr(sorted(kwargs_excel.items())):
+        if all(meta.get(chave) == valor for chave, valor in origem.items()):
+            return pd.read_parquet(cache)
+        sha256 = calcular_hash_arquivo(caminho)
+        if meta.get('sha256') == sha256:
+            meta.update(origem)
+            _gravar_metadados(arquivo_meta, meta)
+            return pd.read_parquet(cache)
+    else:
+        sha256 = calcular_hash_arquivo(caminho)
+
+    df = ler_excel()
+    meta = {'sha256': sha256, **origem, 'kwargs_excel': repr(sorted(kwargs_excel.items()))}
+    try:
+        _gravar_atomico(cache, lambda destino: df.to_parquet(destino, index=False))
+    except OSError:
+        # Diretório somente leitura: segue sem cache
+        return df
+    _gravar_metadados(arquivo_meta, meta)
+    return df
+
+
+def carregar_folha(caminho, aba='amc'):
+    """Carrega a folha de um .xlsx (pelo cache de `carregar_planilha`) ou de um .parquet já convertido.
+
+    A folha sai com cabeçalhos normalizados e tipos compactos (ver projecao/esquema.py).
+    """
+    if Path(caminho).suffix.lower() == '.parquet':
+        df = pd.read_parquet(caminho)
+    else:
+        df = carregar_planilha(caminho, aba, decimal=',')
+    return aplicar_esquema(df)
+
+
+def impressao_digital(df):
+    """SHA-256 do conteúdo da folha (nomes, tipos e valores das colunas e o índice), para chaves de cache."""
+    sha = hashlib.sha256()
+    sha.update(pd.util.hash_pandas_object(df.index).to_numpy().tobytes())
+    for nome, serie in df.items():
+        sha.update(f'{nome}\0{serie.dtype}\0'.encode())
+        sha.update(pd.util.hash_pandas_object(serie, index=False).to_numpy().tobytes())
+    return sha.hexdigest()
+
+
+def congelar(df):
+    """Devolve a folha com os arrays das colunas marcados como somente leitura.
+
+    A folha congelada pode ser compartilhada entre sessões sem cópias: com o
+    Copy-on-Write do pandas ligado, recortes de colunas e `pd.concat` com ela
+    não copiam dados, e nenhuma escrita alcança o array original. Colunas
+    guardadas em arrays de extensão (categóricas, esparsas) ficam como estão.
+    """
+    colunas = {}
+    for nome, serie in df.items():
+        valores = serie.array
+        if isinstance(serie.dtype, np.dtype):
+            valores = serie.to_numpy(copy=True)
+            valores.flags.writeable = False
+        colunas[nome] = valores
+    return pd.DataFrame(colunas, index=df.index, copy=False)
+
+
+def juntar(base, sobreposicao, colunas=None):
+    """Visão com colunas da folha base e da sobreposição do cenário, sem copiar dados.
+
+    Colunas presentes nas duas vêm da sobreposição. Sem `colunas`, junta tudo.
+    """
+    if colunas is None:
+        colunas = list(base.columns.difference(sobreposicao.columns, sort=False)) + list(sobreposicao.columns)
+    da_base = [coluna for coluna in colunas if coluna not in sobreposicao.columns]
+    da_sobreposicao = [coluna for coluna in colunas if coluna in sobreposicao.columns]
+    return pd.concat([base[da_base], sobreposicao[da_sobreposicao]], axis=1)[colunas]
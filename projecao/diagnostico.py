@@ -0,0 +1,191 @@
+"""Medição por etapa de uma execução: tempo, linhas, memória alocada e acerto de cache.
+
+Uma `Diagnostico` acompanha uma execução do script (uma página, uma
+interação). Cada etapa é medida com `with diagnostico.etapa(nome):` ou
+embrulhando a função com `instrumentar`. Para saber se uma função com
+`@st.cache_data` foi servida do cache, ela recebe também o decorador
+`execucao_registrada` (por baixo do cache): o corpo só roda em caso de falta,
+e é isso que marca a etapa corrente como `miss`.
+
+Os bytes alocados vêm do `tracemalloc` e só são medidos nas execuções que
+pedem (`Diagnostico(memoria=True)`), porque o rastreamento deixa as alocações
+mais lentas. O tracemalloc é do processo inteiro: o número de uma etapa conta
+também o que as outras threads do servidor (outras sessões, a especulação, a
+exportação) alocaram enquanto ela rodava, e só uma thread mede por vez; uma
+etapa que começa enquanto outra thread mede fica sem o número.
+
+Cada etapa medida também vira uma linha de log estruturado (JSON) no logger
+`projecao.diagnostico`; com a variável de ambiente `PROJECAO_LOG` (ex.:
+`PROJECAO_LOG=INFO`) esses logs vão para a saída de erro.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger('projecao.diagnostico')
+
+if os.environ.get('PROJECAO_LOG') and not logging.getLogger('projecao').handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(message)s'))
+    logging.getLogger('projecao').addHandler(_handler)
+    logging.getLogger('projecao').setLevel(os.environ['PROJECAO_LOG'].upper())
+
+# Diagnóstico ativo em cada thread (o Streamlit executa cada sessão em uma thread própria)
+_local = threading.local()
+
+# O tracemalloc é do processo inteiro: ligado pelo primeiro diagnóstico com memória e desligado pelo último a sair,
+# a menos que já estivesse ligado por outro código (que então é quem o desliga)
+_trava_tracemalloc = threading.Lock()
+_usos_tracemalloc = 0
+_iniciou_tracemalloc = False
+
+# Legenda da coluna de memória nas tabelas de diagnóstico das páginas
+NOTA_MEMORIA = ('bytes_alocados: pico de memória do processo durante a etapa (inclui o que outras sessões alocaram '
+                'no mesmo tempo); vazio quando outra sessão estava medindo.')
+
+# Thread que está medindo memória (a medição zera o pico do tracemalloc, que é um só para o processo)
+_trava_medicao = threading.RLock()
+
+
+class Diagnostico:
+
+    def __init__(self, pagina, memoria=False):
+        self.pagina = pagina
+        self.memoria = memoria
+        self.registros = []
+        self._abertas = []
+        self._picos = []
+
+    def __enter__(self):
+        global _usos_tracemalloc, _iniciou_tracemalloc
+        if self.memoria:
+            with _trava_tracemalloc:
+                if _usos_tracemalloc == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _iniciou_tracemalloc = True
+                _usos_tracemalloc += 1
+        self._anterior = getattr(_local, 'diagnostico', None)
+        _local.diagnostico = self
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao):
+        global _usos_tracemalloc, _iniciou_tracemalloc
+        _local.diagnostico = self._anterior
+        if self.memoria:
+            with _trava_tracemalloc:
+                _usos_tracemalloc -= 1
+                if _usos_tracemalloc == 0 and _iniciou_tracemalloc:
+                    tracemalloc.stop()
+                    _iniciou_tracemalloc = False
+        self.tempo_total = time.perf_counter() - self._inicio
+        logger.info(json.dumps({'pagina': self.pagina, 'evento': 'execucao', 'tempo_s': round(self.tempo_total, 6),
+                                'etapas': len(self.registros)}, ensure_ascii=False))
+        return False
+
+    @staticmethod
+    def atual():
+        """Diagnóstico ativo na thread corrente, ou None."""
+        return getattr(_local, 'diagnostico', None)
+
+    @contextmanager
+    def etapa(self, nome, linhas=None, cache=False):
+        """Mede o bloco. `cache=True` indica que o bloco chama uma função com cache (hit até prova em contrário).
+
+        Os bytes alocados são o pico do bloco acima da memória do início. Uma
+        etapa aninhada zera o pico do tracemalloc; antes disso, o pico até ali
+        fica guardado para a etapa de fora, que também recebe o pico da de dentro.
+        Sem espera pela trava: se outra thread está medindo, a etapa fica sem os
+        bytes (esperar poderia travar, ex.: quando a etapa aguarda um resultado
+        que a outra thread está calculando).
+        """
+        registro = {'etapa': nome, 'linhas': linhas, 'cache': 'hit' if cache else None}
+        memoria = self.memoria and tracemalloc.is_tracing() and _trava_medicao.acquire(blocking=False)
+        if memoria:
+            atual_antes, pico = tracemalloc.get_traced_memory()
+            self._guardar_pico(pico)
+            tracemalloc.reset_peak()
+        self._abertas.append(registro)
+        self._picos.append(0)
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['tempo_s'] = time.perf_counter() - inicio
+            self._abertas.pop()
+            pico = self._picos.pop()
+            if memoria:
+                pico = max(pico, tracemalloc.get_traced_memory()[1])
+                self._guardar_pico(pico)
+                _trava_medicao.release()
+            registro['bytes_alocados'] = pico - atual_antes if memoria else None
+            self.registrar(**registro)
+
+    def _guardar_pico(self, pico):
+        # Pico de memória visto pela etapa aberta mais interna antes de uma etapa aninhada zerar o do tracemalloc
+        if self._picos:
+            self._picos[-1] = max(self._picos[-1], pico)
+
+    def registrar(self, etapa, **campos):
+        """Acrescenta um registro (ex.: etapa servida da memória, sem medição) e o envia ao log."""
+        registro = {'etapa': etapa, 'tempo_s': 0.0, 'linhas': None, 'bytes_alocados': None, 'cache': None, **campos}
+        self.registros.append(registro)
+        logger.info(json.dumps({'pagina': self.pagina, **registro}, ensure_ascii=False, default=str))
+
+    def marcar_execucao(self):
+        """Marca a etapa aberta mais interna como `miss` (o corpo da função com cache executou)."""
+        if self._abertas and self._abertas[-1]['cache'] is not None:
+            self._abertas[-1]['cache'] = 'miss'
+
+    def tabela(self):
+        """Registros como DataFrame, para exibição."""
+        colunas = ['etapa', 'tempo_s', 'linhas', 'bytes_alocados', 'cache']
+        tabela = pd.DataFrame(self.registros, columns=colunas + sorted(
+            {campo for registro in self.registros for campo in registro} - set(colunas)))
+        tabela['tempo_ms'] = tabela.pop('tempo_s') * 1000
+        return tabela.set_index('etapa')
+
+
+def contar_linhas(resultado):
+    """Linhas de um DataFrame/Series/array (ou do primeiro DataFrame de um dicionário de resultados)."""
+    if isinstance(resultado, dict):
+        resultado = next((valor for valor in resultado.values() if hasattr(valor, 'shape')), None)
+    forma = getattr(resultado, 'shape', None)
+    return forma[0] if forma else None
+
+
+def instrumentar(nome, funcao, cache=False):
+    """Embrulha `funcao` para ser medida como a etapa `nome` quando houver um diagnóstico ativo."""
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        diagnostico = Diagnostico.atual()
+        if diagnostico is None:
+            return funcao(*args, **kwargs)
+        with diagnostico.etapa(nome, cache=cache) as registro:
+            resultado = funcao(*args, **kwargs)
+            registro['linhas'] = contar_linhas(resultado)
+        return resultado
+    return envoltorio
+
+
+def medido(nome, cache=False):
+    """Forma de decorador de `instrumentar`."""
+    return lambda funcao: instrumentar(nome, funcao, cache)
+
+
+def execucao_registrada(funcao):
+    """Decorador para usar por baixo de `@st.cache_data`/`@st.cache_resource`: registra as faltas de cache."""
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        diagnostico = Diagnostico.atual()
+        if diagnostico is not None:
+            diagnostico.marcar_execucao()
+        return funcao(*args, **kwargs)
+    return envoltorio
@@ -0,0 +1,121 @@
+"""Pré-cálculo especulativo dos cenários vizinhos ao atual, em segundo plano, com cache por sessão.
+
+Quem ajusta a barra lateral costuma andar um passo por vez (Enquadramento,
+Taxa de Classe, Taxa de Referência). Depois de cada execução, os cenários a um
+passo do atual (`vizinhos`) são calculados em uma thread de fundo da sessão
+enquanto o usuário olha a página; se a execução seguinte pedir um deles, o
+resultado já está pronto (ou em cálculo, e ela só espera o fim).
+
+O cache guarda os resultados das antecipações e dos cenários calculados em
+primeiro plano, até `max_itens`, descartando primeiro os usados há mais tempo.
+Quando o cenário muda, as antecipações que ainda estão na fila e não são
+vizinhas do novo cenário são canceladas; a que já está rodando termina (o
+cálculo não é interrompível) e fica no cache.
+
+Cada sessão tem o seu `Especulador` (ex.: em `st.session_state`), usado só
+pela thread do script da sessão. As antecipações de todas as sessões rodam
+em um único executor do processo, com `TRABALHADORES` threads: o número de
+threads não cresce com o de sessões, e quando uma sessão termina (o
+especulador é descartado) as antecipações dela que ainda estão na fila são
+canceladas. As threads de fundo só executam as funções agendadas, que não
+devem chamar o Streamlit.
+"""
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Resultados guardados por sessão (vizinhos do cenário atual e os últimos cenários visitados)
+MAX_ITENS = 12
+
+# Threads de fundo do processo para as antecipações de todas as sessões
+TRABALHADORES = 2
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=TRABALHADORES, thread_name_prefix='especulacao')
+
+
+def vizinhos(parametros, passos, minimos=None):
+    """Cenários a um passo de `parametros` em cada parâmetro de `passos` (parâmetro -> passo), respeitando os `minimos`."""
+    minimos = minimos or {}
+    resultado = []
+    for parametro, passo in passos.items():
+        for sinal in (1, -1):
+            valor = parametros[parametro] + sinal * passo
+            if parametro not in minimos or valor >= minimos[parametro]:
+                resultado.append({**parametros, parametro: valor})
+    return resultado
+
+
+def _cancelar_pendentes(futuros):
+    # Tira da fila as antecipações que ainda não começaram (as que estão rodando terminam)
+    for futuro in list(futuros.values()):
+        futuro.cancel()
+    futuros.clear()
+
+
+class Especulador:
+
+    def __init__(self, max_itens=MAX_ITENS, executor=None):
+        self.max_itens = max_itens
+        self._executor = executor or _EXECUTOR
+        # Chave do cenário -> Future, do usado há mais tempo ao mais recente
+        self._futuros = OrderedDict()
+        self.acertos = self.canceladas = 0
+        # Sessão encerrada (especulador descartado): a fila compartilhada não fica com o trabalho dela
+        self._finalizar = weakref.finalize(self, _cancelar_pendentes, self._futuros)
+
+    def obter(self, chave):
+        """Resultado de `chave`, ou None se não houver.
+
+        Espera a antecipação que já estiver rodando; uma que ainda está na
+        fila é cancelada (calcular na hora é mais rápido que esperar a fila).
+        Antecipações que falharam contam como ausentes: o erro aparece no
+        cálculo em primeiro plano.
+        """
+        futuro = self._futuros.get(chave)
+        if futuro is None:
+            return None
+        if futuro.cancel():
+            del self._futuros[chave]
+            self.canceladas += 1
+            return None
+        if futuro.exception() is not None:
+            del self._futuros[chave]
+            return None
+        self._futuros.move_to_end(chave)
+        self.acertos += 1
+        return futuro.result()
+
+    def guardar(self, chave, resultado):
+        """Guarda um resultado calculado em primeiro plano (ex.: para voltar ao cenário anterior sem recalcular)."""
+        futuro = Future()
+        futuro.set_result(resultado)
+        self._futuros[chave] = futuro
+        self._futuros.move_to_end(chave)
+        self._podar()
+
+    def antecipar(self, tarefas):
+        """Agenda `tarefas` (chave -> função sem argumentos), na ordem dada, e cancela as pendentes que não estão nelas."""
+        for chave, futuro in list(self._futuros.items()):
+            if chave not in tarefas and futuro.cancel():
+                del self._futuros[chave]
+                self.canceladas += 1
+        for chave, funcao in tarefas.items():
+            if chave not in self._futuros:
+                self._futuros[chave] = self._executor.submit(funcao)
+        self._podar()
+
+    def encerrar(self):
+        """Cancela as antecipações pendentes e esquece os resultados (o mesmo que acontece quando é descartado)."""
+        self._finalizar()
+
+    def __len__(self):
+        return len(self._futuros)
+
+    def _podar(self):
+        # Descarta os resultados usados há mais tempo; antecipações em andamento ficam até terminar, e o mais recente
+        # (o que acabou de ser guardado ou usado) nunca sai
+        for chave, futuro in list(self._futuros.items())[:-1]:
+            if len(self._futuros) <= self.max_itens:
+                break
+            if futuro.done() or futuro.cancel():
+                del self._futuros[chave]
@@ -0,0 +1,77 @@
+"""Tipos compactos para a folha carregada.
+
+A planilha chega com os tipos padrão do pandas: textos como objetos Python,
+referências como float64 e dezenas de rubricas float64 quase sempre zeradas.
+`aplicar_esquema` normaliza os cabeçalhos e converte:
+
+* colunas de texto repetitivo (cargo, nível, empresa, lotação...) e a carga
+  horária em categóricas;
+* `Ref` no menor inteiro (com vazios) que comporta os valores;
+* colunas numéricas em que a maior parte das linhas é zero em esparsas (só os
+  valores não nulos ficam guardados, sem perder precisão);
+* o nome do servidor em texto Arrow, quando o pyarrow está instalado.
+
+Os valores não mudam: as contas continuam em float64 sobre os mesmos números.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # pragma: no cover - o pyarrow é opcional
+    pyarrow = None
+
+from projecao.impacto import COLUNAS_ANTERIORES
+from projecao.rubricas import PLANO_RUBRICAS
+
+# Colunas de texto com poucos valores distintos, e a carga horária
+CATEGORICAS = [
+    'Emp', 'Orgao', 'Lotacao', 'Cat', 'Cargo', 'Ambiente', 'Tab', 'Pla', 'Niv', 'CH',
+    'Fonte Recursos', 'Sexo', 'Afast', 'Fundo',
+]
+
+# Colunas inteiras pequenas
+INTEIRAS = ['Ref']
+
+# Colunas de texto sem repetição
+TEXTOS = ['Nome']
+
+# Colunas que as contas leem: ficam na folha mesmo vazias (ex.: uma rubrica sem lançamentos na folha de um órgão)
+COLUNAS_LIDAS = set(PLANO_RUBRICAS.entradas) | set(COLUNAS_ANTERIORES.values()) | set(CATEGORICAS + INTEIRAS + TEXTOS)
+
+# Uma coluna numérica vira esparsa quando no máximo esta fração das linhas é diferente de zero
+DENSIDADE_MAXIMA_ESPARSA = 0.5
+
+
+def normalizar_cabecalhos(df):
+    """Remove os espaços nas pontas dos nomes das colunas e as colunas totalmente vazias.
+
+    As vazias são anotações ao lado da folha; as de `COLUNAS_LIDAS` ficam, com NaN.
+    """
+    df = df.rename(columns=lambda coluna: str(coluna).strip())
+    return df.loc[:, df.notna().any() | df.columns.isin(COLUNAS_LIDAS)]
+
+
+def _menor_inteiro(serie):
+    for tipo in ('Int8', 'Int16', 'Int32'):
+        info = np.iinfo(tipo.lower())
+        if serie.min() >= info.min and serie.max() <= info.max:
+            return tipo
+    return 'Int64'
+
+
+def aplicar_esquema(df, densidade_maxima=DENSIDADE_MAXIMA_ESPARSA):
+    """Folha com cabeçalhos normalizados e tipos compactos (ver o docstring do módulo)."""
+    df = normalizar_cabecalhos(df)
+    colunas = {}
+    for nome, serie in df.items():
+        if nome in CATEGORICAS:
+            serie = serie.astype('category')
+        elif nome in INTEIRAS and pd.api.types.is_numeric_dtype(serie) and (serie.dropna() % 1 == 0).all():
+            serie = serie.astype(_menor_inteiro(serie))
+        elif nome in TEXTOS and pyarrow is not None and serie.dtype == object:
+            serie = serie.astype('string[pyarrow]')
+        elif serie.dtype == np.float64 and len(serie) and (serie.to_numpy() != 0).mean() <= densidade_maxima:
+            serie = serie.astype(pd.SparseDtype(np.float64, 0.0))
+        colunas[nome] = serie
+    return pd.DataFrame(colunas, index=df.index)
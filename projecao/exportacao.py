@@ -0,0 +1,179 @@
+"""Exportação da projeção por servidor (novo salário, rubricas e tributos) em .xlsx ou Parquet, em blocos de linhas.
+
+O resultado detalhado de um cenário tem uma linha por servidor e todas as
+colunas `nova_*`/`novo_*` do plano; em vez de montá-lo inteiro e convertê-lo
+para o formato do arquivo, cada bloco de `LINHAS_POR_BLOCO` servidores é
+projetado (`projetar_folha`, o mesmo cálculo do dashboard) e gravado em
+seguida, de modo que só um bloco fica na memória:
+
+* no .xlsx, pelo modo `write_only` do openpyxl, em que as linhas vão direto
+  para o arquivo (uma nova aba a cada `LINHAS_POR_ABA`, o limite do Excel);
+* no Parquet, pelo `ParquetWriter` do pyarrow, um row group por bloco.
+
+`Exportacao` faz a gravação em uma thread de fundo, em um arquivo temporário,
+e informa o progresso; a página fica livre enquanto isso.
+"""
+import shutil
+import tempfile
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from projecao.resumo import projetar_folha
+from projecao.tabelas import codificar_tabelas
+
+# Colunas da folha que identificam o servidor no arquivo, antes das colunas do cenário (as ausentes são ignoradas)
+COLUNAS_SERVIDOR = ['Prontuario', 'Nome', 'Orgao', 'Lotacao', 'Cargo', 'Niv', 'CH', 'Ref', 'VENCIMENTO BASE']
+
+# Servidores projetados e gravados de uma vez, por formato: no .xlsx a gravação é lenta (uma célula por vez) e
+# blocos menores dão um progresso mais fino; no Parquet cada bloco é um row group, melhor se for grande
+LINHAS_POR_BLOCO = {'xlsx': 10_000, 'parquet': 50_000}
+
+# Linhas de dados por aba do .xlsx (o Excel aceita 1.048.576 com o cabeçalho)
+LINHAS_POR_ABA = 1_048_575
+
+# Formatos aceitos -> tipo MIME do arquivo
+FORMATOS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Uma exportação por vez no processo: as sessões dividem a mesma thread, e a memória fica em um bloco por vez
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='exportacao')
+
+
+def blocos_projecao(dados, grades, indice_tabela, codigos=None, linhas_por_bloco=LINHAS_POR_BLOCO['parquet']):
+    """Projeção por servidor em blocos de linhas: as colunas de identificação seguidas das colunas do cenário."""
+    if codigos is None:
+        codigos = codificar_tabelas(dados)
+    identificacao = [coluna for coluna in COLUNAS_SERVIDOR if coluna in dados]
+    for inicio in range(0, len(dados), linhas_por_bloco):
+        bloco = dados.iloc[inicio:inicio + linhas_por_bloco]
+        projecao = projetar_folha(bloco, codigos[inicio:inicio + linhas_por_bloco], grades, indice_tabela)
+        bloco = pd.concat([bloco[identificacao], projecao], axis=1)
+        # Colunas esparsas do esquema da folha viram densas, que é o que os dois formatos gravam
+        esparsas = [coluna for coluna, tipo in bloco.dtypes.items() if isinstance(tipo, pd.SparseDtype)]
+        if esparsas:
+            bloco[esparsas] = bloco[esparsas].sparse.to_dense()
+        yield bloco
+
+
+def gravar_xlsx(blocos, destino, aba='projecao'):
+    """Grava os blocos em um .xlsx linha a linha (openpyxl em modo `write_only`) e devolve o total de linhas."""
+    from openpyxl import Workbook
+
+    livro = Workbook(write_only=True)
+    planilha, linhas_na_aba, total, cabecalho = None, 0, 0, None
+    for bloco in blocos:
+        cabecalho = list(bloco.columns)
+        # Vazios (NaN, NA) viram células em branco
+        valores = bloco.astype(object).where(bloco.notna(), None)
+        for linha in valores.itertuples(index=False, name=None):
+            if planilha is None or linhas_na_aba == LINHAS_POR_ABA:
+                planilha = livro.create_sheet(aba if planilha is None else f'{aba}_{len(livro.worksheets) + 1}')
+                planilha.append(cabecalho)
+                linhas_na_aba = 0
+            planilha.append(linha)
+            linhas_na_aba += 1
+        total += len(bloco)
+    if planilha is None:
+        livro.create_sheet(aba).append(cabecalho or [])
+    livro.save(destino)
+    return total
+
+
+def gravar_parquet(blocos, destino):
+    """Grava os blocos em um Parquet, um row group por bloco (pyarrow `ParquetWriter`), e devolve o total de linhas."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor, total = None, 0
+    try:
+        for bloco in blocos:
+            tabela = pa.Table.from_pandas(bloco, schema=None if escritor is None else escritor.schema, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(destino, tabela.schema)
+            escritor.write_table(tabela)
+            total += len(bloco)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    if escritor is None:
+        raise ValueError('Folha vazia: não há linhas para exportar')
+    return total
+
+
+def exportar_projecao(dados, grades, indice_tabela, destino, formato=None, codigos=None, linhas_por_bloco=None):
+    """Grava a projeção por servidor de um cenário em `destino` e devolve o número de linhas.
+
+    `grades` vem de `gerar_grades` e `indice_tabela` é o enquadramento, como em
+    `projetar_folha`. O formato sai da extensão de `destino` quando não é dado.
+    """
+    formato = formato or Path(destino).suffix.lstrip('.').lower()
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato desconhecido: {formato!r} (use um de {list(FORMATOS)})')
+    blocos = blocos_projecao(dados, grades, indice_tabela, codigos, linhas_por_bloco or LINHAS_POR_BLOCO[formato])
+    return (gravar_xlsx if formato == 'xlsx' else gravar_parquet)(blocos, destino)
+
+
+class Exportacao:
+    """Exportação em uma thread de fundo para um arquivo temporário, apagado quando o objeto é descartado.
+
+    `chave` identifica o cenário exportado (ex.: para avisar que a página já
+    mostra outro). `linhas_gravadas` avança a cada bloco; quando `pronta`,
+    `erro` tem a exceção da gravação, se houve.
+    """
+
+    def __init__(self, dados, grades, indice_tabela, formato, codigos=None, chave=None, nome='projecao',
+                 linhas_por_bloco=None):
+        if formato not in FORMATOS:
+            raise ValueError(f'Formato desconhecido: {formato!r} (use um de {list(FORMATOS)})')
+        self.formato, self.chave = formato, chave
+        self.nome_arquivo = f'{nome}.{formato}'
+        self.total_linhas, self.linhas_gravadas = len(dados), 0
+        pasta = tempfile.mkdtemp(prefix='exportacao_')
+        self.caminho = Path(pasta) / self.nome_arquivo
+        self._finalizar = weakref.finalize(self, shutil.rmtree, pasta, ignore_errors=True)
+        self._cancelada = threading.Event()
+
+        def contar(blocos):
+            for bloco in blocos:
+                if self._cancelada.is_set():
+                    return
+                yield bloco
+                self.linhas_gravadas += len(bloco)
+
+        blocos = contar(blocos_projecao(dados, grades, indice_tabela, codigos, linhas_por_bloco or LINHAS_POR_BLOCO[formato]))
+        gravar = gravar_xlsx if formato == 'xlsx' else gravar_parquet
+        self._futuro = _EXECUTOR.submit(gravar, blocos, self.caminho)
+
+    @property
+    def pronta(self):
+        return self._futuro.done()
+
+    @property
+    def progresso(self):
+        return self.linhas_gravadas / self.total_linhas if self.total_linhas else 1.0
+
+    @property
+    def erro(self):
+        return self._futuro.exception() if self.pronta and not self._futuro.cancelled() else None
+
+    @property
+    def mime(self):
+        return FORMATOS[self.formato]
+
+    def ler(self):
+        """Conteúdo do arquivo gravado (ex.: para um download, lido só quando pedido)."""
+        return self.caminho.read_bytes()
+
+    def descartar(self):
+        """Interrompe a gravação no próximo bloco (ou tira da fila) e apaga o arquivo."""
+        self._cancelada.set()
+        if not self._futuro.cancel():
+            self._futuro.add_done_callback(lambda _: self._finalizar())
+        else:
+            self._finalizar()
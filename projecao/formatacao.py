@@ -0,0 +1,100 @@
+"""Formatação de valores para exibição em pt-BR, sem `locale`.
+
+`locale.setlocale` muda o estado do processo inteiro e não é seguro com várias
+sessões do Streamlit rodando ao mesmo tempo; além disso, `locale.currency`
+formata um valor por chamada. Aqui a formatação é feita coluna a coluna: os
+valores são separados em grupos de três dígitos e centavos com numpy e o
+texto é montado com os kernels de texto do Arrow (`pyarrow.compute`), sem
+chamadas Python por célula. Sem o pyarrow, cada valor é formatado em Python.
+
+O resultado é o mesmo do `locale.currency(valor, grouping=True)` em pt_BR:
+`R$ 1.234,56` e `-R$ 1.234,56`. Para tabelas, `estilizar_colunas` aplica o
+mesmo texto na exibição (um Styler), sem trocar os números por texto.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - o pyarrow é opcional
+    pa = None
+
+SIMBOLO_MOEDA = 'R$ '
+
+
+def _texto_arrow(numeros, validos, casas, prefixo):
+    # Arredondamento do `%.2f` (o do locale.currency e de `_texto_python`): o valor binário exato, não o produto pela
+    # escala; os poucos valores a um fio da metade de uma unidade são refeitos pela própria formatação
+    escala = 10 ** casas
+    absolutos = np.abs(np.where(validos, numeros, 0.0))
+    escalados = absolutos * escala
+    unidades = np.rint(escalados).astype(np.int64)
+    duvidosos = np.abs(escalados - np.floor(escalados) - 0.5) < 1e-6
+    if duvidosos.any():
+        unidades[duvidosos] = [int(f'{valor:.{casas}f}'.replace('.', '')) for valor in absolutos[duvidosos]]
+    inteiros, fracao = np.divmod(unidades, escala)
+
+    def digitos(valores, largura):
+        return pc.utf8_lpad(pc.cast(pa.array(valores), pa.string()), largura, '0')
+
+    # Grupos de três dígitos, todos com três casas, do mais alto ao mais baixo; os zeros e pontos à esquerda saem depois
+    num_grupos = len(str(int(inteiros.max()))) // 3 + 1 if len(inteiros) else 1
+    grupos = [digitos((inteiros // 1000 ** k) % 1000, 3) for k in reversed(range(num_grupos))]
+    texto = pc.utf8_ltrim(pc.binary_join_element_wise(*grupos, '.'), '0.')
+    texto = pc.if_else(pc.equal(texto, ''), '0', texto)
+    if casas:
+        texto = pc.binary_join_element_wise(texto, digitos(fracao, casas), ',')
+
+    sinal = pa.array(np.where(np.signbit(numeros) & (unidades > 0), '-' + prefixo, prefixo))
+    texto = pc.binary_join_element_wise(sinal, texto, '')
+    return pd.Series(pc.if_else(pa.array(validos), texto, '').to_numpy(zero_copy_only=False), dtype=object)
+
+
+def _texto_python(numeros, validos, casas, prefixo):
+    def formatar(numero):
+        texto = f'{abs(numero):,.{casas}f}'.translate(str.maketrans(',.', '.,'))
+        negativo = numero < 0 and texto.strip('0,.') != ''
+        return ('-' if negativo else '') + prefixo + texto
+    return pd.Series([formatar(numero) if valido else '' for numero, valido in zip(numeros, validos)], dtype=object)
+
+
+def formatar_numero(valores, casas=2, prefixo=''):
+    """Texto pt-BR (milhar com ponto, decimais com vírgula) de cada valor; vazios viram ''.
+
+    Aceita um escalar (devolve str) ou uma sequência/Series (devolve uma Series
+    de texto com o mesmo índice).
+    """
+    if np.ndim(valores) == 0:
+        return formatar_numero([valores], casas, prefixo).iloc[0]
+
+    numeros = np.asarray(valores, dtype=float)
+    validos = np.isfinite(numeros)
+    texto = (_texto_arrow if pa is not None else _texto_python)(numeros, validos, casas, prefixo)
+    if isinstance(valores, pd.Series):
+        texto.index = valores.index
+    return texto
+
+
+def formatar_moeda(valores):
+    """Valores em reais, no formato `R$ 1.234,56` (ver `formatar_numero`)."""
+    return formatar_numero(valores, 2, SIMBOLO_MOEDA)
+
+
+def estilizar_colunas(df, moeda=(), inteiros=(), percentuais=()):
+    """Styler de `df` com as colunas `moeda` em reais, `inteiros` sem decimais e `percentuais` com ' %', em pt-BR.
+
+    Os valores continuam numéricos: a ordenação no navegador, a cópia e o
+    download usam os números, e só a exibição é formatada. Células de texto
+    dessas colunas (subtítulos, células vazias) ficam vazias. O texto de cada
+    coluna é montado de uma vez (ver `formatar_numero`), não célula a célula.
+    """
+    df = df.copy()
+    formatos = {}
+    for colunas, casas, prefixo, sufixo in ((moeda, 2, SIMBOLO_MOEDA, ''), (inteiros, 0, '', ''), (percentuais, 2, '', ' %')):
+        for coluna in colunas:
+            numeros = pd.to_numeric(df[coluna], errors='coerce')
+            df[coluna] = numeros
+            validos = numeros.dropna()
+            formatos[coluna] = dict(zip(validos, formatar_numero(validos, casas, prefixo) + sufixo)).__getitem__
+    return df.style.format(formatos, na_rep='')
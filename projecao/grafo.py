@@ -0,0 +1,65 @@
+"""Grafo de etapas de cálculo com recomputação incremental.
+
+Cada etapa declara os parâmetros de entrada e as etapas de que depende. O
+resultado fica memorizado junto com a chave usada para produzi-lo (valores
+dos parâmetros e versões das dependências); a etapa só reexecuta quando essa
+chave muda. Assim, mudar um parâmetro recalcula apenas as etapas que
+dependem dele, direta ou indiretamente.
+"""
+
+
+class GrafoCalculo:
+
+    def __init__(self):
+        self._etapas = {}
+        self._resultados = {}
+        # Última versão de cada etapa; continua contando depois de `invalidar`, para que as dependentes reexecutem
+        self._versoes = {}
+        # Etapas executadas e etapas servidas da memória na última chamada de `calcular`
+        self.recalculadas = []
+        self.servidas = []
+
+    def etapa(self, nome, funcao, parametros=(), dependencias=()):
+        """Registra `funcao`, chamada com as dependências e os parâmetros como argumentos nomeados."""
+        desconhecidas = [dependencia for dependencia in dependencias if dependencia not in self._etapas]
+        if desconhecidas:
+            raise ValueError(f'Etapa {nome!r} depende de etapas não registradas: {desconhecidas}')
+        self._etapas[nome] = (funcao, tuple(parametros), tuple(dependencias))
+        self._resultados.pop(nome, None)
+
+    def calcular(self, nomes, **valores):
+        """Devolve um dicionário com o resultado de cada etapa pedida, recalculando só o necessário."""
+        self.recalculadas = []
+        self.servidas = []
+        return {nome: self._calcular(nome, valores)[1] for nome in nomes}
+
+    def invalidar(self, nome=None):
+        """Descarta o resultado memorizado de uma etapa (ou de todas)."""
+        if nome is None:
+            self._resultados.clear()
+        else:
+            self._resultados.pop(nome, None)
+
+    def _calcular(self, nome, valores):
+        funcao, parametros, dependencias = self._etapas[nome]
+        entradas = {dependencia: self._calcular(dependencia, valores) for dependencia in dependencias}
+        chave = (
+            tuple(valores[parametro] for parametro in parametros),
+            tuple(versao for versao, _ in entradas.values()),
+        )
+
+        anterior = self._resultados.get(nome)
+        if anterior is not None and anterior[0] == chave:
+            if nome not in self.servidas and nome not in self.recalculadas:
+                self.servidas.append(nome)
+            return anterior[1], anterior[2]
+
+        argumentos = {dependencia: resultado for dependencia, (_, resultado) in entradas.items()}
+        argumentos.update((parametro, valores[parametro]) for parametro in parametros)
+        resultado = funcao(**argumentos)
+
+        versao = self._versoes.get(nome, -1) + 1
+        self._versoes[nome] = versao
+        self._resultados[nome] = (chave, versao, resultado)
+        self.recalculadas.append(nome)
+        return versao, resultado
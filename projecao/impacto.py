@@ -0,0 +1,95 @@
+"""Encargos e indicadores de impacto calculados a partir dos totais da folha.
+
+Os totais podem ser escalares (um cenário) ou arrays com um valor por
+cenário; todas as contas são elementares e se propagam por broadcasting.
+"""
+
+# Colunas da folha com os valores atuais usados como "Remuneração Anterior"
+COLUNAS_ANTERIORES = {
+    'vencimento_base': 'VENCIMENTO BASE',
+    'ipm_previfor_patronal': 'IPM PREVFOR-PATRONAL',
+    'ipm_previfor_servidor': 'IPM PREVFOR-SERVIDOR',
+    'imposto_renda': 'IRPF',
+}
+
+# Colunas projetadas correspondentes, na sobreposição do cenário
+COLUNAS_NOVAS = {
+    'vencimento_base': 'Novo Salário',
+    'ipm_previfor_patronal': 'nova_IPM PREVFOR-PATRONAL',
+    'ipm_previfor_servidor': 'nova_IPM PREVFOR-SERVIDOR',
+    'imposto_renda': 'nova_IRPF',
+}
+
+
+def calcular_indicadores(anterior, novo):
+    """Encargos, suavizações e impactos a partir dos totais anteriores e novos.
+
+    `anterior` e `novo` são dicionários com as chaves de `COLUNAS_ANTERIORES`.
+    Devolve um dicionário com todos os valores intermediários usados nas
+    tabelas do dashboard.
+    """
+    total_vencimento_base = anterior['vencimento_base']
+    total_novo_salario = novo['vencimento_base']
+    total_impacto = total_novo_salario - total_vencimento_base
+
+    # cálculo dos encargos
+    provisao_ferias_rem_anterior = (total_vencimento_base/12)/3
+    provisao_ferias_nova = (total_novo_salario/12)/3
+    provisao_ferias_impacto = (total_impacto/12)/3
+    provisao_decimo_rem_anterior = (total_vencimento_base/12)
+    provisao_decimo_nova = (total_novo_salario/12)
+    provisao_decimo_impacto = (total_impacto/12)
+    provisao_ipm_rem_anterior = (total_vencimento_base + provisao_ferias_rem_anterior + provisao_decimo_rem_anterior) * 0.04
+    provisao_ipm_nova = ((total_novo_salario + provisao_ferias_nova + provisao_decimo_nova) * 0.04)
+    provisao_ipm_impacto = provisao_ipm_nova - provisao_ipm_rem_anterior
+
+    ipm_previfor_anterior = anterior['ipm_previfor_patronal']
+    nova_ipm_previfor = novo['ipm_previfor_patronal']
+    ipm_previfor_impacto = nova_ipm_previfor - ipm_previfor_anterior
+
+    impacto_mensal_ant = total_vencimento_base + provisao_ferias_rem_anterior + provisao_decimo_rem_anterior + provisao_ipm_rem_anterior + ipm_previfor_anterior
+    impacto_mensal_novo = total_novo_salario + provisao_ferias_nova + provisao_decimo_nova + provisao_ipm_nova + nova_ipm_previfor
+    impacto_mensal_impacto = impacto_mensal_novo - impacto_mensal_ant
+
+    # Imposto de renda e IPM-PREVIFOR (patronal e servidor) para a Remuneração Anterior e Nova
+    imposto_renda_anterior = anterior['imposto_renda']
+    imposto_renda_novo = novo['imposto_renda']
+    impacto_imposto_renda = imposto_renda_novo - imposto_renda_anterior
+    ipm_previfor_patronal_anterior = anterior['ipm_previfor_patronal']
+    ipm_previfor_patronal_novo = novo['ipm_previfor_patronal']
+    impacto_ipm_previfor_patronal = ipm_previfor_patronal_novo - ipm_previfor_patronal_anterior
+    ipm_previfor_servidor_anterior = anterior['ipm_previfor_servidor']
+    ipm_previfor_servidor_novo = novo['ipm_previfor_servidor']
+    impacto_ipm_previfor_servidor = ipm_previfor_servidor_novo - ipm_previfor_servidor_anterior
+
+    # Valores totais
+    valor_mensal_anterior = imposto_renda_anterior + ipm_previfor_patronal_anterior + ipm_previfor_servidor_anterior
+    valor_mensal_novo = imposto_renda_novo + ipm_previfor_patronal_novo + ipm_previfor_servidor_novo
+    impacto_mensal = valor_mensal_novo - valor_mensal_anterior
+
+    valor_anual_anterior = valor_mensal_anterior * 12
+    valor_anual_novo = valor_mensal_novo * 12
+    impacto_anual = valor_anual_novo - valor_anual_anterior
+
+    return {
+        'total_vencimento_base': total_vencimento_base, 'total_novo_salario': total_novo_salario, 'total_impacto': total_impacto,
+        'provisao_ferias_rem_anterior': provisao_ferias_rem_anterior, 'provisao_ferias_nova': provisao_ferias_nova, 'provisao_ferias_impacto': provisao_ferias_impacto,
+        'provisao_decimo_rem_anterior': provisao_decimo_rem_anterior, 'provisao_decimo_nova': provisao_decimo_nova, 'provisao_decimo_impacto': provisao_decimo_impacto,
+        'provisao_ipm_rem_anterior': provisao_ipm_rem_anterior, 'provisao_ipm_nova': provisao_ipm_nova, 'provisao_ipm_impacto': provisao_ipm_impacto,
+        'ipm_previfor_anterior': ipm_previfor_anterior, 'nova_ipm_previfor': nova_ipm_previfor, 'ipm_previfor_impacto': ipm_previfor_impacto,
+        'impacto_mensal_ant': impacto_mensal_ant, 'impacto_mensal_novo': impacto_mensal_novo, 'impacto_mensal_impacto': impacto_mensal_impacto,
+        'impacto_anual_ant': impacto_mensal_ant*12, 'impacto_anual_novo': impacto_mensal_novo*12, 'impacto_anual_impacto': impacto_mensal_impacto*12,
+        'imposto_renda_anterior': imposto_renda_anterior, 'imposto_renda_novo': imposto_renda_novo, 'impacto_imposto_renda': impacto_imposto_renda,
+        'ipm_previfor_patronal_anterior': ipm_previfor_patronal_anterior, 'ipm_previfor_patronal_novo': ipm_previfor_patronal_novo, 'impacto_ipm_previfor_patronal': impacto_ipm_previfor_patronal,
+        'ipm_previfor_servidor_anterior': ipm_previfor_servidor_anterior, 'ipm_previfor_servidor_novo': ipm_previfor_servidor_novo, 'impacto_ipm_previfor_servidor': impacto_ipm_previfor_servidor,
+        'valor_mensal_anterior': valor_mensal_anterior, 'valor_mensal_novo': valor_mensal_novo, 'impacto_mensal': impacto_mensal,
+        'valor_anual_anterior': valor_anual_anterior, 'valor_anual_novo': valor_anual_novo, 'impacto_anual': impacto_anual,
+        # Totais líquidos (folha + encargos + suavizações) exibidos no topo do dashboard
+        'remuneracao_total_anterior': valor_mensal_anterior + impacto_mensal_ant,
+        'remuneracao_total_nova': valor_mensal_novo + impacto_mensal_novo,
+        'remuneracao_anual_anterior': valor_anual_anterior + (impacto_mensal_ant*12),
+        'remuneracao_anual_nova': valor_anual_novo + (impacto_mensal_novo*12),
+        'impacto_mensal_total': impacto_mensal + impacto_mensal_impacto,
+        'impacto_anual_total': impacto_anual + (impacto_mensal_impacto*12),
+        'percentual_efetivo_aumento_mensal': ((impacto_mensal + impacto_mensal_impacto)/(valor_mensal_anterior + impacto_mensal_ant))*100,
+    }
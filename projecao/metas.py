@@ -0,0 +1,108 @@
+"""Busca inversa: o valor de um parâmetro do plano que leva um indicador de impacto a uma meta.
+
+Responde a perguntas como "qual Taxa de Classe cabe em R$ X de impacto anual?".
+Um parâmetro fica livre dentro de um intervalo (`TC`, `TR` ou `salario_base`,
+que escala as seis tabelas na proporção da base da tabela C/180) e os demais
+ficam fixos. O indicador cresce com qualquer um deles, então a meta é cercada
+por bisseção em lote: a cada rodada, alguns pontos do intervalo e a
+interpolação linear entre os extremos são avaliados juntos, em uma única
+avaliação vetorizada (ver `projecao.varredura.avaliar_cenarios`), e o
+intervalo passa a ser o par de pontos vizinhos que cerca a meta. Como o
+impacto é quase linear nesses parâmetros, a interpolação costuma acertar a
+meta em duas ou três rodadas; os pontos igualmente espaçados garantem que o
+intervalo encolha mesmo quando ela erra. As células da grade são arredondadas
+a centavos em cadeia (ver `projecao.tabelas.encadear_celulas`), de modo que o
+indicador anda em degraus de centavos, mas continua não decrescente no
+parâmetro, que é o que a bisseção usa.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from projecao.resumo import calcular_projecao, completar_parametros
+from projecao.tabelas import SALARIOS_BASE
+from projecao.varredura import INDICADORES, LINHAS_POR_BLOCO, PARAMETROS_CENARIO, avaliar_cenarios
+
+# Base da tabela de referência (nível C, 180 h), o "Salário Base" da barra lateral do dashboard
+SALARIO_BASE_REFERENCIA = SALARIOS_BASE[('C', 180)]
+
+# Parâmetros que podem ser resolvidos
+PARAMETROS_LIVRES = ['TC', 'TR', 'salario_base']
+
+# Diferença aceita entre o indicador e a meta, por indicador (reais ou pontos percentuais)
+TOLERANCIAS = {'IMPACTO ANUAL': 1.0, 'PERCENTUAL AUMENTO EFETIVO': 1e-4}
+
+# `parametros`: parâmetros do plano (com `salario_base`); `valor`: indicador atingido; `atingida`: se ficou na tolerância
+# (False quando a meta está fora do alcance do intervalo); `resultado`: tabelas completas (ver calcular_projecao)
+SolucaoMeta = namedtuple('SolucaoMeta', ['parametros', 'valor', 'atingida', 'rodadas', 'avaliacoes', 'resultado'])
+
+
+def salarios_base_escalados(salario_base):
+    """Bases das seis tabelas (na ordem de `SALARIOS_BASE`) com a tabela C/180 em `salario_base`."""
+    return np.multiply.outer(np.asarray(salario_base, dtype=float) / SALARIO_BASE_REFERENCIA, list(SALARIOS_BASE.values()))
+
+
+def avaliar_valores(folha, indicador, livre, valores, fixos):
+    """Indicador de cada valor do parâmetro livre, com os demais em `fixos`, em uma única avaliação."""
+    valores = np.asarray(valores, dtype=float)
+    cenarios = pd.DataFrame({parametro: np.full(len(valores), fixos[parametro], dtype=float) for parametro in PARAMETROS_CENARIO})
+    salario_base = np.full(len(valores), fixos['salario_base'], dtype=float)
+    if livre == 'salario_base':
+        salario_base = valores
+    else:
+        cenarios[livre] = valores
+    return avaliar_cenarios(folha, cenarios, salarios_base=salarios_base_escalados(salario_base))[indicador].to_numpy()
+
+
+def resolver_meta(folha, dados, indicador, meta, livre, minimo, maximo, fixos=None, tolerancia=None, pontos=None,
+                  max_rodadas=30):
+    """Valor de `livre` em [`minimo`, `maximo`] que leva `indicador` a `meta`, com as tabelas completas do plano.
+
+    `folha` vem de `projecao.varredura.preparar_folha(dados)`; `fixos` tem os
+    demais parâmetros (os ausentes usam `PARAMETROS_PADRAO` e a base da tabela
+    C/180). `pontos` é o número de pontos igualmente espaçados avaliados a cada
+    rodada além da interpolação (padrão: 7, menos em folhas grandes, em que
+    cada cenário avaliado custa mais que uma rodada a mais).
+    """
+    if indicador not in INDICADORES:
+        raise ValueError(f'Indicador desconhecido: {indicador!r} (use um de {list(INDICADORES)})')
+    if livre not in PARAMETROS_LIVRES:
+        raise ValueError(f'Parâmetro livre desconhecido: {livre!r} (use um de {PARAMETROS_LIVRES})')
+    if not minimo < maximo:
+        raise ValueError(f'Intervalo vazio: [{minimo}, {maximo}]')
+    fixos = dict(fixos or {})
+    fixos = {**completar_parametros({chave: valor for chave, valor in fixos.items() if chave != 'salario_base'}),
+             'salario_base': fixos.get('salario_base', SALARIO_BASE_REFERENCIA)}
+    if tolerancia is None:
+        tolerancia = TOLERANCIAS.get(indicador, 1.0)
+    if pontos is None:
+        pontos = int(np.clip(LINHAS_POR_BLOCO // (4 * max(len(folha.codigos), 1)), 1, 7))
+
+    def avaliar(valores):
+        return avaliar_valores(folha, indicador, livre, valores, fixos)
+
+    x, f = np.array([minimo, maximo], dtype=float), avaliar([minimo, maximo])
+    avaliacoes, rodadas = 2, 0
+    while True:
+        melhor = np.argmin(np.abs(f - meta))
+        atingida = abs(f[melhor] - meta) <= tolerancia
+        # A meta fica entre dois pontos vizinhos (o indicador é monótono no parâmetro); fora do alcance, fica o extremo mais próximo
+        acima = f >= meta
+        trocas = np.flatnonzero(acima[:-1] != acima[1:])
+        if atingida or not len(trocas) or rodadas >= max_rodadas or x[-1] - x[0] <= 1e-12 * max(1.0, abs(x[0])):
+            break
+        i = trocas[0]
+        x, f = x[i:i + 2], f[i:i + 2]
+
+        interpolado = x[0] + (meta - f[0]) * (x[1] - x[0]) / (f[1] - f[0])
+        candidatos = np.unique(np.append(np.linspace(x[0], x[1], pontos + 2)[1:-1], interpolado))
+        valores = avaliar(candidatos)
+        avaliacoes += len(candidatos)
+        rodadas += 1
+        x, f = np.concatenate(([x[0]], candidatos, [x[1]])), np.concatenate(([f[0]], valores, [f[1]]))
+
+    parametros = {**fixos, livre: float(x[melhor])}
+    resultado = calcular_projecao(dados, {chave: parametros[chave] for chave in PARAMETROS_CENARIO},
+                                  salarios_base=salarios_base_escalados(parametros['salario_base']))
+    return SolucaoMeta(parametros, float(f[melhor]), bool(atingida), rodadas, avaliacoes, resultado)
@@ -0,0 +1,83 @@
+"""Visão paginada da tabela por servidor, com filtros e ordenação no servidor.
+
+Só a página visível vai para o navegador. Os filtros (cargo, carga horária,
+referência e parte do nome) e a ordenação produzem posições de linhas; a
+página é um recorte dessas posições. Os totais das linhas filtradas vêm do
+cubo (Cargo, CH, Ref) do resumo (ver projecao/agregacao.py) — só o filtro
+por nome, que o cubo não distingue, soma as linhas filtradas.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Filtros da tabela por servidor; listas vazias e nome vazio não filtram
+Filtros = namedtuple('Filtros', ['cargos', 'cargas_horarias', 'referencias', 'nome'], defaults=((), (), (), ''))
+
+# `linhas`: recorte da tabela com as linhas da página; `inicio`: posição da primeira linha entre as filtradas
+Pagina = namedtuple('Pagina', ['linhas', 'inicio', 'total_linhas', 'num_paginas'])
+
+# Filtros de cada nível do cubo
+NIVEIS_FILTROS = {'Cargo': 'cargos', 'CH': 'cargas_horarias', 'Ref': 'referencias'}
+
+
+def filtrar_linhas(dados, filtros):
+    """Posições das linhas da folha que passam em todos os filtros."""
+    mascara = np.ones(len(dados), dtype=bool)
+    for coluna, campo in NIVEIS_FILTROS.items():
+        valores = getattr(filtros, campo)
+        if valores:
+            mascara &= dados[coluna].isin(valores).to_numpy(dtype=bool, na_value=False)
+    if filtros.nome:
+        mascara &= dados['Nome'].str.contains(filtros.nome, case=False, regex=False, na=False).to_numpy(dtype=bool, na_value=False)
+    return np.flatnonzero(mascara)
+
+
+def ordenar_linhas(tabela, posicoes, coluna=None, crescente=True):
+    """Posições reordenadas pelo valor de `coluna` (ordem estável, vazios no fim); sem coluna, a ordem da folha."""
+    if coluna is None:
+        return posicoes
+    valores = tabela[coluna].take(posicoes).reset_index(drop=True)
+    ordem = valores.sort_values(ascending=crescente, kind='stable', na_position='last').index.to_numpy()
+    return posicoes[ordem]
+
+
+def opcoes_filtro(dados, coluna):
+    """Valores distintos de uma coluna da folha, em ordem, para as listas de filtros."""
+    serie = dados[coluna]
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.categories.tolist()
+    return sorted(serie.dropna().unique().tolist())
+
+
+def contar_paginas(total_linhas, linhas_por_pagina):
+    return max(1, math.ceil(total_linhas / linhas_por_pagina))
+
+
+def paginar(tabela, posicoes, pagina, linhas_por_pagina):
+    """Recorte da página `pagina` (a partir de 1, limitada às páginas existentes)."""
+    num_paginas = contar_paginas(len(posicoes), linhas_por_pagina)
+    pagina = min(max(int(pagina), 1), num_paginas)
+    inicio = (pagina - 1) * linhas_por_pagina
+    return Pagina(tabela.iloc[posicoes[inicio:inicio + linhas_por_pagina]], inicio, len(posicoes), num_paginas)
+
+
+def totalizar(cubo, totais, filtros, colunas, tabela=None, posicoes=None):
+    """Somas de `colunas` nas linhas filtradas.
+
+    Sem filtros, são os totais gerais; com filtros só de cargo, carga horária
+    e referência, a soma das células do cubo selecionadas (mesmo que sejam
+    todas: as linhas sem chave não passam em nenhum filtro). O filtro por nome
+    precisa de `tabela` e `posicoes` (as linhas filtradas).
+    """
+    if filtros.nome:
+        return tabela[colunas].take(posicoes).sum()
+    ativos = {nivel: getattr(filtros, campo) for nivel, campo in NIVEIS_FILTROS.items() if getattr(filtros, campo)}
+    if not ativos:
+        # Inclui as linhas sem chave, que ficam fora do cubo e só saem da tabela com algum filtro
+        return pd.Series({coluna: totais[coluna] for coluna in colunas})
+    selecao = np.ones(len(cubo), dtype=bool)
+    for nivel, valores in ativos.items():
+        selecao &= cubo.index.get_level_values(nivel).isin(valores)
+    return cubo.loc[selecao, colunas].sum()
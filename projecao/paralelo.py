@@ -0,0 +1,145 @@
+"""Avaliação de lotes de cenários em paralelo, um processo por núcleo.
+
+A folha preparada (`projecao.varredura.FolhaPreparada`) é gravada uma única
+vez como arquivos .npy em um diretório temporário; cada processo abre esses
+arquivos mapeados em memória na inicialização, de modo que todos compartilham
+as mesmas páginas e nenhuma tarefa recebe uma cópia da folha. As tarefas são
+blocos de cenários e os resultados voltam à medida que ficam prontos. Os
+processos são criados com `spawn` (não herdam as threads e travas do processo
+pai, ex.: as do servidor do Streamlit), o que o inicializador com os .npy já
+permite: nada além do caminho do diretório é enviado a eles.
+
+Uso em linha de comando::
+
+    python -m projecao.paralelo cenarios.csv --saida resultados.csv
+
+O arquivo de cenários (CSV ou JSON) tem uma linha por cenário com as colunas
+de `PARAMETROS_CENARIO`; colunas extras (ex.: um nome do plano) são mantidas
+no resultado.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from projecao.dados import carregar_folha
+from projecao.varredura import PARAMETROS_CENARIO, FolhaPreparada, avaliar_cenarios, preparar_folha
+
+# Cenários por tarefa enviada aos processos
+CENARIOS_POR_TAREFA = 256
+
+# Folha aberta por cada processo trabalhador em `_iniciar_trabalhador`
+_FOLHA = None
+
+
+def exportar_folha(folha, diretorio):
+    """Grava os arrays da folha preparada como .npy (e os totais como JSON) em `diretorio`."""
+    diretorio = Path(diretorio)
+    for campo in ('codigos', 'referencias', 'entradas'):
+        np.save(diretorio / f'{campo}.npy', getattr(folha, campo))
+    totais = {chave: float(valor) for chave, valor in folha.totais_anteriores.items()}
+    (diretorio / 'totais_anteriores.json').write_text(json.dumps(totais), encoding='utf-8')
+
+
+def abrir_folha(diretorio):
+    """Abre a folha gravada por `exportar_folha`, com os arrays mapeados em memória (somente leitura)."""
+    diretorio = Path(diretorio)
+    arrays = {campo: np.load(diretorio / f'{campo}.npy', mmap_mode='r') for campo in ('codigos', 'referencias', 'entradas')}
+    totais = json.loads((diretorio / 'totais_anteriores.json').read_text(encoding='utf-8'))
+    return FolhaPreparada(totais_anteriores=totais, **arrays)
+
+
+def _iniciar_trabalhador(diretorio):
+    global _FOLHA
+    _FOLHA = abrir_folha(diretorio)
+
+
+def _avaliar_tarefa(inicio, cenarios):
+    return inicio, avaliar_cenarios(_FOLHA, cenarios)
+
+
+def ler_cenarios(caminho):
+    """Lê o arquivo de cenários (.csv ou .json) e confere se todos os parâmetros estão presentes."""
+    caminho = Path(caminho)
+    if caminho.suffix.lower() == '.json':
+        cenarios = pd.read_json(caminho)
+    elif caminho.suffix.lower() == '.csv':
+        cenarios = pd.read_csv(caminho)
+    else:
+        raise ValueError(f'Formato de cenários não suportado: {caminho.suffix} (use .csv ou .json)')
+    faltando = [parametro for parametro in PARAMETROS_CENARIO if parametro not in cenarios.columns]
+    if faltando:
+        raise ValueError(f'{caminho}: faltam as colunas {faltando}')
+    return cenarios
+
+
+def gravar_resultados(resultados, caminho):
+    """Grava a tabela consolidada no formato indicado pela extensão (.csv, .json, .parquet ou .xlsx)."""
+    caminho = Path(caminho)
+    sufixo = caminho.suffix.lower()
+    if sufixo == '.csv':
+        resultados.to_csv(caminho, index=False)
+    elif sufixo == '.json':
+        resultados.to_json(caminho, orient='records', force_ascii=False, indent=1)
+    elif sufixo == '.parquet':
+        resultados.to_parquet(caminho, index=False)
+    elif sufixo == '.xlsx':
+        resultados.to_excel(caminho, index=False)
+    else:
+        raise ValueError(f'Formato de saída não suportado: {sufixo}')
+
+
+def avaliar_em_paralelo(folha, cenarios, processos=None, cenarios_por_tarefa=CENARIOS_POR_TAREFA):
+    """Gera `(inicio, resultados)` de cada bloco de cenários, na ordem em que os processos terminam.
+
+    `inicio` é a posição do bloco em `cenarios`, para que o chamador possa
+    reordenar ou gravar os blocos conforme chegam.
+    """
+    cenarios = cenarios.reset_index(drop=True)
+    with tempfile.TemporaryDirectory(prefix='projecao-') as diretorio:
+        exportar_folha(folha, diretorio)
+        with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_iniciar_trabalhador, initargs=(diretorio,)) as executor:
+            tarefas = [executor.submit(_avaliar_tarefa, inicio, cenarios.iloc[inicio:inicio + cenarios_por_tarefa])
+                       for inicio in range(0, len(cenarios), cenarios_por_tarefa)]
+            for tarefa in as_completed(tarefas):
+                yield tarefa.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m projecao.paralelo',
+                                     description='Avalia em paralelo um arquivo de cenários do plano de cargos.')
+    parser.add_argument('cenarios', help='arquivo .csv ou .json com um cenário por linha')
+    parser.add_argument('--saida', default='resultados.csv', help='tabela consolidada (.csv, .json, .parquet ou .xlsx)')
+    parser.add_argument('--planilha', default='planilha_impacto_salarial.xlsx', help='folha em .xlsx ou .parquet')
+    parser.add_argument('--aba', default='amc')
+    parser.add_argument('--processos', type=int, default=None, help='padrão: um por núcleo')
+    parser.add_argument('--cenarios-por-tarefa', type=int, default=CENARIOS_POR_TAREFA)
+    args = parser.parse_args(argv)
+
+    cenarios = ler_cenarios(args.cenarios)
+    folha = preparar_folha(carregar_folha(args.planilha, args.aba))
+
+    inicio_execucao = time.perf_counter()
+    blocos, concluidos = [], 0
+    for inicio, resultados in avaliar_em_paralelo(folha, cenarios, args.processos, args.cenarios_por_tarefa):
+        blocos.append(resultados.set_index(pd.RangeIndex(inicio, inicio + len(resultados))))
+        concluidos += len(resultados)
+        print(f'{concluidos}/{len(cenarios)} cenários', file=sys.stderr)
+
+    consolidado = pd.concat(blocos).sort_index() if blocos else cenarios.iloc[:0]
+    gravar_resultados(consolidado, args.saida)
+    print(f'{len(consolidado)} cenários em {time.perf_counter() - inicio_execucao:.1f}s '
+          f'({args.processos or os.cpu_count()} processos) -> {args.saida}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
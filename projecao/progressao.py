@@ -0,0 +1,105 @@
+"""Simulação plurianual da folha: progressão na carreira, reajustes das tabelas e faixas do IRPF de cada ano.
+
+O dashboard projeta um único mês: cada servidor fica na célula `Ref +
+enquadramento` e o impacto anual é o mensal vezes 12. Aqui cada ano do
+horizonte é uma linha de uma conta (ano x servidor): o servidor avança
+`referencias` células da grade a cada `intersticio` anos contados da
+admissão (até a última célula), as tabelas são multiplicadas pelo reajuste
+acumulado do ano e o IRPF usa as faixas do ano. O novo salário, as rubricas e
+os tributos de todos os anos saem das mesmas contas em lote da varredura de
+cenários (ver projecao/varredura.py), com a folha empilhada uma vez por ano,
+em blocos de anos para limitar a memória.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from projecao.impacto import calcular_indicadores
+from projecao.resumo import completar_parametros
+from projecao.rubricas import PLANO_RUBRICAS, avaliar_entradas
+from projecao.tabelas import calcular_novo_salario_lote
+from projecao.tributos import calcular_contribuicoes, calcular_irpf_anos, faixas_irpf_anos
+from projecao.varredura import INDICADORES, LINHAS_POR_BLOCO
+
+# `intersticio`: anos entre duas progressões de um servidor; `referencias`: células da grade avançadas em cada uma
+RegrasProgressao = namedtuple('RegrasProgressao', ['intersticio', 'referencias'], defaults=(2, 1))
+
+
+def anos_admissao(dados):
+    """Ano de admissão de cada servidor (NaN se a folha não tiver a data)."""
+    if 'Admissao' not in dados:
+        return np.full(len(dados), np.nan)
+    return pd.to_datetime(dados['Admissao'], errors='coerce').dt.year.to_numpy(dtype=float, na_value=np.nan)
+
+
+def contar_progressoes(admissao, anos, intersticio):
+    """Progressões de cada servidor do primeiro ano até cada ano, na forma (ano x servidor).
+
+    O servidor progride nos anos em que completa um múltiplo de `intersticio`
+    anos desde a admissão; sem a data de admissão, conta-se do primeiro ano.
+    """
+    anos = np.asarray(anos, dtype=float)
+    admissao = np.where(np.isnan(admissao), anos[0], admissao)
+    return np.floor((anos[:, None] - admissao) / intersticio) - np.floor((anos[0] - admissao) / intersticio)
+
+
+def simular_progressao(folha, admissao, parametros, anos, regras=RegrasProgressao(), reajustes=None, correcoes_irpf=None,
+                       linhas_por_bloco=LINHAS_POR_BLOCO):
+    """Folha, encargos e impacto de cada ano do horizonte, um ano por linha.
+
+    `folha` vem de `projecao.varredura.preparar_folha`, `admissao` de
+    `anos_admissao` e `parametros` são os do plano (ver `PARAMETROS_PADRAO`).
+    `reajustes` e `correcoes_irpf` têm um percentual por ano de `anos` (o
+    primeiro costuma ser 0): o reajuste das tabelas e a correção das faixas do
+    IRPF, acumulados ano a ano. O impacto de cada ano é sobre a folha atual.
+    """
+    parametros = completar_parametros(parametros)
+    anos = np.asarray(anos, dtype=int)
+    num_anos, num_servidores = len(anos), len(folha.codigos)
+    reajustes = np.zeros(num_anos) if reajustes is None else np.asarray(reajustes, dtype=float)
+    fatores = np.cumprod(1 + reajustes / 100)
+    tabelas_irpf = faixas_irpf_anos(anos, correcoes_irpf)
+
+    # Célula da grade de cada servidor em cada ano; quem está fora da grade continua fora
+    ultima = parametros['num_classes'] * parametros['num_referencias']
+    inicial = folha.referencias + parametros['indice_tabela']
+    passos = contar_progressoes(admissao, anos, regras.intersticio) * regras.referencias
+    indices = np.where(inicial <= ultima, np.minimum(inicial + passos, ultima), inicial)
+
+    totais = {chave: np.zeros(num_anos) for chave in folha.totais_anteriores}
+    i_prevfor = PLANO_RUBRICAS.saidas.index('nova_0801-IPM PREVFOR')
+    i_proventos = PLANO_RUBRICAS.saidas.index('novo_0996-TOT.PROVENTO')
+
+    por_bloco = max(1, linhas_por_bloco // max(num_servidores, 1))
+    for inicio in range(0, num_anos, por_bloco):
+        bloco = slice(inicio, min(inicio + por_bloco, num_anos))
+        num_bloco = bloco.stop - bloco.start
+        novo_salario = calcular_novo_salario_lote(folha.codigos, indices[bloco], parametros['TC'], parametros['TR'],
+                                                  parametros['num_classes'], parametros['num_referencias'], 0)
+        novo_salario *= fatores[bloco, None]
+        rubricas = avaliar_entradas(PLANO_RUBRICAS, folha.entradas, repeticoes=num_bloco,
+                                    substituicoes={'Novo Salário': novo_salario.ravel()})
+        contribuicoes = calcular_contribuicoes(rubricas[:, i_prevfor])
+        base_irpf = rubricas[:, i_proventos] - contribuicoes['nova_IPM PREVFOR-SERVIDOR'].to_numpy()
+        irpf = calcular_irpf_anos(base_irpf.reshape(num_bloco, -1), tabelas_irpf[bloco])
+
+        # Somas por ano ignorando vazios, como Series.sum()
+        totais['vencimento_base'][bloco] = np.nansum(novo_salario, axis=1)
+        for chave, coluna in (('ipm_previfor_patronal', 'nova_IPM PREVFOR-PATRONAL'),
+                              ('ipm_previfor_servidor', 'nova_IPM PREVFOR-SERVIDOR')):
+            totais[chave][bloco] = np.nansum(contribuicoes[coluna].to_numpy().reshape(num_bloco, -1), axis=1)
+        totais['imposto_renda'][bloco] = np.nansum(irpf, axis=1)
+
+    indicadores = calcular_indicadores(folha.totais_anteriores, totais)
+    resultado = pd.DataFrame({
+        'Reajuste acumulado (%)': (fatores - 1) * 100,
+        'Progressões no ano': np.concatenate(([0], (np.diff(indices, axis=0) > 0).sum(axis=1))),
+        'Vencimentos (mensal)': indicadores['total_novo_salario'],
+        'Encargos (mensal)': indicadores['impacto_mensal_novo'] - indicadores['total_novo_salario'],
+        'IRPF (mensal)': indicadores['imposto_renda_novo'],
+    }, index=pd.Index(anos, name='Ano'))
+    for coluna, chave in INDICADORES.items():
+        resultado[coluna] = indicadores[chave]
+    resultado['Impacto Líquido Acumulado'] = resultado['Impacto Líquido Anual'].cumsum()
+    return resultado
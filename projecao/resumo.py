@@ -0,0 +1,157 @@
+"""Projeção de um cenário do plano sobre a folha e as tabelas de resultado do dashboard.
+
+`calcular_projecao(dados, parametros)` é o cálculo completo, sem Streamlit:
+recebe a folha e os parâmetros do plano e devolve as mesmas tabelas que o
+dashboard exibe (valores numéricos; a formatação em reais fica na exibição).
+As funções intermediárias são as etapas que o dashboard memoriza no grafo.
+"""
+import pandas as pd
+
+from projecao.agregacao import agregar, fatorar_chaves, por_cargo
+from projecao.dados import juntar
+from projecao.impacto import COLUNAS_ANTERIORES, COLUNAS_NOVAS, calcular_indicadores
+from projecao.rubricas import PLANO_RUBRICAS, avaliar_plano
+from projecao.tabelas import calcular_novo_salario, codificar_tabelas, gerar_grades
+from projecao.tributos import calcular_tributos
+
+# Valores iniciais da barra lateral do dashboard
+PARAMETROS_PADRAO = {
+    'TC': 2,
+    'TR': 2,
+    'num_classes': 5,
+    'num_referencias': 6,
+    'indice_tabela': 0,
+}
+
+
+# Colunas somadas no cubo: os valores atuais e os do cenário
+SOMAS_CUBO = list(COLUNAS_ANTERIORES.values()) + list(COLUNAS_NOVAS.values())
+
+
+def completar_parametros(parametros=None):
+    """Parâmetros do plano com os padrões para as chaves ausentes; chaves desconhecidas são erro."""
+    parametros = {**PARAMETROS_PADRAO, **(parametros or {})}
+    desconhecidos = set(parametros) - set(PARAMETROS_PADRAO)
+    if desconhecidos:
+        raise ValueError(f'Parâmetros desconhecidos: {sorted(desconhecidos)}')
+    return parametros
+
+
+def contar_pessoas(cubo):
+    # Quantidade de pessoas e consolidado do VENCIMENTO BASE por cargo, carga horária e referência, lidos do cubo
+    quantidade_pessoas = cubo[['Quantidade', 'VENCIMENTO BASE']].rename(columns={'VENCIMENTO BASE': 'Consolidado VENCIMENTO BASE'})
+    return quantidade_pessoas.reset_index()
+
+def tabela_novo_salario(df):
+    # Novo salário de cada servidor; os totais ficam nos indicadores e no cubo (a tabela não ganha linha de total)
+    return df[['Nome','CH','Ref', 'VENCIMENTO BASE', 'Novo Salário']]
+
+def calcular_impacto(cubo):
+    # Somar o cubo por cargo: quantidade de funcionários, remuneração anterior e remuneração nova
+    resumo_cargos = por_cargo(cubo[['Quantidade Nome', 'VENCIMENTO BASE', 'Novo Salário']]).reset_index()
+
+    # Calcular o impacto
+    resumo_cargos['Impacto'] = resumo_cargos['Novo Salário'] - resumo_cargos['VENCIMENTO BASE']
+
+    # Renomear colunas
+    resumo_cargos.rename(columns={'Quantidade Nome': 'Quantidade', 'VENCIMENTO BASE': 'Remuneração Anterior', 'Novo Salário': 'Remuneração Nova'}, inplace=True)
+
+    return resumo_cargos
+
+def projetar_folha(dados, codigos, grades, indice_tabela):
+    # Só as colunas do cenário, no mesmo índice da folha; a folha carregada não é alterada
+
+    # Calcular novo salário usando a Tabela 1
+    novo_salario = calcular_novo_salario(dados, grades, pular_indice=indice_tabela, codigos=codigos)
+
+    # Recalcular as rubricas sobre o novo salário (ver projecao/rubricas.py)
+    novas_rubricas = avaliar_plano(PLANO_RUBRICAS, dados, colunas={'Novo Salário': novo_salario})
+
+    # Contribuições previdenciárias e IRPF por faixas (ver projecao/tributos.py)
+    tributos = calcular_tributos(novas_rubricas['nova_0801-IPM PREVFOR'], novas_rubricas['novo_0996-TOT.PROVENTO'])
+
+    return pd.concat([pd.DataFrame({'Novo Salário': novo_salario}, index=dados.index), novas_rubricas, tributos], axis=1)
+
+def calcular_resumo(dados, folha, chaves=None):
+    # Visão da folha base com as colunas do cenário, sem cópia
+    df = juntar(dados, folha)
+
+    # Uma única passada pelas linhas: contagens e somas por (Cargo, CH, Ref) e totais gerais (ver projecao/agregacao.py).
+    # As chaves fatoradas não dependem do cenário e podem vir prontas
+    if chaves is None:
+        chaves = fatorar_chaves(dados)
+    cubo, totais = agregar(chaves, df, somas=SOMAS_CUBO)
+
+    return {'tabela_com_novo_salario': tabela_novo_salario(df), **resumir_cubo(cubo, totais)}
+
+def resumir_cubo(cubo, totais):
+    # Tabelas de resultado a partir do cubo (Cargo, CH, Ref) e dos totais gerais, sem voltar às linhas da folha
+
+    # Quantidade de pessoas por cargo, carga horária e referência
+    quantidade_pessoas = contar_pessoas(cubo)
+
+    # Adicionando o totalizador geral
+    total_quantidade = quantidade_pessoas['Quantidade'].sum()
+    total_cons_venc_base = quantidade_pessoas['Consolidado VENCIMENTO BASE'].sum()
+    total_geral = pd.DataFrame({'Cargo': ['Total Geral'], 'Quantidade': [total_quantidade], 'Consolidado VENCIMENTO BASE': [total_cons_venc_base]})
+
+    quantidade_pessoas = pd.concat([quantidade_pessoas, total_geral], ignore_index=True)
+
+    # Encargos e impactos a partir dos totais anteriores e novos (ver projecao/impacto.py)
+    e = calcular_indicadores({chave: totais[coluna] for chave, coluna in COLUNAS_ANTERIORES.items()},
+                             {chave: totais[coluna] for chave, coluna in COLUNAS_NOVAS.items()})
+
+    # Calcular o resumo dos cargos
+    resumo_cargos = calcular_impacto(cubo)
+
+    # Totalizadores da tabela de impacto
+    resumo_cargos.loc['Total', ['Cargo', 'Quantidade', 'Remuneração Anterior', 'Remuneração Nova', 'Impacto']] = ['',total_quantidade, e['total_vencimento_base'], e['total_novo_salario'], e['total_impacto']]
+
+    # Adicionar linha com subtítulo "Encargos" logo abaixo dos totalizadores
+    resumo_cargos.loc[''] = ['Encargos', '', '', '', '']
+    resumo_cargos.loc[len(resumo_cargos)] = ['Provisão de férias', '', e['provisao_ferias_rem_anterior'], e['provisao_ferias_nova'], e['provisao_ferias_impacto']]
+    resumo_cargos.loc[len(resumo_cargos)] = ['Provisão de 13º Salário', '', e['provisao_decimo_rem_anterior'], e['provisao_decimo_nova'], e['provisao_decimo_impacto']]
+    resumo_cargos.loc[len(resumo_cargos)] = ['Fortaleza Saúde- IPM (4%)', '', e['provisao_ipm_rem_anterior'], e['provisao_ipm_nova'], e['provisao_ipm_impacto']]
+    resumo_cargos.loc[len(resumo_cargos)] = ['IPM – PREVIFOR-FIN (28%)', '', e['ipm_previfor_anterior'], e['nova_ipm_previfor'], e['ipm_previfor_impacto']]
+    resumo_cargos.loc[len(resumo_cargos)] = ['IMPACTO MENSAL', '', e['impacto_mensal_ant'], e['impacto_mensal_novo'], e['impacto_mensal_impacto']]
+    resumo_cargos.loc[len(resumo_cargos)] = ['IMPACTO ANUAL', '', e['impacto_anual_ant'], e['impacto_anual_novo'], e['impacto_anual_impacto']]
+
+    # Criar DataFrame com os resultados
+    dados = {
+        'Item': ['IMPOSTO DE RENDA', 'IPM-PREVIFOR (Patronal)', 'IPM-PREVIFOR (Servidor)', 'VALOR MENSAL', 'VALOR ANUAL'],
+        'Remuneração Anterior': [e['imposto_renda_anterior'], e['ipm_previfor_patronal_anterior'], e['ipm_previfor_servidor_anterior'], e['valor_mensal_anterior'], e['valor_anual_anterior']],
+        'Remuneração Nova': [e['imposto_renda_novo'], e['ipm_previfor_patronal_novo'], e['ipm_previfor_servidor_novo'], e['valor_mensal_novo'], e['valor_anual_novo']],
+        'Impacto': [e['impacto_imposto_renda'], e['impacto_ipm_previfor_patronal'], e['impacto_ipm_previfor_servidor'], e['impacto_mensal'], e['impacto_anual']]
+    }
+
+    # Criar DataFrame com os totais
+    dados_totais = {
+        'Item': ['Impacto Líquido Mensal', 'Impacto Líquido Anual'],
+        'Remuneração Anterior': [e['remuneracao_total_anterior'], e['remuneracao_anual_anterior']],
+        'Remuneração Nova': [e['remuneracao_total_nova'], e['remuneracao_anual_nova']],
+        'Impacto': [e['impacto_mensal_total'], e['impacto_anual_total']]
+    }
+
+    return {
+        'resumo_cargos': resumo_cargos,
+        'suavizacoes': pd.DataFrame(dados),
+        'totais': pd.DataFrame(dados_totais),
+        'indicadores': e,
+        'cubo': cubo,
+        'totais_gerais': totais,
+    }
+
+
+def calcular_projecao(dados, parametros=None, salarios_base=None):
+    """Calcula um cenário completo: da folha e dos parâmetros do plano às tabelas de resultado.
+
+    `parametros` tem as chaves de `PARAMETROS_PADRAO` (as ausentes usam o
+    padrão). Devolve o dicionário de `calcular_resumo`: `resumo_cargos`,
+    `suavizacoes`, `totais`, `tabela_com_novo_salario`, `indicadores`, o cubo
+    (Cargo, CH, Ref) com as somas do cenário e os totais gerais do cubo.
+    `salarios_base` troca as bases das tabelas (padrão: `SALARIOS_BASE`).
+    """
+    parametros = completar_parametros(parametros)
+    grades = gerar_grades(parametros['TC'], parametros['TR'], parametros['num_classes'], parametros['num_referencias'], salarios_base)
+    folha = projetar_folha(dados, codificar_tabelas(dados), grades, parametros['indice_tabela'])
+    return calcular_resumo(dados, folha)
@@ -0,0 +1,223 @@
+"""Tabela declarativa das rubricas recalculadas sobre o novo salário e o motor que a avalia.
+
+Cada rubrica é de um de três tipos:
+
+* `percentual`: `referencia * sobre / 100` (ex.: ITA = REF-ITA % do novo salário);
+* `soma`: combinação linear de colunas e de outras rubricas (bases de cálculo);
+* `hora`: `base / CH * fator * referencia`, com arredondamento opcional.
+
+`compilar_plano` ordena as rubricas por dependência em níveis e, em cada
+nível, junta as rubricas do mesmo tipo em uma única operação: as somas
+viram um produto matriz x matriz com a matriz de coeficientes, as demais
+uma operação elementar sobre blocos de colunas. Tudo é avaliado sobre um
+único array float64 contíguo por coluna.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+Rubrica = namedtuple('Rubrica', ['nome', 'tipo', 'base', 'referencia', 'fator', 'casas'])
+
+
+def percentual(nome, referencia, sobre='Novo Salário'):
+    return Rubrica(nome, 'percentual', {sobre: 1.0}, referencia, None, None)
+
+
+def soma(nome, parcelas):
+    """`parcelas` é uma lista de colunas (repetições somam) ou um dicionário coluna -> coeficiente."""
+    if not isinstance(parcelas, dict):
+        coeficientes = {}
+        for coluna in parcelas:
+            coeficientes[coluna] = coeficientes.get(coluna, 0.0) + 1.0
+        parcelas = coeficientes
+    return Rubrica(nome, 'soma', dict(parcelas), None, None, None)
+
+
+def hora(nome, base, fator, referencia, casas=None):
+    return Rubrica(nome, 'hora', {base: 1.0}, referencia, fator, casas)
+
+
+# Vantagens fixas que entram nas bases de hora extra e hora noturna
+VANTAGENS_INCORPORADAS = [
+    '0223-VP', '0248-VPNI HEI', '0001-G.F.INC-DNI1', '0004-G.R.INC.DAS1', '0005-G.R.INC.DAS2',
+    '0006-G.R.INC.DAS3', '0007-G.R.INC.DNS1', '0008-G.R.INC.DNS2', '0009-G.R.INC.DNS3',
+    '0026-GR INC AT1', '0027-GR INC AT2',
+]
+
+# Gratificações que compõem o total de proventos mas não as bases de hora
+GRATIFICACOES_CARGO = [
+    '0308-DIF.AJ.PCCS', '0320-GAJ 9903/12', '0170-DIR.NIV.SUPE', '0174-VRB.ESP.REP', '0180-DIR.ASS.SUPE',
+    '0190-DIR.NIV.INT.', '058-DIR GER 01', '0326-GTRTC', '0206-AB.PERMANENC',
+]
+
+RUBRICAS = [
+    percentual('novo_0085-ITA', 'REF-ITA'),
+    percentual('novo_0107-ANUENIO', 'REF-ANUENIO'),
+    percentual('nova_105-INSALUBRIDAD', 'REF-INSALUBRIDAD'),
+    percentual('nova_0118-GR.PRODUT_', 'REF-GR.PRODUT'),
+    percentual('nova_0096-GAT', 'REF-GAT'),
+    percentual('nova_0097-GEEF-AMC', 'REF-GEEF-AMC'),
+    percentual('nova_0159-GR.R.VIDA', 'REF-GR.R.VIDA'),
+    percentual('nova_0318-GE AMC', 'REF-GE AMC'),
+    soma('novo_0817-B HR INC', VANTAGENS_INCORPORADAS + [
+        'Novo Salário', 'novo_0085-ITA', 'novo_0107-ANUENIO', 'nova_105-INSALUBRIDAD', 'nova_0118-GR.PRODUT_',
+        'nova_0159-GR.R.VIDA', 'nova_0318-GE AMC',
+    ]),
+    hora('nova_0133-HR.EXTR.INCO', 'novo_0817-B HR INC', 1.25, 'REF-HR.EXTR.INCO', casas=2),
+    soma('novo_0996-TOT.PROVENTO', [
+        'Novo Salário', 'novo_0085-ITA', 'novo_0107-ANUENIO', 'nova_105-INSALUBRIDAD', 'nova_0118-GR.PRODUT_',
+        'nova_0096-GAT', 'nova_0097-GEEF-AMC', 'nova_0159-GR.R.VIDA', 'nova_0318-GE AMC', 'nova_0133-HR.EXTR.INCO',
+    ] + VANTAGENS_INCORPORADAS + GRATIFICACOES_CARGO),
+    # A VP (0223) entra duas vezes na base de hora noturna, como na planilha original
+    soma('nova_0872-B HR NOTURNA', ['nova_0133-HR.EXTR.INCO', '0223-VP'] + VANTAGENS_INCORPORADAS + [
+        'Novo Salário', 'novo_0085-ITA', 'novo_0107-ANUENIO', 'nova_105-INSALUBRIDAD', 'nova_0118-GR.PRODUT_',
+        'nova_0096-GAT', 'nova_0097-GEEF-AMC', 'nova_0159-GR.R.VIDA', 'nova_0318-GE AMC',
+    ]),
+    hora('nova_0099-HR NOTURNAS', 'nova_0872-B HR NOTURNA', 0.2, 'REF-HR NOTURNAS'),
+    hora('nova_0183-GR SER EXTRA', 'nova_0872-B HR NOTURNA', 1.5, 'REF-GR SER EXTRA'),
+    hora('nova_0383-HE NOTURNA', 'nova_0872-B HR NOTURNA', 1.5 * 1.2, 'REF-HE NOTURNA'),
+    soma('nova_0801-IPM PREVFOR', [
+        'Novo Salário', 'novo_0085-ITA', 'novo_0107-ANUENIO', 'nova_105-INSALUBRIDAD', 'nova_0118-GR.PRODUT_',
+        'nova_0096-GAT', 'nova_0097-GEEF-AMC', 'nova_0318-GE AMC', 'nova_0133-HR.EXTR.INCO',
+    ] + VANTAGENS_INCORPORADAS + ['0308-DIF.AJ.PCCS']),
+]
+# As contribuições previdenciárias e o IRPF, calculados sobre 0801 e 0996, ficam em projecao/tributos.py
+
+Plano = namedtuple('Plano', ['entradas', 'saidas', 'etapas'])
+
+
+def _dependencias(rubrica):
+    dependencias = list(rubrica.base)
+    if rubrica.referencia is not None:
+        dependencias.append(rubrica.referencia)
+    if rubrica.tipo == 'hora':
+        dependencias.append('CH')
+    return dependencias
+
+
+def compilar_plano(rubricas):
+    """Ordena as rubricas em níveis de dependência e agrupa cada nível por tipo.
+
+    As colunas do array de trabalho são as entradas (colunas da folha) seguidas
+    das rubricas na ordem de avaliação. Cada etapa é `(tipo, saidas, ...)` com
+    os índices de colunas já resolvidos.
+    """
+    por_nome = {rubrica.nome: rubrica for rubrica in rubricas}
+    if len(por_nome) != len(rubricas):
+        raise ValueError('Rubricas com nomes repetidos')
+
+    niveis = {}
+
+    def nivel(nome, caminho=()):
+        if nome not in por_nome:
+            return 0
+        if nome in caminho:
+            raise ValueError(f'Dependência circular entre rubricas: {" -> ".join(caminho + (nome,))}')
+        if nome not in niveis:
+            niveis[nome] = 1 + max(nivel(dependencia, caminho + (nome,)) for dependencia in _dependencias(por_nome[nome]))
+        return niveis[nome]
+
+    for rubrica in rubricas:
+        nivel(rubrica.nome)
+
+    entradas = []
+    for rubrica in rubricas:
+        for dependencia in _dependencias(rubrica):
+            if dependencia not in por_nome and dependencia not in entradas:
+                entradas.append(dependencia)
+    saidas = sorted(por_nome, key=lambda nome: niveis[nome])
+    posicao = {nome: i for i, nome in enumerate(entradas + saidas)}
+
+    etapas = []
+    for n in sorted(set(niveis.values())):
+        for tipo in ('percentual', 'hora', 'soma'):
+            grupo = [por_nome[nome] for nome in saidas if niveis[nome] == n and por_nome[nome].tipo == tipo]
+            if not grupo:
+                continue
+            destino = np.array([posicao[r.nome] for r in grupo])
+            if tipo == 'soma':
+                usadas = sorted({posicao[coluna] for r in grupo for coluna in r.base})
+                linha = {coluna: i for i, coluna in enumerate(usadas)}
+                coeficientes = np.zeros((len(usadas), len(grupo)))
+                for j, r in enumerate(grupo):
+                    for coluna, coeficiente in r.base.items():
+                        coeficientes[linha[posicao[coluna]], j] += coeficiente
+                etapas.append(('soma', destino, np.array(usadas), coeficientes))
+            else:
+                base = np.array([posicao[next(iter(r.base))] for r in grupo])
+                referencia = np.array([posicao[r.referencia] for r in grupo])
+                fator = np.array([np.nan if r.fator is None else r.fator for r in grupo])
+                casas = [(j, r.casas) for j, r in enumerate(grupo) if r.casas is not None]
+                etapas.append((tipo, destino, base, referencia, fator, casas))
+    return Plano(entradas, saidas, etapas)
+
+
+def _coluna(df, colunas, nome, nomes_limpos):
+    if colunas is not None and nome in colunas:
+        return colunas[nome]
+    # Cabeçalhos da planilha podem vir com espaços à direita
+    return df[nomes_limpos.get(nome, nome)]
+
+
+def montar_entradas(plano, df, colunas=None):
+    """Matriz (servidor x entrada) float64, contígua por coluna, com as entradas do plano.
+
+    `colunas` permite fornecer entradas fora de `df` (ex.: `{'Novo Salário': array}`).
+    """
+    nomes_limpos = {str(coluna).strip(): coluna for coluna in df.columns}
+    entradas = np.empty((len(df), len(plano.entradas)), order='F')
+    for i, nome in enumerate(plano.entradas):
+        entradas[:, i] = np.asarray(_coluna(df, colunas, nome, nomes_limpos), dtype=float)
+    return entradas
+
+
+def avaliar_entradas(plano, entradas, repeticoes=1, substituicoes=None):
+    """Avalia o plano sobre uma matriz de entradas e devolve a matriz (linha x rubrica).
+
+    Com `repeticoes`, a folha é empilhada essa quantidade de vezes (um bloco
+    por cenário) sem copiar `entradas` antes; `substituicoes` troca colunas de
+    entrada inteiras, já no tamanho empilhado (ex.: o novo salário de cada
+    cenário). NaN em uma parcela propaga para a rubrica, como na soma de Series.
+    """
+    num_entradas = len(plano.entradas)
+    num_linhas = entradas.shape[0] * repeticoes
+    substituicoes = substituicoes or {}
+    matriz = np.empty((num_linhas, num_entradas + len(plano.saidas)), order='F')
+    for i, nome in enumerate(plano.entradas):
+        if nome in substituicoes:
+            matriz[:, i] = substituicoes[nome]
+        else:
+            matriz[:, i].reshape(repeticoes, -1)[:] = entradas[:, i]
+    ch = matriz[:, plano.entradas.index('CH')] if 'CH' in plano.entradas else None
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for etapa in plano.etapas:
+            tipo, destino = etapa[0], etapa[1]
+            if tipo == 'soma':
+                _, _, usadas, coeficientes = etapa
+                parcelas = matriz[:, usadas]
+                nulos = np.isnan(parcelas)
+                resultado = np.where(nulos, 0.0, parcelas) @ coeficientes
+                if nulos.any():
+                    resultado[(nulos @ (coeficientes != 0)) > 0] = np.nan
+            else:
+                _, _, base, referencia, fator, casas = etapa
+                if tipo == 'percentual':
+                    resultado = matriz[:, referencia] * matriz[:, base] / 100
+                else:
+                    resultado = matriz[:, base] / ch[:, None] * fator * matriz[:, referencia]
+                for j, num_casas in casas:
+                    resultado[:, j] = np.round(resultado[:, j], num_casas)
+            matriz[:, destino] = resultado
+
+    return matriz[:, num_entradas:]
+
+
+def avaliar_plano(plano, df, colunas=None):
+    """Calcula todas as rubricas do plano e devolve um DataFrame só com elas."""
+    rubricas = avaliar_entradas(plano, montar_entradas(plano, df, colunas))
+    return pd.DataFrame(rubricas, index=df.index, columns=plano.saidas)
+
+
+PLANO_RUBRICAS = compilar_plano(RUBRICAS)
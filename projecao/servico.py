@@ -0,0 +1,55 @@
+"""Recursos do dashboard que não dependem do Streamlit: o armazém das folhas, o cache de resultados e o resumo de um cenário.
+
+O módulo `compartilhado` (na raiz, ao lado do dashboard) guarda o armazém e o
+cache com `st.cache_resource` para todas as páginas; o aquecimento
+(`python -m projecao.aquecer`) usa as mesmas funções fora do Streamlit, de
+modo que as chaves e os arquivos que ele grava são exatamente os que o
+dashboard procura na primeira execução.
+
+Configuração por variáveis de ambiente:
+
+* `PROJECAO_PLANILHAS`: planilhas lidas (padrões separados por `:`; padrão `*.xlsx`);
+* `PROJECAO_CACHE_MB`: orçamento em memória do cache de resultados;
+* `PROJECAO_CACHE_PASTA`: pasta da cópia em disco (padrão `.cache_resultados`; vazia: só memória);
+* `PROJECAO_CACHE_CHAVE`: chave secreta que assina os arquivos da cópia em disco; a mesma para o dashboard e
+  o aquecimento (sem ela, cada processo só lê os arquivos que ele mesmo gravou).
+"""
+import os
+
+from projecao.armazem import PADRAO_PLANILHAS, carregar_armazem, encontrar_planilhas
+from projecao.cache_resultados import ORCAMENTO_MEMORIA, CacheResultados, compactar_resumo, expandir_resumo
+from projecao.dados import congelar
+from projecao.diagnostico import execucao_registrada, instrumentar
+from projecao.resumo import calcular_resumo, projetar_folha
+
+# Parâmetros da barra lateral que costumam andar um passo por vez, com o passo e o mínimo dos seus campos
+PASSOS_VIZINHOS = {'indice_tabela': 1, 'TC': 1, 'TR': 1}
+MINIMOS_VIZINHOS = {'indice_tabela': 0}
+
+
+def abrir_armazem():
+    """Folhas de todos os órgãos das planilhas de `PROJECAO_PLANILHAS`, com a folha somente leitura (ver `congelar`)."""
+    armazem = carregar_armazem(encontrar_planilhas(os.environ.get('PROJECAO_PLANILHAS', PADRAO_PLANILHAS)))
+    return armazem._replace(folha=congelar(armazem.folha))
+
+
+def abrir_cache_resultados():
+    """Cache de resultados dos cenários com o orçamento, a pasta e a chave das variáveis de ambiente."""
+    return CacheResultados(orcamento_memoria=int(os.environ.get('PROJECAO_CACHE_MB', ORCAMENTO_MEMORIA // 2**20)) * 2**20,
+                           pasta=os.environ.get('PROJECAO_CACHE_PASTA', '.cache_resultados') or None,
+                           chave_disco=os.environ.get('PROJECAO_CACHE_CHAVE') or None)
+
+
+def chave_cenario(impressao, orgaos, TC, TR, num_classes, num_referencias, indice_tabela):
+    """Chave de um cenário: a impressão digital da folha, os órgãos e os parâmetros do plano."""
+    return (impressao, orgaos, float(TC), float(TR), int(num_classes), int(num_referencias), int(indice_tabela))
+
+
+def resumir(cache, chave, dados, codigos, grades, chaves, indice_tabela):
+    """Resumo do cenário pelo cache: o mesmo cenário sobre a mesma folha é calculado uma vez para todas as sessões."""
+    @execucao_registrada
+    def calcular():
+        folha = instrumentar('folha', projetar_folha)(dados, codigos, grades, indice_tabela)
+        return compactar_resumo(calcular_resumo(dados, folha, chaves))
+
+    return expandir_resumo(cache.obter_ou_calcular(chave, calcular), dados)
@@ -0,0 +1,145 @@
+"""Tabelas salariais por nível e carga horária e consulta vetorizada do novo salário."""
+import numpy as np
+import pandas as pd
+
+# Salário base (classe 1, referência 1) de cada tabela, por nível e carga horária
+SALARIOS_BASE = {
+    ('B', 180): 886.29,
+    ('C', 180): 1160.66,
+    ('D', 180): 1582.67,
+    ('B', 240): 1181.71,
+    ('C', 240): 1547.55,
+    ('D', 240): 2110.22,
+}
+
+# Chaves das tabelas na mesma ordem das linhas da matriz de grades
+CHAVES_TABELAS = pd.MultiIndex.from_tuples(list(SALARIOS_BASE), names=['Nivel', 'CH'])
+
+
+def arredondar_centavos(valores):
+    """Arredonda para centavos com o mesmo resultado de `float(f'{valor:.2f}')`, elemento a elemento.
+
+    `np.round` multiplica por 100 antes de arredondar, e perto de meio centavo
+    o produto pode cair do outro lado; esses poucos valores são refeitos com a
+    formatação decimal do Python, que arredonda o valor binário exato.
+    """
+    valores = np.asarray(valores, dtype=float)
+    arredondados = np.array(np.round(valores, 2))
+    with np.errstate(invalid='ignore'):
+        centavos = valores * 100
+        duvidosos = np.abs(centavos - np.floor(centavos) - 0.5) < 1e-6
+    if duvidosos.any():
+        arredondados[duvidosos] = [float(f'{valor:.2f}') for valor in valores[duvidosos]]
+    return arredondados
+
+
+def encadear_celulas(salarios_base, TC, TR, num_referencias, num_celulas):
+    """Células das tabelas na ordem do índice (1 a `num_celulas`), pela mesma cadeia da planilha.
+
+    A célula 1 é o salário base; cada célula seguinte é a anterior arredondada
+    a centavos acrescida de `TC`% (primeira referência de uma classe) ou de
+    `TR`% (demais referências). O valor da própria célula não é arredondado:
+    é o que a folha traz no VENCIMENTO BASE; o arredondamento só entra na
+    passagem para a célula seguinte e na exibição.
+
+    `TC`, `TR` e `num_referencias` podem ser arrays de cenários que se combinam
+    por broadcast com `salarios_base.shape[:-1]`; a cadeia é sequencial nas
+    células e vetorizada nas tabelas e nos cenários. Devolve a forma
+    `broadcast(...) + (num_celulas,)`, em que `[..., k - 1]` é a célula de índice `k`.
+    """
+    salarios_base = np.asarray(salarios_base, dtype=float)
+    fator_classe = np.asarray(1 + np.asarray(TC, dtype=float) / 100)
+    fator_referencia = np.asarray(1 + np.asarray(TR, dtype=float) / 100)
+    num_referencias = np.asarray(num_referencias)
+    forma = np.broadcast_shapes(salarios_base.shape, fator_classe.shape, fator_referencia.shape, num_referencias.shape)
+    celulas = np.empty(forma + (num_celulas,))
+    celulas[..., 0] = salarios_base
+    with np.errstate(invalid='ignore'):
+        for k in range(1, num_celulas):
+            fator = np.where(k % num_referencias == 0, fator_classe, fator_referencia)
+            celulas[..., k] = arredondar_centavos(celulas[..., k - 1]) * fator
+    return celulas
+
+
+def gerar_celulas(TC, TR, num_classes, num_referencias, salarios_base):
+    """Gera os valores de todas as células das tabelas (ver `encadear_celulas`).
+
+    Devolve um array float64 de forma `salarios_base.shape + (num_classes, num_referencias)`,
+    contíguo por classe: `celulas.reshape(..., -1)[..., k - 1]` é a célula de índice `k`.
+    """
+    salarios_base = np.asarray(salarios_base, dtype=float)
+    celulas = encadear_celulas(salarios_base, TC, TR, num_referencias, num_classes * num_referencias)
+    return celulas.reshape(salarios_base.shape + (num_classes, num_referencias))
+
+
+def gerar_grade_salarios(TC, TR, num_classes, num_referencias, salario_base):
+    """Tabela de uma carga horária como matriz (referência x classe)."""
+    return gerar_celulas(TC, TR, num_classes, num_referencias, salario_base).T
+
+
+def gerar_grades(TC, TR, num_classes, num_referencias, salarios_base=None):
+    """Matriz densa (tabela x índice da célula) com todas as tabelas de `salarios_base`.
+
+    A coluna `k - 1` guarda a célula de índice `k`. Por padrão usa as seis
+    tabelas de `SALARIOS_BASE`, na ordem de `CHAVES_TABELAS`.
+    """
+    if salarios_base is None:
+        salarios_base = list(SALARIOS_BASE.values())
+    celulas = gerar_celulas(TC, TR, num_classes, num_referencias, salarios_base)
+    return celulas.reshape(len(salarios_base), -1)
+
+
+def codificar_tabelas(df):
+    """Devolve, para cada servidor, a linha da sua tabela na matriz de grades (-1 se não houver)."""
+    nivel = df['Niv'].str.slice(0, 1)
+    return CHAVES_TABELAS.get_indexer(pd.MultiIndex.from_arrays([nivel.astype(object), np.asarray(df['CH'], dtype=float)]))
+
+
+def calcular_novo_salario(df, grades, pular_indice=0, codigos=None):
+    """Consulta o novo salário de todos os servidores em uma única indexação.
+
+    O índice da célula é `Ref + pular_indice`. Servidores sem tabela ou com
+    índice fora da grade recebem NaN.
+    """
+    if codigos is None:
+        codigos = codificar_tabelas(df)
+    indice = df['Ref'].to_numpy(dtype=float, na_value=np.nan) + pular_indice
+
+    validos = (codigos >= 0) & (indice >= 1) & (indice <= grades.shape[1]) & (indice == np.floor(indice))
+    novo_salario = np.full(len(indice), np.nan)
+    novo_salario[validos] = grades[codigos[validos], indice[validos].astype(np.intp) - 1]
+    return novo_salario
+
+
+def calcular_novo_salario_lote(codigos, referencias, TC, TR, num_classes, num_referencias, pular_indice,
+                               salarios_base=None):
+    """Novo salário de todos os servidores em vários cenários de uma vez.
+
+    Os parâmetros de cenário são arrays de tamanho S (ou escalares) e o
+    resultado tem forma (S, servidores). As células de cada cenário saem da
+    mesma cadeia arredondada de `gerar_grades` (ver `encadear_celulas`),
+    montada para todos os cenários de uma vez, e cada servidor recebe a
+    célula de índice `Ref + pular_indice` da sua tabela. `salarios_base` é uma
+    lista com a base de cada tabela ou um array (S x tabelas) com as bases de
+    cada cenário.
+    """
+    if salarios_base is None:
+        salarios_base = list(SALARIOS_BASE.values())
+    TC, TR, num_classes, num_referencias, pular_indice = (
+        np.asarray(parametro, dtype=float).reshape(-1, 1)
+        for parametro in (TC, TR, num_classes, num_referencias, pular_indice)
+    )
+    codigos = np.asarray(codigos)
+    # Células (cenário x tabela x índice) até a maior grade entre os cenários; as que passam da grade de um cenário
+    # ficam de fora pela máscara
+    num_celulas = max(int(np.max(num_classes * num_referencias)), 1)
+    celulas = encadear_celulas(salarios_base, TC, TR, num_referencias, num_celulas)
+    celulas = celulas.reshape((-1,) + celulas.shape[-2:])
+
+    indice = np.asarray(referencias, dtype=float) + pular_indice
+    validos = (codigos >= 0) & (indice >= 1) & (indice <= num_classes * num_referencias) & (indice == np.floor(indice))
+    forma = validos.shape
+    cenario = np.broadcast_to(np.arange(len(celulas)).reshape(-1, 1), forma)
+    tabela = np.broadcast_to(np.where(codigos >= 0, codigos, 0), forma)
+    posicao = np.where(validos, np.broadcast_to(indice, forma), 1).astype(np.intp) - 1
+    return np.where(validos, celulas[cenario, tabela, posicao], np.nan)
@@ -0,0 +1,89 @@
+"""IRPF por faixas progressivas e contribuições previdenciárias, calculados por coluna inteira."""
+import numpy as np
+import pandas as pd
+
+# Faixas mensais do IRPF por ano: (limite inferior, alíquota, parcela a deduzir).
+# A faixa vale para bases estritamente acima do limite inferior; abaixo da primeira é isento.
+TABELAS_IRPF = {
+    2024: (
+        (1903.98, 0.075, 142.80),
+        (2826.65, 0.15, 354.80),
+        (3751.05, 0.225, 636.13),
+        (4664.68, 0.275, 869.36),
+    ),
+}
+ANO_IRPF_PADRAO = 2024
+
+# Alíquotas do IPM PREVFOR sobre a base previdenciária (0801)
+ALIQUOTAS_PREVIDENCIA = {
+    'nova_IPM PREVFOR-PATRONAL': 0.28,
+    'nova_IPM PREVFOR-SERVIDOR': 0.14,
+}
+
+
+def calcular_irpf(base_irpf, faixas=TABELAS_IRPF[ANO_IRPF_PADRAO]):
+    """IRPF de cada base, localizando a faixa por busca binária nos limites ordenados.
+
+    Bases vazias (NaN) resultam em imposto zero.
+    """
+    limites, aliquotas, deducoes = (np.array(coluna, dtype=float) for coluna in zip(*faixas))
+    aliquotas = np.concatenate(([0.0], aliquotas))
+    deducoes = np.concatenate(([0.0], deducoes))
+
+    base_irpf = np.asarray(base_irpf, dtype=float)
+    faixa = np.searchsorted(limites, base_irpf, side='left')
+    imposto = base_irpf * aliquotas[faixa] - deducoes[faixa]
+    return np.where(np.isnan(base_irpf), 0.0, imposto)
+
+
+def faixas_irpf_anos(anos, correcoes=None):
+    """Faixas do IRPF de cada ano, como array (ano x faixa x (limite, alíquota, dedução)).
+
+    Cada ano usa a tabela de `TABELAS_IRPF` do próprio ano ou a última
+    anterior (anos antes da primeira tabela usam a primeira). Limites e
+    deduções são corrigidos pelas `correcoes` (% de cada ano de `anos`)
+    acumuladas desde o ano seguinte ao da tabela usada.
+    """
+    anos = np.asarray(anos)
+    correcoes = np.zeros(len(anos)) if correcoes is None else np.asarray(correcoes, dtype=float)
+    anos_tabelas = np.array(sorted(TABELAS_IRPF))
+    posicao = np.maximum(np.searchsorted(anos_tabelas, anos, side='right') - 1, 0)
+    tabelas = np.array([TABELAS_IRPF[ano] for ano in anos_tabelas], dtype=float)[posicao]
+
+    # Correção acumulada, para cada ano, dos anos posteriores ao da sua tabela até ele
+    acumular = (anos[None, :] > anos_tabelas[posicao][:, None]) & (anos[None, :] <= anos[:, None])
+    fator = np.where(acumular, 1 + correcoes / 100, 1.0).prod(axis=1)
+    tabelas[:, :, [0, 2]] *= fator[:, None, None]
+    return tabelas
+
+
+def calcular_irpf_anos(base_irpf, tabelas):
+    """IRPF de bases na forma (ano x servidor), com as faixas de cada ano (ver `faixas_irpf_anos`).
+
+    A faixa é a quantidade de limites abaixo da base, como em `calcular_irpf`.
+    """
+    base_irpf = np.asarray(base_irpf, dtype=float)
+    zeros = np.zeros((len(tabelas), 1))
+    aliquotas = np.concatenate((zeros, tabelas[:, :, 1]), axis=1)
+    deducoes = np.concatenate((zeros, tabelas[:, :, 2]), axis=1)
+
+    faixa = np.zeros(base_irpf.shape, dtype=np.intp)
+    for limite in tabelas[:, :, 0].T:
+        faixa += base_irpf > limite[:, None]
+    imposto = base_irpf * np.take_along_axis(aliquotas, faixa, axis=1) - np.take_along_axis(deducoes, faixa, axis=1)
+    return np.where(np.isnan(base_irpf), 0.0, imposto)
+
+
+def calcular_contribuicoes(base_previdencia, aliquotas=ALIQUOTAS_PREVIDENCIA):
+    """Uma coluna por alíquota, calculadas de uma vez como produto externo."""
+    valores = np.multiply.outer(np.asarray(base_previdencia, dtype=float), np.array(list(aliquotas.values())))
+    return pd.DataFrame(valores, index=getattr(base_previdencia, 'index', None), columns=list(aliquotas))
+
+
+def calcular_tributos(base_previdencia, total_proventos, faixas=TABELAS_IRPF[ANO_IRPF_PADRAO],
+                      aliquotas=ALIQUOTAS_PREVIDENCIA):
+    """Contribuições previdenciárias, base do IRPF (proventos menos contribuição do servidor) e IRPF."""
+    tributos = calcular_contribuicoes(base_previdencia, aliquotas)
+    tributos['nova_base_IRPF'] = np.asarray(total_proventos, dtype=float) - tributos['nova_IPM PREVFOR-SERVIDOR'].to_numpy()
+    tributos['nova_IRPF'] = calcular_irpf(tributos['nova_base_IRPF'].to_numpy(), faixas)
+    return tributos
@@ -0,0 +1,97 @@
+"""Varredura de cenários: avalia uma grade de combinações de parâmetros do plano em lote.
+
+Em vez de repetir o cálculo do dashboard cenário a cenário, o novo salário de
+todos os cenários sai de uma única conta com um eixo de cenários (forma
+cenário x servidor), e as rubricas e tributos são avaliados sobre a folha
+empilhada, em blocos de cenários para limitar a memória.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from projecao.impacto import COLUNAS_ANTERIORES, calcular_indicadores
+from projecao.rubricas import PLANO_RUBRICAS, avaliar_entradas, montar_entradas
+from projecao.tabelas import calcular_novo_salario_lote, codificar_tabelas
+from projecao.tributos import calcular_tributos
+
+# Parâmetros que definem um cenário, na ordem de `calcular_novo_salario_lote`
+PARAMETROS_CENARIO = ['TC', 'TR', 'num_classes', 'num_referencias', 'indice_tabela']
+
+# Indicadores devolvidos para cada cenário (coluna do resultado -> chave de `calcular_indicadores`)
+INDICADORES = {
+    'IMPACTO MENSAL': 'impacto_mensal_impacto',
+    'IMPACTO ANUAL': 'impacto_anual_impacto',
+    'PERCENTUAL AUMENTO EFETIVO': 'percentual_efetivo_aumento_mensal',
+    'Impacto Líquido Mensal': 'impacto_mensal_total',
+    'Impacto Líquido Anual': 'impacto_anual_total',
+}
+
+# Limite de linhas (servidores x cenários) avaliadas de uma vez
+LINHAS_POR_BLOCO = 500_000
+
+FolhaPreparada = namedtuple('FolhaPreparada', ['codigos', 'referencias', 'entradas', 'totais_anteriores'])
+
+
+def preparar_folha(dados):
+    """Extrai da folha só os arrays que a avaliação em lote usa."""
+    entradas = montar_entradas(PLANO_RUBRICAS, dados, colunas={'Novo Salário': np.full(len(dados), np.nan)})
+    return FolhaPreparada(
+        codigos=codificar_tabelas(dados),
+        referencias=dados['Ref'].to_numpy(dtype=float, na_value=np.nan),
+        entradas=entradas,
+        totais_anteriores={chave: dados[coluna].sum() for chave, coluna in COLUNAS_ANTERIORES.items()},
+    )
+
+
+def montar_cenarios(**faixas):
+    """Produto cartesiano das faixas de cada parâmetro, um cenário por linha.
+
+    Ex.: `montar_cenarios(TC=np.arange(0, 10.25, 0.25), TR=[2], num_classes=[5],
+    num_referencias=[6], indice_tabela=range(4))`.
+    """
+    faltando = [parametro for parametro in PARAMETROS_CENARIO if parametro not in faixas]
+    if faltando:
+        raise ValueError(f'Faltam faixas para os parâmetros: {faltando}')
+    return pd.MultiIndex.from_product([list(faixas[p]) for p in PARAMETROS_CENARIO], names=PARAMETROS_CENARIO).to_frame(index=False)
+
+
+def totalizar_cenarios(folha, cenarios, linhas_por_bloco=LINHAS_POR_BLOCO, salarios_base=None):
+    """Totais novos (chaves de `COLUNAS_NOVAS`) de cada cenário, como arrays de tamanho S.
+
+    `salarios_base` (S x tabelas), se dado, tem as bases das tabelas de cada
+    cenário; sem ele, todos usam `SALARIOS_BASE`.
+    """
+    num_cenarios, num_servidores = len(cenarios), len(folha.codigos)
+    totais = {chave: np.zeros(num_cenarios) for chave in COLUNAS_ANTERIORES}
+    i_prevfor = PLANO_RUBRICAS.saidas.index('nova_0801-IPM PREVFOR')
+    i_proventos = PLANO_RUBRICAS.saidas.index('novo_0996-TOT.PROVENTO')
+
+    por_bloco = max(1, linhas_por_bloco // max(num_servidores, 1))
+    for inicio in range(0, num_cenarios, por_bloco):
+        bloco = cenarios.iloc[inicio:inicio + por_bloco]
+        fim = inicio + len(bloco)
+        novo_salario = calcular_novo_salario_lote(folha.codigos, folha.referencias,
+                                                  *(bloco[parametro].to_numpy() for parametro in PARAMETROS_CENARIO),
+                                                  salarios_base=None if salarios_base is None else salarios_base[inicio:fim])
+        rubricas = avaliar_entradas(PLANO_RUBRICAS, folha.entradas, repeticoes=len(bloco),
+                                    substituicoes={'Novo Salário': novo_salario.ravel()})
+        tributos = calcular_tributos(rubricas[:, i_prevfor], rubricas[:, i_proventos])
+
+        # Somas por cenário ignorando vazios, como Series.sum()
+        totais['vencimento_base'][inicio:fim] = np.nansum(novo_salario, axis=1)
+        for chave, coluna in (('ipm_previfor_patronal', 'nova_IPM PREVFOR-PATRONAL'),
+                              ('ipm_previfor_servidor', 'nova_IPM PREVFOR-SERVIDOR'),
+                              ('imposto_renda', 'nova_IRPF')):
+            totais[chave][inicio:fim] = np.nansum(tributos[coluna].to_numpy().reshape(len(bloco), -1), axis=1)
+    return totais
+
+
+def avaliar_cenarios(folha, cenarios, linhas_por_bloco=LINHAS_POR_BLOCO, salarios_base=None):
+    """Indicadores de impacto de cada cenário, como colunas ao lado dos parâmetros."""
+    indicadores = calcular_indicadores(folha.totais_anteriores,
+                                       totalizar_cenarios(folha, cenarios, linhas_por_bloco, salarios_base))
+    resultado = cenarios.reset_index(drop=True)
+    for coluna, chave in INDICADORES.items():
+        resultado[coluna] = indicadores[chave]
+    return resultado
@@ -0,0 +1,31 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# O repositório não é um pacote instalado: os testes importam `projecao` da raiz, de qualquer diretório
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+from projecao.dados import carregar_folha  # noqa: E402
+
+pd.set_option('mode.copy_on_write', True)
+
+# Planilha de exemplo do repositório (a mesma que o dashboard lê)
+PLANILHA = RAIZ / 'planilha_impacto_salarial.xlsx'
+
+
+@pytest.fixture(scope='session')
+def planilha(tmp_path_factory):
+    """Cópia da planilha de exemplo em uma pasta temporária: o cache Parquet é gravado lá, não no repositório."""
+    destino = tmp_path_factory.mktemp('planilha') / PLANILHA.name
+    shutil.copy2(PLANILHA, destino)
+    return destino
+
+
+@pytest.fixture(scope='session')
+def dados(planilha):
+    return carregar_folha(planilha, 'amc')
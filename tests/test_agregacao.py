@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from projecao.agregacao import CHAVES_CUBO, agregar, fatorar_chaves, por_cargo
+
+SOMAS = ['VENCIMENTO BASE', 'Extra']
+
+
+def esperado_groupby(df):
+    grupos = df.groupby(CHAVES_CUBO, observed=True, sort=True)
+    esperado = pd.DataFrame({'Quantidade': grupos.size(), 'Quantidade Nome': grupos['Nome'].count()})
+    for coluna in SOMAS:
+        esperado[coluna] = grupos[coluna].sum()
+    return esperado
+
+
+def conferir(df):
+    cubo, totais = agregar(fatorar_chaves(df), df, somas=SOMAS)
+    esperado = esperado_groupby(df)
+    # Mesmas células na mesma ordem; os níveis do cubo são índices comuns (sem categorias nem inteiros com vazios)
+    assert list(cubo.index.names) == CHAVES_CUBO
+    assert list(cubo.index) == list(esperado.index)
+    pd.testing.assert_frame_equal(cubo.reset_index(drop=True), esperado.reset_index(drop=True), check_dtype=False)
+
+    # Totais sobre todas as linhas, inclusive as que ficam fora do cubo
+    assert totais['Quantidade'] == len(df)
+    assert totais['Quantidade Nome'] == df['Nome'].count()
+    for coluna in SOMAS:
+        assert totais[coluna] == pytest.approx(df[coluna].sum())
+    return cubo, totais
+
+
+def test_cubo_igual_ao_groupby_na_folha(dados):
+    df = dados.assign(Extra=np.arange(len(dados)) % 7)
+    cubo, _ = conferir(df)
+    esperado = esperado_groupby(df).groupby(level='Cargo', observed=True).sum()
+    assert list(por_cargo(cubo).index) == list(esperado.index)
+    pd.testing.assert_frame_equal(por_cargo(cubo).reset_index(drop=True), esperado.reset_index(drop=True), check_dtype=False)
+
+
+def test_linhas_sem_chave_ficam_fora_do_cubo_e_entram_nos_totais():
+    df = pd.DataFrame({
+        'Cargo': pd.Categorical(['B', 'A', 'B', None, 'A', 'C', 'A'], categories=['C', 'B', 'A', 'Z']),
+        'CH': pd.array([180, 180, 120, 180, pd.NA, 180, 180], dtype='Int16'),
+        'Ref': [1.0, 2.0, 1.0, 3.0, 1.0, np.nan, 2.0],
+        'Nome': ['x', None, 'y', 'z', 'w', 'v', 'u'],
+        'VENCIMENTO BASE': [100.0, 200.0, np.nan, 400.0, 500.0, 600.0, 700.0],
+        'Extra': [1, 2, 3, 4, 5, 6, 7],
+    })
+    cubo, totais = conferir(df)
+    assert len(cubo) == 3 and cubo['Quantidade'].sum() == 4
+    assert totais['Quantidade'] == 7 and totais['VENCIMENTO BASE'] == 2500.0
@@ -0,0 +1,120 @@
+import pickle
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from projecao import cache_resultados
+from projecao.cache_resultados import TAMANHO_ASSINATURA, CacheResultados
+
+CHAVE = 'segredo-do-deploy'
+
+
+def tamanho(valor):
+    return len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def test_guarda_e_devolve_copias():
+    cache = CacheResultados()
+    cache.guardar('a', {'x': np.arange(3)})
+    primeiro, segundo = cache.obter('a'), cache.obter('a')
+    assert np.array_equal(primeiro['x'], [0, 1, 2]) and primeiro['x'] is not segundo['x']
+    assert cache.obter('b') is None
+    assert cache.acertos == 2
+
+
+def test_despeja_o_usado_ha_mais_tempo_pelo_orcamento_de_bytes():
+    valor = np.zeros(1000)
+    cache = CacheResultados(orcamento_memoria=3 * tamanho(valor))
+    for chave in 'abc':
+        cache.guardar(chave, valor)
+    cache.obter('a')
+    cache.guardar('d', valor)
+    assert len(cache) == 3 and cache.bytes_em_memoria <= cache.orcamento_memoria
+    assert cache.obter('b') is None
+    assert all(cache.obter(chave) is not None for chave in 'acd')
+
+
+def test_item_maior_que_o_orcamento_nao_fica_na_memoria():
+    cache = CacheResultados(orcamento_memoria=100)
+    cache.guardar('grande', np.zeros(1000))
+    assert len(cache) == 0 and cache.bytes_em_memoria == 0
+
+
+def test_disco_sobrevive_a_um_novo_processo_com_a_mesma_chave(tmp_path):
+    CacheResultados(pasta=tmp_path, chave_disco=CHAVE).guardar('a', {'x': 1})
+    outro = CacheResultados(pasta=tmp_path, chave_disco=CHAVE)
+    assert outro.obter('a') == {'x': 1}
+    assert outro.acertos_disco == 1
+
+
+def test_arquivo_sem_assinatura_valida_nao_e_lido(tmp_path):
+    CacheResultados(pasta=tmp_path, chave_disco=CHAVE).guardar('a', {'x': 1})
+    arquivo, = tmp_path.glob('*.pkl')
+
+    # Outra chave (ou nenhuma: cada processo sorteia a sua) não aceita o arquivo
+    assert CacheResultados(pasta=tmp_path, chave_disco='outra').obter('a') is None
+    assert CacheResultados(pasta=tmp_path).obter('a') is None
+
+    # Um pickle trocado por quem grava na pasta sem a chave não é carregado
+    class Armadilha:
+        def __reduce__(self):
+            return (pytest.fail, ('pickle do disco executado',))
+
+    conteudo = arquivo.read_bytes()
+    arquivo.write_bytes(conteudo[:TAMANHO_ASSINATURA] + pickle.dumps(Armadilha()))
+    assert CacheResultados(pasta=tmp_path, chave_disco=CHAVE).obter('a') is None
+
+
+def test_poda_o_disco_pelos_acessados_ha_mais_tempo(tmp_path):
+    valor = np.zeros(1000)
+    por_arquivo = TAMANHO_ASSINATURA + tamanho(valor)
+    cache = CacheResultados(orcamento_memoria=0, pasta=tmp_path, orcamento_disco=2 * por_arquivo, chave_disco=CHAVE)
+    cache.guardar('a', valor)
+    time.sleep(0.01)
+    cache.guardar('b', valor)
+    time.sleep(0.01)
+    assert cache.obter('a') is not None  # a leitura renova o arquivo de 'a'
+    time.sleep(0.01)
+    cache.guardar('c', valor)
+    assert len(list(tmp_path.glob('*.pkl'))) == 2
+    assert cache.obter('b') is None
+    assert cache.obter('a') is not None and cache.obter('c') is not None
+
+
+def test_versao_nova_nao_le_resultados_antigos(tmp_path, monkeypatch):
+    CacheResultados(pasta=tmp_path, chave_disco=CHAVE).guardar('a', 1)
+    monkeypatch.setattr(cache_resultados, 'VERSAO_RESULTADOS', cache_resultados.VERSAO_RESULTADOS + 1)
+    assert CacheResultados(pasta=tmp_path, chave_disco=CHAVE).obter('a') is None
+
+
+def test_pedidos_simultaneos_calculam_uma_vez():
+    cache = CacheResultados()
+    chamadas, comecou, liberar = [], threading.Event(), threading.Event()
+
+    def calcular():
+        chamadas.append(1)
+        comecou.set()
+        liberar.wait(10)
+        return 'resumo'
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(cache.obter_ou_calcular('a', calcular))) for _ in range(4)]
+    threads[0].start()
+    assert comecou.wait(10)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    liberar.set()
+    for thread in threads:
+        thread.join(10)
+    assert resultados == ['resumo'] * 4
+    assert len(chamadas) == 1 and cache.faltas == 1
+
+
+def test_falha_no_calculo_libera_quem_espera():
+    cache = CacheResultados()
+    with pytest.raises(ZeroDivisionError):
+        cache.obter_ou_calcular('a', lambda: 1 / 0)
+    assert cache.obter_ou_calcular('a', lambda: 2) == 2
@@ -0,0 +1,31 @@
+import pytest
+
+from projecao.comparacao import comparar_cenarios, comparar_indicadores, projetar_base
+from projecao.resumo import calcular_projecao
+from projecao.varredura import INDICADORES
+
+
+@pytest.fixture(scope='module')
+def base(dados):
+    return projetar_base(dados)
+
+
+def test_sem_alternativas(dados, base):
+    assert comparar_cenarios(dados, base, []) == []
+
+
+def test_alternativa_igual_a_base(dados, base):
+    resumos = comparar_cenarios(dados, base, [{}, dict(base.parametros)])
+    for resumo in resumos:
+        assert resumo['servidores_recalculados'] == 0
+        for chave in INDICADORES.values():
+            assert resumo['indicadores'][chave] == pytest.approx(base.resumo['indicadores'][chave], abs=1e-9)
+
+
+def test_alternativas_iguais_ao_calculo_completo(dados, base):
+    alternativas = [{'TC': 3}, {'TR': 1.5, 'indice_tabela': 1}, {}]
+    indicadores = comparar_indicadores(comparar_cenarios(dados, base, alternativas), ['a', 'b', 'c'])
+    for nome, parametros in zip(indicadores.index, alternativas):
+        esperado = calcular_projecao(dados, parametros)['indicadores']
+        for coluna, chave in INDICADORES.items():
+            assert indicadores.loc[nome, coluna] == pytest.approx(esperado[chave], rel=1e-9, abs=1e-6)
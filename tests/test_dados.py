@@ -0,0 +1,94 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from projecao import dados as modulo_dados
+from projecao.dados import caminhos_cache, carregar_planilha, ler_aba
+
+
+@pytest.mark.parametrize('linhas_por_bloco', [50, 100_000])
+def test_ler_aba_igual_ao_read_excel(planilha, linhas_por_bloco):
+    esperado = pd.read_excel(planilha, sheet_name='amc', decimal=',')
+    pd.testing.assert_frame_equal(ler_aba(planilha, 'amc', linhas_por_bloco=linhas_por_bloco, decimal=','), esperado)
+
+
+@pytest.fixture
+def contadores(monkeypatch):
+    """Conta as conversões do Excel e os cálculos de hash de `carregar_planilha`."""
+    contagem = {'excel': 0, 'hash': 0}
+
+    def contar(chave, funcao):
+        def envoltorio(*args, **kwargs):
+            contagem[chave] += 1
+            return funcao(*args, **kwargs)
+        return envoltorio
+
+    monkeypatch.setattr(modulo_dados, 'ler_aba', contar('excel', modulo_dados.ler_aba))
+    monkeypatch.setattr(modulo_dados, 'calcular_hash_arquivo', contar('hash', modulo_dados.calcular_hash_arquivo))
+    return contagem
+
+
+def gravar_planilha(caminho, valores):
+    pd.DataFrame({'Cargo': ['A', 'B', 'C'], 'Valor': valores}).to_excel(caminho, sheet_name='amc', index=False)
+
+
+def test_mtime_e_tamanho_iguais_leem_o_parquet(tmp_path, contadores):
+    caminho = tmp_path / 'folha.xlsx'
+    gravar_planilha(caminho, [1, 2, 3])
+    primeira = carregar_planilha(caminho, 'amc')
+    assert contadores == {'excel': 1, 'hash': 1}
+    assert all(arquivo.exists() for arquivo in caminhos_cache(caminho, 'amc'))
+
+    pd.testing.assert_frame_equal(carregar_planilha(caminho, 'amc'), primeira)
+    assert contadores == {'excel': 1, 'hash': 1}
+
+
+def test_mesmo_conteudo_so_atualiza_os_metadados(tmp_path, contadores):
+    caminho = tmp_path / 'folha.xlsx'
+    gravar_planilha(caminho, [1, 2, 3])
+    primeira = carregar_planilha(caminho, 'amc')
+    _, arquivo_meta = caminhos_cache(caminho, 'amc')
+
+    # Cópia com o mesmo conteúdo e outro mtime (ex.: deploy)
+    os.utime(caminho, ns=(caminho.stat().st_atime_ns, caminho.stat().st_mtime_ns + 10**9))
+    pd.testing.assert_frame_equal(carregar_planilha(caminho, 'amc'), primeira)
+    assert contadores == {'excel': 1, 'hash': 2}
+    assert json.loads(arquivo_meta.read_text())['mtime_ns'] == caminho.stat().st_mtime_ns
+
+    carregar_planilha(caminho, 'amc')
+    assert contadores == {'excel': 1, 'hash': 2}
+
+
+def test_conteudo_novo_e_convertido_de_novo(tmp_path, contadores):
+    caminho = tmp_path / 'folha.xlsx'
+    gravar_planilha(caminho, [1, 2, 3])
+    carregar_planilha(caminho, 'amc')
+    gravar_planilha(caminho, [4, 5, 6])
+    assert carregar_planilha(caminho, 'amc')['Valor'].tolist() == [4, 5, 6]
+    assert contadores['excel'] == 2
+    assert pd.read_parquet(caminhos_cache(caminho, 'amc')[0])['Valor'].tolist() == [4, 5, 6]
+
+
+def test_outros_argumentos_de_leitura_nao_usam_o_cache(tmp_path, contadores):
+    caminho = tmp_path / 'folha.xlsx'
+    gravar_planilha(caminho, [1, 2, 3])
+    carregar_planilha(caminho, 'amc')
+    carregar_planilha(caminho, 'amc', decimal=',')
+    assert contadores['excel'] == 2
+
+
+def test_pasta_somente_leitura_segue_sem_cache(tmp_path, contadores, monkeypatch):
+    caminho = tmp_path / 'folha.xlsx'
+    gravar_planilha(caminho, [1, 2, 3])
+
+    # A pasta pode não ser protegida de fato (ex.: testes como root): a falha de gravação é simulada
+    def sem_permissao(destino, gravar):
+        raise PermissionError(13, 'Permission denied', str(destino))
+
+    monkeypatch.setattr(modulo_dados, '_gravar_atomico', sem_permissao)
+    for _ in range(2):
+        assert carregar_planilha(caminho, 'amc')['Valor'].tolist() == [1, 2, 3]
+    assert contadores['excel'] == 2
+    assert list(tmp_path.iterdir()) == [caminho]
@@ -0,0 +1,72 @@
+import threading
+import tracemalloc
+
+import numpy as np
+
+from projecao.diagnostico import Diagnostico
+
+
+def test_etapa_aninhada_mantem_o_pico_da_de_fora():
+    with Diagnostico('teste', memoria=True) as diagnostico:
+        with diagnostico.etapa('fora'):
+            grande = np.ones(5_000_000)
+            del grande
+            with diagnostico.etapa('dentro'):
+                pequeno = np.ones(500_000)
+                del pequeno
+    bytes_alocados = diagnostico.tabela()['bytes_alocados']
+    assert 4_000_000 <= bytes_alocados['dentro'] < 8 * 5_000_000
+    assert bytes_alocados['fora'] >= 8 * 5_000_000
+
+
+def test_tracemalloc_desligado_pelo_ultimo_diagnostico():
+    primeiro, segundo = Diagnostico('a', memoria=True), Diagnostico('b', memoria=True)
+    primeiro.__enter__()
+    segundo.__enter__()
+    primeiro.__exit__(None, None, None)
+    assert tracemalloc.is_tracing()
+    segundo.__exit__(None, None, None)
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracemalloc_ligado_por_outro_codigo_continua_ligado():
+    tracemalloc.start()
+    try:
+        with Diagnostico('c', memoria=True):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_sessoes_em_threads_diferentes_nao_se_atrapalham():
+    # A sessão com memória mede uma etapa; no meio dela, outra thread roda etapas sem e com memória
+    grande_liberado, outras_terminaram = threading.Event(), threading.Event()
+    outras = {}
+
+    def outra_sessao():
+        grande_liberado.wait()
+        with Diagnostico('sem_memoria') as sem_memoria:
+            with sem_memoria.etapa('etapa'):
+                pass
+        with Diagnostico('com_memoria', memoria=True) as com_memoria:
+            with com_memoria.etapa('etapa'):
+                np.ones(100_000)
+        outras['sem_memoria'], outras['com_memoria'] = sem_memoria, com_memoria
+        outras_terminaram.set()
+
+    thread = threading.Thread(target=outra_sessao)
+    thread.start()
+    with Diagnostico('medida', memoria=True) as diagnostico:
+        with diagnostico.etapa('etapa'):
+            grande = np.ones(5_000_000)
+            del grande
+            grande_liberado.set()
+            assert outras_terminaram.wait(10)
+    thread.join()
+
+    assert diagnostico.tabela()['bytes_alocados']['etapa'] >= 8 * 5_000_000
+    assert outras['sem_memoria'].tabela()['bytes_alocados'].isna().all()
+    # Enquanto a primeira mede, a outra thread não zera o pico: fica sem o número
+    assert outras['com_memoria'].tabela()['bytes_alocados'].isna().all()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,117 @@
+import gc
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from projecao.especulacao import Especulador, vizinhos
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=1)
+    yield executor
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
+def bloquear(executor):
+    # Ocupa a única thread do executor até `liberar.set()`, para deixar as tarefas seguintes na fila
+    ocupada, liberar = threading.Event(), threading.Event()
+    executor.submit(lambda: (ocupada.set(), liberar.wait(10)))
+    assert ocupada.wait(10)
+    return liberar
+
+
+def test_vizinhos_respeitam_os_minimos():
+    resultado = vizinhos({'indice_tabela': 0, 'TC': 2}, {'indice_tabela': 1, 'TC': 1}, {'indice_tabela': 0})
+    assert resultado == [{'indice_tabela': 1, 'TC': 2}, {'indice_tabela': 0, 'TC': 3}, {'indice_tabela': 0, 'TC': 1}]
+
+
+def test_acerto_de_antecipacao_pronta(executor):
+    especulador = Especulador(executor=executor)
+    especulador.antecipar({'a': lambda: 1})
+    executor.submit(lambda: None).result()
+    assert especulador.obter('a') == 1
+    assert especulador.obter('b') is None
+    assert especulador.acertos == 1
+
+
+def test_espera_a_antecipacao_em_andamento(executor):
+    especulador = Especulador(executor=executor)
+    comecou = threading.Event()
+
+    def lenta():
+        comecou.set()
+        time.sleep(0.05)
+        return 'pronto'
+
+    especulador.antecipar({'a': lenta})
+    assert comecou.wait(10)
+    assert especulador.obter('a') == 'pronto'
+    assert especulador.acertos == 1
+
+
+def test_cancela_na_fila(executor):
+    especulador = Especulador(executor=executor)
+    liberar = bloquear(executor)
+    especulador.antecipar({'a': lambda: 1, 'b': lambda: 2, 'c': lambda: 3})
+    # Pedida enquanto ainda está na fila: cancelada, calculada na hora por quem pediu
+    assert especulador.obter('a') is None
+    # Novo cenário: as pendentes que não são vizinhas dele saem da fila
+    especulador.antecipar({'c': lambda: 3})
+    assert especulador.canceladas == 2 and len(especulador) == 1
+    liberar.set()
+    executor.submit(lambda: None).result()
+    assert especulador.obter('c') == 3
+
+
+def test_falha_conta_como_ausente(executor):
+    especulador = Especulador(executor=executor)
+    especulador.antecipar({'a': lambda: 1 / 0})
+    executor.submit(lambda: None).result()
+    assert especulador.obter('a') is None and len(especulador) == 0
+
+
+def test_descarta_o_usado_ha_mais_tempo(executor):
+    especulador = Especulador(max_itens=3, executor=executor)
+    for chave in 'abc':
+        especulador.guardar(chave, chave.upper())
+    assert especulador.obter('a') == 'A'
+    especulador.guardar('d', 'D')
+    assert len(especulador) == 3
+    assert especulador.obter('b') is None
+    assert [especulador.obter(chave) for chave in 'acd'] == ['A', 'C', 'D']
+
+
+def test_poda_nao_descarta_antecipacao_em_andamento(executor):
+    especulador = Especulador(max_itens=1, executor=executor)
+    comecou, liberar = threading.Event(), threading.Event()
+    especulador.antecipar({'a': lambda: (comecou.set(), liberar.wait(10)) and 'A'})
+    assert comecou.wait(10)
+    especulador.guardar('b', 'B')
+    # 'a' está rodando (não pode ser cancelada): fica até terminar, acima do limite
+    assert len(especulador) == 2
+    liberar.set()
+    assert especulador.obter('a') == 'A'
+
+
+def test_sessao_descartada_tira_as_antecipacoes_da_fila(executor):
+    especulador = Especulador(executor=executor)
+    liberar = bloquear(executor)
+    executadas = []
+    especulador.antecipar({chave: (lambda chave=chave: executadas.append(chave)) for chave in 'abc'})
+    del especulador
+    gc.collect()
+    liberar.set()
+    executor.submit(lambda: None).result()
+    assert executadas == []
+
+
+def test_encerrar_cancela_as_pendentes(executor):
+    especulador = Especulador(executor=executor)
+    liberar = bloquear(executor)
+    especulador.antecipar({'a': lambda: 1})
+    especulador.encerrar()
+    liberar.set()
+    assert len(especulador) == 0 and especulador.obter('a') is None
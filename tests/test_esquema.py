@@ -0,0 +1,23 @@
+import numpy as np
+
+from projecao.dados import ler_aba
+from projecao.esquema import aplicar_esquema
+from projecao.resumo import projetar_folha
+from projecao.tabelas import codificar_tabelas, gerar_grades
+
+
+def test_rubrica_vazia_continua_na_folha(planilha):
+    # Como a folha de um órgão sem lançamentos nessas rubricas (os cabeçalhos da planilha têm espaços no fim)
+    bruto = ler_aba(planilha, 'amc', decimal=',')
+    vazias = [coluna for coluna in bruto.columns if str(coluna).strip() in ('0326-GTRTC', 'REF-HE NOTURNA')]
+    assert len(vazias) == 2
+    bruto[vazias] = np.nan
+    dados = aplicar_esquema(bruto)
+
+    # As anotações vazias ao lado da folha saem; as rubricas vazias ficam, com NaN
+    assert not any(coluna.startswith('Unnamed') for coluna in dados.columns)
+    assert 'INDICE DE REAJUSTE' not in dados
+    assert dados['0326-GTRTC'].isna().all() and dados['REF-HE NOTURNA'].isna().all()
+
+    folha = projetar_folha(dados, codificar_tabelas(dados), gerar_grades(2, 2, 5, 6), 0)
+    assert folha['Novo Salário'].notna().any()
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from projecao import exportacao
+from projecao.exportacao import COLUNAS_SERVIDOR, Exportacao, exportar_projecao
+from projecao.resumo import projetar_folha
+from projecao.tabelas import codificar_tabelas, gerar_grades
+
+INDICE_TABELA = 0
+
+
+@pytest.fixture(scope='module')
+def grades():
+    return gerar_grades(2, 2, 5, 6)
+
+
+def projecao_esperada(dados, grades):
+    """A projeção da folha inteira de uma vez, com as colunas de identificação, como a exportação grava."""
+    projecao = projetar_folha(dados, codificar_tabelas(dados), grades, INDICE_TABELA)
+    esperado = pd.concat([dados[[coluna for coluna in COLUNAS_SERVIDOR if coluna in dados]], projecao], axis=1)
+    return esperado.reset_index(drop=True)
+
+
+def esperar(condicao, limite=10):
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim
+        time.sleep(0.01)
+
+
+def test_parquet_em_blocos_igual_a_projecao(dados, grades, tmp_path):
+    destino = tmp_path / 'projecao.parquet'
+    assert exportar_projecao(dados, grades, INDICE_TABELA, destino, linhas_por_bloco=97) == len(dados)
+    gravado = pd.read_parquet(destino)
+    pd.testing.assert_frame_equal(gravado, projecao_esperada(dados, grades), check_dtype=False, check_categorical=False)
+
+
+def test_xlsx_em_blocos_igual_a_projecao(dados, grades, tmp_path):
+    dados = dados.iloc[:250]
+    destino = tmp_path / 'projecao.xlsx'
+    assert exportar_projecao(dados, grades, INDICE_TABELA, destino, linhas_por_bloco=60) == 250
+    gravado = pd.read_excel(destino, sheet_name='projecao')
+    esperado = projecao_esperada(dados, grades)
+    assert list(gravado.columns) == [str(coluna) for coluna in esperado.columns]
+    numericas = esperado.select_dtypes('number').columns
+    pd.testing.assert_frame_equal(gravado[numericas].astype(float), esperado[numericas].astype(float),
+                                  check_exact=False, rtol=1e-12)
+
+
+def test_exportacao_descartada_para_e_apaga_o_arquivo(dados, grades, monkeypatch):
+    # O segundo bloco só é projetado depois do descarte
+    blocos, liberar = [], threading.Event()
+
+    def projetar_devagar(*args):
+        blocos.append(1)
+        if len(blocos) == 2:
+            liberar.wait(10)
+        return projetar_folha(*args)
+
+    monkeypatch.setattr(exportacao, 'projetar_folha', projetar_devagar)
+    gravacao = Exportacao(dados, grades, INDICE_TABELA, 'parquet', linhas_por_bloco=100)
+    pasta = gravacao.caminho.parent
+    esperar(lambda: len(blocos) == 2)
+    gravacao.descartar()
+    liberar.set()
+    esperar(lambda: gravacao.pronta)
+    esperar(lambda: not pasta.exists())
+    assert gravacao.erro is None
+    assert len(blocos) == 2 and gravacao.linhas_gravadas < gravacao.total_linhas
+
+
+def test_exportacao_na_fila_descartada_nao_grava(dados, grades):
+    # Ocupa a thread de exportação para que a próxima fique na fila
+    liberar = threading.Event()
+    ocupada = exportacao._EXECUTOR.submit(liberar.wait, 10)
+    try:
+        gravacao = Exportacao(dados, grades, INDICE_TABELA, 'parquet', linhas_por_bloco=100)
+        gravacao.descartar()
+        assert gravacao._futuro.cancelled() and not gravacao.caminho.parent.exists()
+        assert gravacao.erro is None and gravacao.linhas_gravadas == 0
+    finally:
+        liberar.set()
+        ocupada.result()
+
+
+def test_exportacao_completa(dados, grades):
+    gravacao = Exportacao(dados, grades, INDICE_TABELA, 'parquet', linhas_por_bloco=250)
+    esperar(lambda: gravacao.pronta)
+    assert gravacao.erro is None and gravacao.progresso == 1.0
+    assert len(pd.read_parquet(gravacao.caminho)) == len(dados)
+    gravacao.descartar()
+    assert not gravacao.caminho.parent.exists()
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from projecao import formatacao
+from projecao.formatacao import estilizar_colunas, formatar_moeda, formatar_numero
+
+pytest.importorskip('pyarrow')
+
+MEIOS_CENTAVOS = [0.005, 0.015, 0.025, 0.125, 1.005, 2.675, 2.345, 1234.565, 1e6 + 0.125, -0.005, -2.675, 0.5, 1.5, 2.5]
+
+
+@pytest.mark.parametrize('casas', [0, 2])
+def test_arrow_arredonda_como_python(casas):
+    numeros = np.array(MEIOS_CENTAVOS + list(np.random.default_rng(0).uniform(-1e6, 1e6, 1000).round(3)))
+    validos = np.isfinite(numeros)
+    arrow = formatacao._texto_arrow(numeros, validos, casas, 'R$ ')
+    python = formatacao._texto_python(numeros, validos, casas, 'R$ ')
+    assert arrow.tolist() == python.tolist()
+
+
+def test_meio_centavo():
+    # Como `'%.2f' % valor`: o valor binário de 0.005 fica acima da metade e o de 2.675 abaixo
+    assert formatar_moeda([0.005, 2.675, -1234.565]).tolist() == ['R$ 0,01', 'R$ 2,67', '-R$ 1.234,57']
+    assert formatar_numero(-0.004) == '0,00'
+
+
+def test_estilizar_colunas_mantem_os_numeros():
+    tabela = pd.DataFrame({'Item': ['A', 'Encargos', 'B'], 'Quantidade': [1.0, '', 350.0],
+                           'Valor': [1234.565, '', -0.004], 'Percentual': [2.5, 0.0, 10.0]})
+    estilo = estilizar_colunas(tabela, moeda=['Valor'], inteiros=['Quantidade'], percentuais=['Percentual'])
+
+    # Os dados seguem numéricos (ordenação e cópia no navegador); os subtítulos viram vazios
+    assert estilo.data['Valor'].dtype == float and estilo.data['Quantidade'].dtype == float
+    assert estilo.data['Valor'].isna().tolist() == [False, True, False]
+    html = estilo.to_html()
+    for texto in ('R$ 1.234,57', 'R$ 0,00', '350', '2,50 %', '10,00 %'):
+        assert texto in html
+    assert 'nan' not in html
@@ -0,0 +1,68 @@
+import pytest
+
+from projecao.grafo import GrafoCalculo
+
+
+@pytest.fixture
+def grafo():
+    """Grafo dados -> base -> (resumo, tabela) em que cada etapa conta as próprias execuções."""
+    grafo = GrafoCalculo()
+    grafo.execucoes = {}
+
+    def contando(nome, funcao):
+        def etapa(**argumentos):
+            grafo.execucoes[nome] = grafo.execucoes.get(nome, 0) + 1
+            return funcao(**argumentos)
+        return etapa
+
+    grafo.etapa('dados', contando('dados', lambda orgao: [orgao] * 3), parametros=['orgao'])
+    grafo.etapa('base', contando('base', lambda dados, taxa: [len(item) * taxa for item in dados]),
+                parametros=['taxa'], dependencias=['dados'])
+    grafo.etapa('resumo', contando('resumo', lambda base: sum(base)), dependencias=['base'])
+    grafo.etapa('tabela', contando('tabela', lambda dados, linhas: dados[:linhas]),
+                parametros=['linhas'], dependencias=['dados'])
+    return grafo
+
+
+VALORES = {'orgao': 'AMC', 'taxa': 2, 'linhas': 2}
+ETAPAS = ['resumo', 'tabela']
+
+
+def test_reexecucao_sem_mudanca_serve_tudo_da_memoria(grafo):
+    primeiro = grafo.calcular(ETAPAS, **VALORES)
+    assert grafo.execucoes == {'dados': 1, 'base': 1, 'resumo': 1, 'tabela': 1}
+    assert grafo.calcular(ETAPAS, **VALORES) == primeiro == {'resumo': 18, 'tabela': ['AMC', 'AMC']}
+    assert grafo.execucoes == {'dados': 1, 'base': 1, 'resumo': 1, 'tabela': 1}
+    assert grafo.recalculadas == [] and sorted(grafo.servidas) == ['base', 'dados', 'resumo', 'tabela']
+
+
+def test_parametro_recalcula_so_as_etapas_que_dependem_dele(grafo):
+    grafo.calcular(ETAPAS, **VALORES)
+    assert grafo.calcular(ETAPAS, **{**VALORES, 'taxa': 3})['resumo'] == 27
+    assert grafo.recalculadas == ['base', 'resumo']
+    assert grafo.execucoes == {'dados': 1, 'base': 2, 'resumo': 2, 'tabela': 1}
+
+    grafo.calcular(ETAPAS, **{**VALORES, 'taxa': 3, 'linhas': 1})
+    assert grafo.recalculadas == ['tabela']
+
+
+def test_nova_versao_de_uma_etapa_recalcula_as_de_baixo(grafo):
+    grafo.calcular(ETAPAS, **VALORES)
+
+    # Descartar a etapa de cima (ex.: a planilha mudou) também conta como nova versão para as de baixo
+    grafo.invalidar('dados')
+    grafo.calcular(ETAPAS, **VALORES)
+    assert grafo.execucoes == {'dados': 2, 'base': 2, 'resumo': 2, 'tabela': 2}
+
+    assert grafo.calcular(ETAPAS, **{**VALORES, 'orgao': 'SME'})['tabela'] == ['SME', 'SME']
+    assert grafo.execucoes == {'dados': 3, 'base': 3, 'resumo': 3, 'tabela': 3}
+
+    # Registrar de novo uma etapa intermediária só recalcula ela e as que dependem dela
+    grafo.etapa('base', lambda dados, taxa: [taxa] * len(dados), parametros=['taxa'], dependencias=['dados'])
+    assert grafo.calcular(ETAPAS, **{**VALORES, 'orgao': 'SME'})['resumo'] == 6
+    assert grafo.recalculadas == ['base', 'resumo']
+
+
+def test_dependencia_nao_registrada(grafo):
+    with pytest.raises(ValueError, match='não registradas'):
+        grafo.etapa('total', lambda resumo: resumo, dependencias=['inexistente'])
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from projecao.metas import SALARIO_BASE_REFERENCIA, avaliar_valores, resolver_meta
+from projecao.resumo import PARAMETROS_PADRAO, calcular_projecao
+from projecao.varredura import preparar_folha
+
+
+@pytest.fixture(scope='module')
+def folha(dados):
+    return preparar_folha(dados)
+
+
+@pytest.mark.parametrize('livre, minimo, maximo, esperado', [
+    ('TC', 0, 10, PARAMETROS_PADRAO['TC']),
+    ('TR', 0, 10, PARAMETROS_PADRAO['TR']),
+    ('salario_base', 900, 1500, SALARIO_BASE_REFERENCIA),
+])
+def test_meta_do_cenario_atual_volta_ao_plano_padrao(folha, dados, livre, minimo, maximo, esperado):
+    meta = calcular_projecao(dados)['indicadores']['impacto_anual_impacto']
+    solucao = resolver_meta(folha, dados, 'IMPACTO ANUAL', meta, livre, minimo, maximo)
+    assert solucao.atingida
+    assert solucao.parametros[livre] == pytest.approx(esperado, rel=1e-4)
+    # O valor encontrado na busca em lote é o das tabelas completas do plano
+    assert solucao.valor == pytest.approx(solucao.resultado['indicadores']['impacto_anual_impacto'], abs=1e-6)
+
+
+def test_indicador_monotono_com_a_grade_arredondada(folha):
+    fixos = {**PARAMETROS_PADRAO, 'salario_base': SALARIO_BASE_REFERENCIA}
+    valores = avaliar_valores(folha, 'IMPACTO ANUAL', 'TC', np.linspace(0, 10, 101), fixos)
+    assert (np.diff(valores) >= 0).all()
+
+
+def test_meta_fora_do_alcance(folha, dados):
+    solucao = resolver_meta(folha, dados, 'IMPACTO ANUAL', 1e12, 'TC', 0, 10)
+    assert not solucao.atingida
+    assert solucao.parametros['TC'] == 10
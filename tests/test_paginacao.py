@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from projecao.agregacao import agregar, fatorar_chaves
+from projecao.paginacao import Filtros, filtrar_linhas, ordenar_linhas, paginar, totalizar
+
+COLUNAS = ['VENCIMENTO BASE', 'Novo Salário']
+
+
+@pytest.fixture
+def folha():
+    # A última linha não tem cargo: fica fora do cubo, mas entra nos totais gerais
+    return pd.DataFrame({
+        'Cargo': pd.Categorical(['A', 'B', 'A', 'C', 'B', 'A', 'C', None]),
+        'CH': pd.array([180, 180, 120, 180, 120, 180, 120, 180], dtype='Int16'),
+        'Ref': [1, 2, 1, 3, 2, 2, 1, 1],
+        'Nome': ['Ana Souza', 'Bruno Lima', 'Carla Souza', 'Davi Reis', 'Eva Lima', 'Fábio Melo', None, 'Gil Souza'],
+        'VENCIMENTO BASE': [100.0, 200.0, 300.0, 400.0, np.nan, 600.0, 700.0, 800.0],
+        'Novo Salário': [110.0, 220.0, 330.0, 440.0, 550.0, 660.0, 770.0, 880.0],
+    })
+
+
+@pytest.mark.parametrize('pagina, esperada', [(1, 1), (3, 3), (0, 1), (-5, 1), (4, 3), (99, 3)])
+def test_numero_da_pagina_fica_entre_a_primeira_e_a_ultima(folha, pagina, esperada):
+    posicoes = np.arange(len(folha))
+    recorte = paginar(folha, posicoes, pagina, linhas_por_pagina=3)
+    assert recorte.num_paginas == 3 and recorte.total_linhas == 8
+    assert recorte.inicio == (esperada - 1) * 3
+    assert recorte.linhas['Nome'].tolist() == folha['Nome'].iloc[(esperada - 1) * 3:esperada * 3].tolist()
+
+
+def test_pagina_sem_linhas(folha):
+    recorte = paginar(folha, np.array([], dtype=np.intp), 2, linhas_por_pagina=3)
+    assert recorte.num_paginas == 1 and recorte.inicio == 0 and recorte.linhas.empty
+
+
+def test_filtros_e_ordenacao(folha):
+    assert filtrar_linhas(folha, Filtros()).tolist() == list(range(8))
+    assert filtrar_linhas(folha, Filtros(cargos=['A'], cargas_horarias=[180])).tolist() == [0, 5]
+    # Nome: parte do texto, sem diferenciar maiúsculas, vazios não passam
+    assert filtrar_linhas(folha, Filtros(nome='souza')).tolist() == [0, 2, 7]
+    assert filtrar_linhas(folha, Filtros(cargos=['A'], nome='SOUZA')).tolist() == [0, 2]
+
+    posicoes = filtrar_linhas(folha, Filtros(cargos=['A', 'B']))
+    ordem = ordenar_linhas(folha, posicoes, 'VENCIMENTO BASE', crescente=False)
+    assert ordem.tolist() == [5, 2, 1, 0, 4]
+
+
+@pytest.mark.parametrize('filtros', [
+    Filtros(),
+    Filtros(cargos=['A']),
+    Filtros(cargos=['A', 'B', 'C']),
+    Filtros(cargas_horarias=[120], referencias=[1, 2]),
+    Filtros(cargos=['Z']),
+    Filtros(nome='souza'),
+    Filtros(cargos=['B'], nome='lima'),
+])
+def test_totais_iguais_a_soma_das_linhas_filtradas(folha, filtros):
+    cubo, totais = agregar(fatorar_chaves(folha), folha, somas=COLUNAS)
+    posicoes = filtrar_linhas(folha, filtros)
+    esperado = folha[COLUNAS].take(posicoes).sum()
+    resultado = totalizar(cubo, totais, filtros, COLUNAS, folha, posicoes)
+    pd.testing.assert_series_equal(resultado, esperado, check_names=False)
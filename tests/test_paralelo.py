@@ -0,0 +1,18 @@
+import pandas as pd
+
+from projecao.paralelo import avaliar_em_paralelo, ler_cenarios
+from projecao.varredura import avaliar_cenarios, montar_cenarios, preparar_folha
+
+
+def test_processos_iguais_ao_lote_sequencial(dados, tmp_path):
+    cenarios = montar_cenarios(TC=[0, 2, 3.5], TR=[2, 1.25], num_classes=[5, 4], num_referencias=[6], indice_tabela=[0])
+    cenarios['plano'] = [f'plano {i}' for i in range(len(cenarios))]
+    arquivo = tmp_path / 'cenarios.csv'
+    cenarios.to_csv(arquivo, index=False)
+    cenarios = ler_cenarios(arquivo)
+    folha = preparar_folha(dados)
+
+    blocos = [resultados.set_index(pd.RangeIndex(inicio, inicio + len(resultados)))
+              for inicio, resultados in avaliar_em_paralelo(folha, cenarios, processos=2, cenarios_por_tarefa=5)]
+    assert len(blocos) == 3
+    pd.testing.assert_frame_equal(pd.concat(blocos).sort_index(), avaliar_cenarios(folha, cenarios))
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from projecao.progressao import RegrasProgressao, anos_admissao, simular_progressao
+from projecao.resumo import calcular_projecao
+from projecao.varredura import INDICADORES, preparar_folha
+
+
+def test_plano_sem_aumento_mantem_a_folha(dados):
+    # Plano padrão, sem reajuste e sem progressão: todo ano é a folha atual
+    folha = preparar_folha(dados)
+    anos = range(2025, 2031)
+    resultado = simular_progressao(folha, anos_admissao(dados), {}, anos, RegrasProgressao(referencias=0),
+                                   reajustes=np.zeros(len(anos)))
+    assert (resultado['Vencimentos (mensal)'] == folha.totais_anteriores['vencimento_base']).all()
+    assert (resultado['Progressões no ano'] == 0).all()
+
+    # E cada ano tem os mesmos indicadores do cenário padrão do dashboard
+    indicadores = calcular_projecao(dados)['indicadores']
+    for coluna, chave in INDICADORES.items():
+        np.testing.assert_allclose(resultado[coluna], indicadores[chave], atol=1e-6)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from projecao.resumo import calcular_projecao
+from projecao.tabelas import SALARIOS_BASE, arredondar_centavos, gerar_grade_salarios, gerar_grades
+
+
+def tabela_planilha(TC, TR, num_classes, num_referencias, salario_base):
+    # A cadeia da planilha, célula a célula: a anterior arredondada a centavos vezes o fator
+    tabela = np.empty((num_referencias, num_classes))
+    anterior = None
+    for j in range(num_classes):
+        for i in range(num_referencias):
+            if anterior is None:
+                valor = salario_base
+            else:
+                valor = float(f'{anterior:.2f}') * (1 + (TC if i == 0 else TR) / 100)
+            tabela[i, j] = anterior = valor
+    return tabela
+
+
+@pytest.mark.parametrize('TC, TR, num_classes, num_referencias', [(2, 2, 5, 6), (3, 2.5, 4, 7), (7.3, 0.9, 6, 5), (0, 0, 1, 1)])
+def test_grade_segue_a_cadeia_da_planilha(TC, TR, num_classes, num_referencias):
+    for salario_base in SALARIOS_BASE.values():
+        esperado = tabela_planilha(TC, TR, num_classes, num_referencias, salario_base)
+        assert np.array_equal(gerar_grade_salarios(TC, TR, num_classes, num_referencias, salario_base), esperado)
+    grades = gerar_grades(TC, TR, num_classes, num_referencias)
+    for linha, salario_base in zip(grades, SALARIOS_BASE.values()):
+        assert np.array_equal(linha, tabela_planilha(TC, TR, num_classes, num_referencias, salario_base).T.ravel())
+
+
+def test_arredondar_centavos_como_formatacao():
+    valores = np.array([0.005, 0.015, 1.005, 2.675, 2.345, 904.0158, 1281.15147, 1e6 + 0.125])
+    assert np.array_equal(arredondar_centavos(valores), [float(f'{valor:.2f}') for valor in valores])
+
+
+def test_cenario_padrao_sem_impacto(dados):
+    resultado = calcular_projecao(dados)
+    tabela = resultado['tabela_com_novo_salario']
+    # Quem está na grade recebe o próprio VENCIMENTO BASE (a planilha guarda o valor com menos casas: até 1 ulp)
+    na_grade = tabela['Novo Salário'].notna()
+    np.testing.assert_allclose(tabela.loc[na_grade, 'Novo Salário'], tabela.loc[na_grade, 'VENCIMENTO BASE'].astype(float), rtol=1e-15)
+    assert resultado['indicadores']['total_impacto'] == 0
+    # Por cargo, a mesma diferença de 1 ulp da planilha pode sobrar (como na cadeia original)
+    por_cargo = resultado['resumo_cargos']['Impacto'].iloc[:-8].astype(float)
+    np.testing.assert_allclose(por_cargo, 0, atol=1e-9)
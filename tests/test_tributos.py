@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from projecao.tributos import (ALIQUOTAS_PREVIDENCIA, ANO_IRPF_PADRAO, TABELAS_IRPF, calcular_contribuicoes,
+                               calcular_irpf, calcular_irpf_anos, calcular_tributos, faixas_irpf_anos)
+
+
+# Função original do dashboard, aplicada linha a linha, como referência
+def irpf_escalar(base_irpf):
+    if base_irpf > 4664.68:
+        return base_irpf * 0.275 - 869.36
+    elif base_irpf>3751.05:
+        return base_irpf *0.225-636.13
+    elif base_irpf>2826.65:
+        return base_irpf *0.15-354.8
+    elif base_irpf>1903.98:
+        return base_irpf*0.075-142.8
+    else:
+        return 0
+
+
+def bases_de_teste():
+    limites = np.array([faixa[0] for faixa in TABELAS_IRPF[ANO_IRPF_PADRAO]])
+    vizinhos = np.concatenate([limites, np.nextafter(limites, np.inf), np.nextafter(limites, -np.inf),
+                               limites + 0.01, limites - 0.01])
+    aleatorias = np.random.default_rng(0).uniform(-1000, 20_000, 1000)
+    return np.concatenate([vizinhos, aleatorias, [0.0, -0.01, -5000.0, 1e7, np.nan]])
+
+
+def test_irpf_igual_a_funcao_original_em_todas_as_faixas():
+    bases = bases_de_teste()
+    esperado = pd.Series(bases).apply(irpf_escalar).to_numpy()
+    np.testing.assert_array_equal(calcular_irpf(bases), esperado)
+
+
+def test_limite_pertence_a_faixa_de_baixo():
+    faixas = TABELAS_IRPF[ANO_IRPF_PADRAO]
+    limites = [limite for limite, _, _ in faixas]
+    assert calcular_irpf(limites[:1])[0] == 0
+    for (limite, _, _), (_, aliquota, deducao) in zip(faixas[1:], faixas):
+        assert calcular_irpf([limite])[0] == pytest.approx(limite * aliquota - deducao)
+
+
+def test_irpf_zero_para_base_vazia_ou_negativa():
+    np.testing.assert_array_equal(calcular_irpf([np.nan, -0.01, -5000.0, 0.0]), 0.0)
+
+
+def test_irpf_por_ano_sem_correcao_igual_ao_do_ano_da_tabela():
+    bases = bases_de_teste()
+    tabelas = faixas_irpf_anos([ANO_IRPF_PADRAO, ANO_IRPF_PADRAO + 1])
+    por_ano = calcular_irpf_anos(np.vstack([bases, bases]), tabelas)
+    np.testing.assert_array_equal(por_ano[0], calcular_irpf(bases))
+    np.testing.assert_array_equal(por_ano[1], calcular_irpf(bases))
+
+
+def test_contribuicoes_por_aliquota_mantem_o_indice():
+    base = pd.Series([0.0, 1000.0, np.nan, -10.0], index=[10, 11, 12, 13])
+    contribuicoes = calcular_contribuicoes(base)
+    assert list(contribuicoes.columns) == list(ALIQUOTAS_PREVIDENCIA)
+    assert list(contribuicoes.index) == [10, 11, 12, 13]
+    for coluna, aliquota in ALIQUOTAS_PREVIDENCIA.items():
+        pd.testing.assert_series_equal(contribuicoes[coluna], base * aliquota, check_names=False)
+
+
+def test_tributos_encadeiam_contribuicao_base_e_irpf():
+    base_previdencia = np.array([1000.0, 3000.0, 5000.0, np.nan])
+    proventos = np.array([1500.0, 4000.0, 8000.0, 2500.0])
+    tributos = calcular_tributos(base_previdencia, proventos)
+    base_irpf = proventos - base_previdencia * 0.14
+    np.testing.assert_array_equal(tributos['nova_base_IRPF'], base_irpf)
+    np.testing.assert_array_equal(tributos['nova_IRPF'], [irpf_escalar(base) for base in base_irpf])
@@ -0,0 +1,25 @@
+import pytest
+
+from projecao.resumo import calcular_projecao
+from projecao.varredura import INDICADORES, avaliar_cenarios, montar_cenarios, preparar_folha
+
+
+def test_lote_igual_ao_calculo_do_dashboard(dados):
+    cenarios = montar_cenarios(TC=[0, 2, 3.5], TR=[2, 1.25], num_classes=[5, 4], num_referencias=[6], indice_tabela=[0, 2])
+    resultado = avaliar_cenarios(preparar_folha(dados), cenarios)
+    for _, cenario in resultado.iterrows():
+        parametros = {parametro: cenario[parametro] for parametro in cenarios.columns}
+        parametros['num_classes'], parametros['num_referencias'] = int(parametros['num_classes']), int(parametros['num_referencias'])
+        parametros['indice_tabela'] = int(parametros['indice_tabela'])
+        indicadores = calcular_projecao(dados, parametros)['indicadores']
+        for coluna, chave in INDICADORES.items():
+            assert cenario[coluna] == pytest.approx(indicadores[chave], rel=1e-9, abs=1e-6), (parametros, coluna)
+
+
+def test_cenario_padrao_sem_impacto_no_lote(dados):
+    folha = preparar_folha(dados)
+    cenarios = montar_cenarios(TC=[2], TR=[2], num_classes=[5], num_referencias=[6], indice_tabela=[0])
+    indicadores = calcular_projecao(dados)['indicadores']
+    resultado = avaliar_cenarios(folha, cenarios).iloc[0]
+    assert resultado['IMPACTO ANUAL'] == pytest.approx(indicadores['impacto_anual_impacto'], abs=1e-6)
+    assert abs(resultado['IMPACTO ANUAL']) < 0.05